@@ -0,0 +1,166 @@
+"""
+Columnar Analytics Export
+Writes activity tables to Parquet (or Arrow IPC) files for the weekly
+crime-trend reports. Rows are pulled from the active storage backend's
+iter_records() and written CHUNK_ROWS at a time as row groups / record
+batches, so memory stays bounded however large the table is. Low-cardinality
+columns (status, prediction, fraud type, location, ...) are dictionary
+encoded.
+
+Requires the optional pyarrow package (pip install pyarrow).
+
+Run (against SQLITE_PATH, or SNAPSHOT_DIR + ARCHIVE_PATH for the in-memory
+store, whichever the backend is configured with; the in-memory files are only
+read, so this is safe next to a running server):
+    cd backend
+    python analytics_export.py --out exports/ --since 2024-05-01 --until 2024-05-08
+"""
+
+import argparse
+import json
+import os
+from datetime import datetime
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+CHUNK_ROWS = 50_000
+FORMATS = ("parquet", "arrow")
+
+# table -> [(column, kind)]; kind is one of int, float, str, dict (dictionary-encoded str), ts
+COLUMNS = {
+    "url_checks": [
+        ("id", "int"), ("url", "str"), ("status", "dict"), ("threats_json", "str"),
+        ("citizen_id", "int"), ("checked_at", "ts"),
+    ],
+    "deepfake_scans": [
+        ("id", "int"), ("filename", "str"), ("prediction", "dict"), ("confidence", "float"),
+        ("citizen_id", "int"), ("scanned_at", "ts"),
+    ],
+    "fraud_reports": [
+        ("id", "int"), ("fraud_type", "dict"), ("contact_info", "str"), ("details", "str"),
+        ("amount_lost", "float"), ("location", "dict"), ("citizen_id", "int"), ("status", "dict"),
+        ("created_at", "ts"),
+    ],
+    "metadata_log": [
+        ("id", "int"), ("user_id", "int"), ("user_type", "dict"), ("action", "dict"),
+        ("details", "str"), ("created_at", "ts"),
+    ],
+}
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise RuntimeError("Columnar export needs pyarrow: pip install pyarrow")
+
+def _arrow_type(kind):
+    return {
+        "int": pa.int64(),
+        "float": pa.float64(),
+        "str": pa.string(),
+        "dict": pa.dictionary(pa.int32(), pa.string()),
+        "ts": pa.timestamp("us"),
+    }[kind]
+
+def schema(table):
+    _require_pyarrow()
+    return pa.schema([(name, _arrow_type(kind)) for name, kind in COLUMNS[table]])
+
+def _encode(values, dictionary):
+    """
+    Dictionary-encode against a dictionary shared by every batch of the file.
+    It only ever grows at the end, so each batch's dictionary extends the last
+    one, which is what Arrow IPC files (delta dictionaries) require.
+    """
+    codes, words = dictionary
+    indices = []
+    for v in values:
+        if v is None:
+            indices.append(None)
+            continue
+        code = codes.get(v)
+        if code is None:
+            code = codes[v] = len(words)
+            words.append(v)
+        indices.append(code)
+    return pa.DictionaryArray.from_arrays(pa.array(indices, pa.int32()), pa.array(words, pa.string()))
+
+def _batch(table, rows, arrow_schema, dictionaries):
+    arrays = []
+    for name, kind in COLUMNS[table]:
+        values = [row.get(name) for row in rows]
+        if kind == "ts":
+            values = [datetime.fromisoformat(v) if v else None for v in values]
+        elif kind == "str" and name == "threats_json":
+            values = [v if isinstance(v, str) or v is None else json.dumps(v) for v in values]
+        if kind == "dict":
+            arrays.append(_encode(values, dictionaries.setdefault(name, ({}, []))))
+        else:
+            arrays.append(pa.array(values, type=_arrow_type(kind)))
+    return pa.RecordBatch.from_arrays(arrays, schema=arrow_schema)
+
+def _chunks(records, size):
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def export_table(table, path, records, fmt="parquet", chunk_rows=CHUNK_ROWS):
+    """
+    Write `records` (row dicts of `table`, e.g. from iter_records with a
+    since/until range) to `path`. Returns the row count.
+    """
+    _require_pyarrow()
+    if table not in COLUMNS:
+        raise ValueError(f"table must be one of {', '.join(COLUMNS)}")
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of {', '.join(FORMATS)}")
+    arrow_schema = schema(table)
+    if fmt == "parquet":
+        writer = pq.ParquetWriter(path, arrow_schema, compression="zstd")
+        write = lambda batch: writer.write_table(pa.Table.from_batches([batch]))
+    else:
+        writer = pa.ipc.new_file(path, arrow_schema, options=pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True))
+        write = writer.write_batch
+    rows, dictionaries = 0, {}
+    try:
+        for chunk in _chunks(records, chunk_rows):
+            write(_batch(table, chunk, arrow_schema, dictionaries))
+            rows += len(chunk)
+    finally:
+        writer.close()
+    return rows
+
+def export_all(store, out_dir, since=None, until=None, fmt="parquet", tables=None):
+    """Export every table into out_dir as <table>.<fmt>; returns {table: rows}."""
+    os.makedirs(out_dir, exist_ok=True)
+    return {
+        table: export_table(table, os.path.join(out_dir, f"{table}.{fmt}"),
+                            store.iter_records(table, since=since, until=until), fmt)
+        for table in (tables or COLUMNS)
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", required=True, help="Output directory")
+    parser.add_argument("--since", help="ISO start time (inclusive)")
+    parser.add_argument("--until", help="ISO end time (exclusive)")
+    parser.add_argument("--format", choices=FORMATS, default="parquet")
+    parser.add_argument("--tables", nargs="*", choices=list(COLUMNS))
+    args = parser.parse_args()
+
+    import database
+    if database.BACKEND == "sqlite":
+        database.init_db()
+    else:
+        database.load_read_only()
+    for table, rows in export_all(database, args.out, args.since, args.until, args.format, args.tables).items():
+        print(f"{table:<16} {rows:>10,} rows")
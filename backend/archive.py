@@ -0,0 +1,144 @@
+"""
+Cold Archive for Evicted Records
+SQLite file that database.py spills old rows into once a table exceeds its
+retention policy. Records are stored pickled, keyed by (table, id) with an
+(table, owner, id) index so per-user history pages keep working after the
+hot copy has left RAM. Alongside the rows it keeps named tallies (what the
+spilled rows contributed to the dashboard counters), so a restart can add
+them back without reading every archived row.
+"""
+
+import pickle
+import sqlite3
+import threading
+
+_PROTOCOL = pickle.HIGHEST_PROTOCOL
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS archive (
+    tbl TEXT NOT NULL,
+    id INTEGER NOT NULL,
+    owner TEXT NOT NULL,
+    record BLOB NOT NULL,
+    PRIMARY KEY (tbl, id)
+);
+CREATE INDEX IF NOT EXISTS idx_archive_owner ON archive(tbl, owner, id);
+CREATE TABLE IF NOT EXISTS archive_tallies (
+    name TEXT PRIMARY KEY,
+    n INTEGER NOT NULL
+);
+"""
+
+
+class Archive:
+    """One shared connection; every call takes the archive lock."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        had_tallies = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'archive_tallies'"
+        ).fetchone()
+        self._conn.executescript(_SCHEMA)
+        # Archives written before tallies existed need them rebuilt from their rows once
+        self.needs_tallies = not had_tallies and self.count_all() > 0
+
+    def spill(self, table, records, owner_of, tally=None):
+        """
+        Store `records` (idempotent: a re-spilled id overwrites itself). When
+        given, `tally(records)` names what the rows add to the dashboard
+        counters; it is stored for the rows archived for the first time, in the
+        same transaction, and returned.
+        """
+        records = list(records)
+        rows = [(table, r["id"], str(owner_of(r)), pickle.dumps(r, protocol=_PROTOCOL)) for r in records]
+        with self._lock, self._conn:
+            archived_max = self._max_id(table)
+            tallies = tally([r for r in records if r["id"] > archived_max]) if tally else {}
+            self._conn.executemany("INSERT OR REPLACE INTO archive VALUES (?, ?, ?, ?)", rows)
+            self._add_tallies(tallies)
+        return tallies
+
+    def add_tallies(self, tallies):
+        with self._lock, self._conn:
+            self._add_tallies(tallies)
+
+    def _add_tallies(self, tallies):
+        self._conn.executemany(
+            "INSERT INTO archive_tallies VALUES (?, ?) ON CONFLICT(name) DO UPDATE SET n = n + excluded.n",
+            tallies.items(),
+        )
+
+    def tallies(self):
+        with self._lock:
+            return dict(self._conn.execute("SELECT name, n FROM archive_tallies").fetchall())
+
+    def max_id(self, table):
+        """Highest archived id of `table` (0 if none), so a restarted store never reuses one."""
+        with self._lock:
+            return self._max_id(table)
+
+    def _max_id(self, table):
+        return self._conn.execute("SELECT MAX(id) FROM archive WHERE tbl = ?", (table,)).fetchone()[0] or 0
+
+    def get(self, table, record_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT record FROM archive WHERE tbl = ? AND id = ?", (table, record_id)
+            ).fetchone()
+        return pickle.loads(row[0]) if row else None
+
+    def latest(self, table, owner=None, limit=20, before_id=None):
+        """Up to `limit` archived records, newest first, with id < before_id."""
+        sql = "SELECT record FROM archive WHERE tbl = ? AND id < ?"
+        params = [table, before_id if before_id is not None else 2**63 - 1]
+        if owner is not None:
+            sql += " AND owner = ?"
+            params.append(str(owner))
+        sql += " ORDER BY id DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            blobs = self._conn.execute(sql, params).fetchall()
+        return [pickle.loads(blob) for (blob,) in blobs]
+
+    def iter_before(self, table, owner=None, before_id=None, page=200):
+        """Lazy newest-first iterator, fetched `page` rows at a time."""
+        while True:
+            rows = self.latest(table, owner, page, before_id)
+            yield from rows
+            if len(rows) < page:
+                return
+            before_id = rows[-1]["id"]
+
+    def iter_after(self, table, after_id=0, page=500):
+        """Oldest-first iterator over every owner's records with id > after_id."""
+        while True:
+            with self._lock:
+                blobs = self._conn.execute(
+                    "SELECT record FROM archive WHERE tbl = ? AND id > ? ORDER BY id LIMIT ?",
+                    (table, after_id, page),
+                ).fetchall()
+            rows = [pickle.loads(blob) for (blob,) in blobs]
+            yield from rows
+            if len(rows) < page:
+                return
+            after_id = rows[-1]["id"]
+
+    def count(self, table, owner=None):
+        if owner is None:
+            sql, params = "SELECT COUNT(*) FROM archive WHERE tbl = ?", (table,)
+        else:
+            sql, params = "SELECT COUNT(*) FROM archive WHERE tbl = ? AND owner = ?", (table, str(owner))
+        with self._lock:
+            return self._conn.execute(sql, params).fetchone()[0]
+
+    def count_all(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM archive").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,95 @@
+"""
+Benchmark: DeepfakeModel CPU inference modes
+For every cpu_optimize mode: build time, batch-1 latency, batched throughput
+and logit parity against the fp32 best_model.pth.
+
+Parity is measured on face-crop sequences from --videos when given (use
+clips like the ones the service sees: the same clips calibrate static_int8),
+otherwise on random tensors, which only shows numerical drift.
+
+Run:
+    cd backend
+    python bench_cpu_modes.py --videos samples/*.mp4
+    python bench_cpu_modes.py --modes fp32 dynamic_int8 onnx --frames 8 --repeat 5
+"""
+
+import argparse
+import os
+import statistics
+import time
+import warnings
+
+import torch
+
+import cpu_optimize
+from deepfake_detector import DeepfakeDetector, DeepfakeModel
+
+warnings.filterwarnings("ignore")
+
+
+def _reference_model(weights_dir):
+    if os.path.exists(os.path.join(weights_dir, "best_model.pth")):
+        return DeepfakeDetector(weights_dir=weights_dir, device="cpu", max_batch_size=1).model, "best_model.pth"
+    print(f"⚠ {weights_dir}/best_model.pth not found; using randomly initialised weights")
+    torch.manual_seed(0)
+    return DeepfakeModel().eval(), "random weights"
+
+def _sequences(weights_dir, videos, count, frames):
+    if videos:
+        detector = DeepfakeDetector(weights_dir=weights_dir, device="cpu", max_batch_size=1)
+        sequences = [s for s in (detector.face_sequence(v, frames) for v in videos) if s is not None]
+        if sequences:
+            return sequences, f"{len(sequences)} video clips"
+        print("⚠ no faces found in --videos; falling back to random inputs")
+    torch.manual_seed(1)
+    return [torch.randn(frames, 3, 224, 224) for _ in range(count)], f"{count} random sequences"
+
+def _latency(model, sequence, repeat):
+    times = []
+    with torch.no_grad():
+        model(sequence.unsqueeze(0))    # warm-up
+        for _ in range(repeat):
+            started = time.perf_counter()
+            model(sequence.unsqueeze(0))
+            times.append(time.perf_counter() - started)
+    return statistics.median(times)
+
+def _throughput(model, sequences, batch_size):
+    batch = torch.stack((sequences * batch_size)[:batch_size])
+    with torch.no_grad():
+        started = time.perf_counter()
+        model(batch)
+    return batch_size / (time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--weights", default="weights")
+    parser.add_argument("--videos", nargs="*", default=[])
+    parser.add_argument("--modes", nargs="*", choices=cpu_optimize.MODES, default=list(cpu_optimize.MODES))
+    parser.add_argument("--frames", type=int, default=16, help="Frames per sequence")
+    parser.add_argument("--samples", type=int, default=8, help="Random sequences when no --videos")
+    parser.add_argument("--batch", type=int, default=4, help="Batch size for the throughput run")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    reference, weights = _reference_model(args.weights)
+    sequences, source = _sequences(args.weights, args.videos, args.samples, args.frames)
+    example = torch.stack(sequences[:1])
+    print(f"\n{weights}, {source} of {args.frames} frames, {torch.get_num_threads()} torch threads\n")
+    print(f"{'mode':<14} {'build s':>8} {'latency ms':>11} {'seq/s @' + str(args.batch):>10} "
+          f"{'max |Δlogit|':>13} {'mean |Δ|':>9} {'agree':>7}")
+
+    for mode in args.modes:
+        try:
+            started = time.perf_counter()
+            model = cpu_optimize.optimize(reference, mode, calibration=sequences, example=example)
+            build = time.perf_counter() - started
+        except Exception as e:
+            print(f"{mode:<14} unavailable: {e}")
+            continue
+        latency = _latency(model, sequences[0], args.repeat)
+        throughput = _throughput(model, sequences, args.batch)
+        report = cpu_optimize.parity(reference, model, sequences)
+        print(f"{mode:<14} {build:8.1f} {latency * 1000:11.0f} {throughput:10.2f} "
+              f"{report['max_abs_diff']:13.4f} {report['mean_abs_diff']:9.4f} {report['agreement'] * 100:6.1f}%")
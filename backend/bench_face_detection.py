@@ -0,0 +1,94 @@
+"""
+Benchmark: MTCNN face detection per video
+Times the 16 half-resolution detections predict_video runs per clip, one
+detect() call per frame (the old loop) against DeepfakeDetector.detect_faces
+(one batched call), and checks that both find the same largest face.
+
+Frames come from the given video (sampled as predict_video does) or, by
+default, a synthetic 1280x720 clip with scikit-image's astronaut portrait
+drifting across the frame.
+
+Run:
+    cd backend
+    python bench_face_detection.py                  # synthetic clip
+    python bench_face_detection.py clip.mp4 --repeat 5
+"""
+
+import argparse
+import time
+
+import cv2
+import numpy as np
+import torch
+from PIL import Image
+
+from deepfake_detector import DeepfakeDetector
+from frame_sampler import read_frames
+
+
+def _video_frames(path, num_frames):
+    cap = cv2.VideoCapture(path)
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    indices = np.linspace(0, total - 1, num_frames, dtype=int)
+    frames = [cv2.cvtColor(frame, cv2.COLOR_BGR2RGB) for _, frame in read_frames(cap, indices)]
+    cap.release()
+    return frames
+
+def _synthetic_frames(num_frames, size=(720, 1280)):
+    from skimage import data
+    face = data.astronaut()
+    frames = []
+    for i in range(num_frames):
+        canvas = np.full((*size, 3), 40, dtype=np.uint8)
+        x = int((size[1] - face.shape[1]) * i / max(num_frames - 1, 1))
+        canvas[100:100 + face.shape[0], x:x + face.shape[1]] = face
+        frames.append(canvas)
+    return frames
+
+def _per_frame(detector, frames):
+    results = []
+    for frame in frames:
+        h, w = frame.shape[:2]
+        boxes, _ = detector.detector.detect(Image.fromarray(frame).resize((w // 2, h // 2)))
+        results.append(None if boxes is None else boxes * 2)
+    return results
+
+def _largest(results):
+    out = []
+    for boxes in results:
+        if boxes is None:
+            out.append(None)
+        else:
+            areas = [(b[2] - b[0]) * (b[3] - b[1]) for b in boxes]
+            out.append([int(b) for b in boxes[np.argmax(areas)]])
+    return out
+
+def _time(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("video", nargs="?", help="Clip to sample (default: synthetic)")
+    parser.add_argument("--frames", type=int, default=16)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--device", default="cpu")
+    args = parser.parse_args()
+
+    detector = DeepfakeDetector(weights_dir="weights", device=args.device)
+    frames = _video_frames(args.video, args.frames) if args.video else _synthetic_frames(args.frames)
+    h, w = frames[0].shape[:2]
+    print(f"{len(frames)} frames of {w}x{h}, {torch.get_num_threads()} torch threads, device {args.device}")
+
+    detector.detect_faces(frames[:2])   # warm-up
+    loop, loop_boxes = _time(lambda: _per_frame(detector, frames), args.repeat)
+    batch, batch_boxes = _time(lambda: detector.detect_faces(frames), args.repeat)
+    print(f"  per-frame detect  {loop * 1000:8.1f} ms / video")
+    print(f"  batched detect    {batch * 1000:8.1f} ms / video   ({loop / batch:.2f}x)")
+    print(f"  largest faces match: {_largest(loop_boxes) == _largest(batch_boxes)}")
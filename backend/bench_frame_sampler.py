@@ -0,0 +1,92 @@
+"""
+Benchmark: deepfake frame sampling
+Times reading the 16 evenly spaced frames predict_video samples from long
+H.264 clips with per-frame seeking (the old loop), a single grab()/retrieve()
+pass, and frame_sampler's adaptive mode, and checks that all three return
+the same frames.
+
+Clips are synthesised with ffmpeg/libx264 at each --gop (keyframe interval)
+unless existing files are passed in.
+
+Run:
+    cd backend
+    python bench_frame_sampler.py                      # 120 s 640x360 clips, GOP 30 and 250
+    python bench_frame_sampler.py --seconds 600 --gop 250 600
+    python bench_frame_sampler.py clip1.mp4 clip2.mp4
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+import zlib
+
+import cv2
+import numpy as np
+
+from frame_sampler import MODES, read_frames
+
+
+def _make_clip(path, seconds, gop, size, fps=30):
+    ffmpeg = os.getenv("FFMPEG") or shutil.which("ffmpeg")
+    if not ffmpeg:
+        raise SystemExit("ffmpeg with libx264 is needed to synthesise clips (set FFMPEG or pass clip paths)")
+    subprocess.run(
+        [ffmpeg, "-loglevel", "error", "-y", "-f", "lavfi", "-i", f"testsrc2=size={size}:rate={fps}",
+         "-t", str(seconds), "-c:v", "libx264", "-preset", "veryfast", "-g", str(gop),
+         "-keyint_min", str(gop), "-sc_threshold", "0", "-pix_fmt", "yuv420p", path],
+        check=True,
+    )
+
+def _sample(path, mode, num_frames):
+    cap = cv2.VideoCapture(path)
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    indices = np.linspace(0, total - 1, num_frames, dtype=int)
+    started = time.perf_counter()
+    if mode == "seek-loop":
+        frames = []
+        for idx in indices:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, idx)
+            ret, frame = cap.read()
+            if ret:
+                frames.append((int(idx), frame))
+    else:
+        frames = list(read_frames(cap, indices, mode))
+    elapsed = time.perf_counter() - started
+    cap.release()
+    return elapsed, total, [(idx, zlib.crc32(frame.tobytes())) for idx, frame in frames]
+
+def _bench(label, path, num_frames, repeat):
+    print(f"\n{label}")
+    reference = None
+    for mode in ("seek-loop",) + tuple(m for m in MODES if m != "seek"):
+        best = None
+        for _ in range(repeat):
+            elapsed, total, frames = _sample(path, mode, num_frames)
+            best = elapsed if best is None else min(best, elapsed)
+        reference = reference or frames
+        match = "ok" if frames == reference else "MISMATCH"
+        print(f"  {mode:<10} {best * 1000:9.1f} ms   {len(frames):>2}/{num_frames} frames of {total:,}   {match}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("clips", nargs="*", help="Existing video files (default: synthesise H.264 clips)")
+    parser.add_argument("--seconds", type=int, default=120)
+    parser.add_argument("--gop", type=int, nargs="+", default=[30, 250])
+    parser.add_argument("--size", default="640x360")
+    parser.add_argument("--frames", type=int, default=16)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.clips:
+        for clip in args.clips:
+            _bench(clip, clip, args.frames, args.repeat)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            for gop in args.gop:
+                path = os.path.join(tmp, f"clip_gop{gop}.mp4")
+                _make_clip(path, args.seconds, gop, args.size)
+                _bench(f"H.264 {args.size}, {args.seconds} s @ 30 fps, GOP {gop}", path, args.frames, args.repeat)
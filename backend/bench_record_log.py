@@ -0,0 +1,49 @@
+"""
+Micro-benchmark: list.insert(0, ...) vs RecordLog.append
+Shows that per-insert cost stays flat for RecordLog as the store grows,
+while the old newest-first list pays an O(n) memmove on every write.
+
+Run:
+    cd backend
+    python bench_record_log.py
+    python bench_record_log.py --sizes 10000 100000 1000000 4000000 --batch 2000
+"""
+
+import argparse
+import time
+
+from database import RecordLog
+
+
+def _time_inserts(store, insert, batch):
+    record = {"id": 0, "status": "SAFE"}
+    start = time.perf_counter()
+    for _ in range(batch):
+        insert(store, record)
+    return (time.perf_counter() - start) / batch
+
+
+def bench(sizes, batch):
+    print(f"{'store size':>12} | {'list.insert(0)':>16} | {'RecordLog.append':>18}")
+    print("-" * 54)
+    filler = {"id": 0}
+    for size in sizes:
+        prefilled = [filler] * size
+
+        legacy = list(prefilled)
+        legacy_cost = _time_inserts(legacy, lambda s, r: s.insert(0, r), batch)
+        del legacy
+
+        log = RecordLog(prefilled)
+        log_cost = _time_inserts(log, RecordLog.append, batch)
+        del log
+
+        print(f"{size:>12,} | {legacy_cost * 1e6:>13.2f} us | {log_cost * 1e6:>15.3f} us")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000, 2_000_000])
+    parser.add_argument("--batch", type=int, default=1000, help="inserts timed at each size")
+    args = parser.parse_args()
+    bench(args.sizes, args.batch)
@@ -0,0 +1,96 @@
+"""
+Memory benchmark: dict rows vs compact slotted records
+Measures bytes per stored row for the high-volume tables (URL checks,
+deepfake scans, metadata log), before and after the compact record types.
+
+Run:
+    cd backend
+    python bench_record_memory.py
+    python bench_record_memory.py --rows 1000000
+"""
+
+import argparse
+import json
+import random
+import tracemalloc
+from datetime import datetime
+
+from database import DeepfakeScan, MetadataEntry, URLCheck, _now_us
+
+STATUSES = ["SAFE", "SAFE", "SAFE", "UNSAFE", "ERROR"]
+THREATS = [{"threatType": "MALWARE", "platformType": "ANY_PLATFORM"}]
+
+
+def _legacy_url_check(i, rng):
+    status = rng.choice(STATUSES)
+    threats = THREATS if status == "UNSAFE" else None
+    return {
+        "id": i,
+        "url": f"https://site{i % 5000}.example/p/{i}",
+        "status": status,
+        "threats_json": json.dumps(threats) if threats else "[]",
+        "citizen_id": rng.randint(1, 50_000),
+        "checked_at": datetime.now().isoformat(),
+    }
+
+def _compact_url_check(i, rng):
+    status = rng.choice(STATUSES)
+    return URLCheck(i, f"https://site{i % 5000}.example/p/{i}", status,
+                    THREATS if status == "UNSAFE" else None, rng.randint(1, 50_000), _now_us())
+
+def _legacy_deepfake(i, rng):
+    return {
+        "id": i,
+        "filename": f"clip_{i}.mp4",
+        "prediction": rng.choice(["REAL", "FAKE"]),
+        "confidence": rng.random(),
+        "citizen_id": rng.randint(1, 50_000),
+        "scanned_at": datetime.now().isoformat(),
+    }
+
+def _compact_deepfake(i, rng):
+    return DeepfakeScan(i, f"clip_{i}.mp4", rng.choice(["REAL", "FAKE"]), rng.random(),
+                        rng.randint(1, 50_000), _now_us())
+
+def _legacy_metadata(i, rng):
+    return {
+        "id": i,
+        "user_id": rng.randint(1, 50_000),
+        "user_type": "citizen",
+        "action": rng.choice(["login", "check_url", "report_fraud"]),
+        "details": "",
+        "created_at": datetime.now().isoformat(),
+    }
+
+def _compact_metadata(i, rng):
+    return MetadataEntry(i, rng.randint(1, 50_000), "citizen",
+                         rng.choice(["login", "check_url", "report_fraud"]), "", _now_us())
+
+
+def _bytes_per_row(make, rows):
+    rng = random.Random(0)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    store = [make(i, rng) for i in range(1, rows + 1)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del store
+    return (after - before) / rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200_000)
+    args = parser.parse_args()
+
+    print(f"Bytes per record over {args.rows:,} rows (includes row payload strings)")
+    print(f"{'table':<16} | {'dict':>10} | {'compact':>10} | {'saved':>7}")
+    print("-" * 52)
+    for table, legacy, compact in (
+        ("url_checks", _legacy_url_check, _compact_url_check),
+        ("deepfake_scans", _legacy_deepfake, _compact_deepfake),
+        ("metadata_log", _legacy_metadata, _compact_metadata),
+    ):
+        before = _bytes_per_row(legacy, args.rows)
+        after = _bytes_per_row(compact, args.rows)
+        print(f"{table:<16} | {before:>8.0f} B | {after:>8.0f} B | {1 - after / before:>6.0%}")
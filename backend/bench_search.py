@@ -0,0 +1,56 @@
+"""
+Benchmark: fraud report full-text search
+Indexes N synthetic reports, then times rare (UPI handle), mixed and very
+common queries against the in-memory inverted index.
+
+Run:
+    cd backend
+    python bench_search.py                 # 1M reports
+    python bench_search.py --reports 200000
+"""
+
+import argparse
+import random
+import time
+
+import database as store
+
+BANKS = ["HDFC", "SBI", "ICICI", "Axis", "Kotak", "PNB"]
+SCRIPTS = [
+    "Caller said KYC expired and asked for the OTP",
+    "Fake customer care number on search results, paid via UPI",
+    "Digital arrest call claiming CBI case, transferred money",
+    "Investment group on WhatsApp promised double returns",
+    "Electricity bill disconnection message with payment link",
+]
+CITIES = ["Raipur", "Bilaspur", "Durg", "Korba", "Jagdalpur"]
+
+
+def _load(reports):
+    rng = random.Random(1)
+    start = time.perf_counter()
+    for i in range(reports):
+        store.insert_fraud_report(
+            rng.choice(["UPI", "Bank", "Investment", "Digital Arrest"]),
+            f"agent{i % 40_000}@ybl",
+            f"{rng.choice(SCRIPTS)} ({rng.choice(BANKS)} bank)",
+            location=rng.choice(CITIES),
+            citizen_id=rng.randint(1, 50_000),
+        )
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--reports", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    load_s = _load(args.reports)
+    print(f"Indexed {args.reports:,} reports in {load_s:.1f}s ({args.reports / load_s:,.0f}/s)")
+    for query in ("agent1234@ybl", "digital arrest cbi", "hdfc kyc otp", "upi"):
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            hits = store.search_fraud_reports(query, 20)
+        elapsed = (time.perf_counter() - start) / args.repeat
+        print(f"  {query!r:<24} {elapsed * 1e3:8.2f} ms  ({len(hits)} hits)")
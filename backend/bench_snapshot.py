@@ -0,0 +1,61 @@
+"""
+Benchmark: snapshot write and restart restore time
+Fills the in-memory store with N URL checks (plus a journal tail written
+after the snapshot), then times snapshot_now() and a cold init_db() restore.
+
+Run:
+    cd backend
+    python bench_snapshot.py                  # 1M rows
+    python bench_snapshot.py --rows 200000 --journal 50000
+"""
+
+import argparse
+import importlib
+import os
+import random
+import tempfile
+import time
+
+import database
+
+
+def _fill(store, rows, citizens, seed):
+    rng = random.Random(seed)
+    for i in range(rows):
+        store.insert_url_check(
+            f"https://site{i % 5000}.example/path/{i}",
+            "UNSAFE" if rng.random() < 0.05 else "SAFE",
+            None,
+            citizen_id=rng.randint(1, citizens),
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--journal", type=int, default=100_000, help="rows written after the snapshot")
+    parser.add_argument("--citizens", type=int, default=10_000)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    os.environ["SNAPSHOT_INTERVAL"] = "0"  # no background thread; we snapshot by hand
+    store = importlib.reload(database)
+    store.init_db(directory)
+
+    start = time.perf_counter()
+    _fill(store, args.rows, args.citizens, 42)
+    print(f"insert {args.rows:,} rows (journaled): {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    store.snapshot_now()
+    size = os.path.getsize(os.path.join(directory, "store.snap"))
+    print(f"snapshot_now:                 {time.perf_counter() - start:.2f}s ({size / 2**20:,.1f} MiB)")
+
+    _fill(store, args.journal, args.citizens, 7)
+
+    store = importlib.reload(database)
+    start = time.perf_counter()
+    store.init_db(directory)
+    elapsed = time.perf_counter() - start
+    total = len(store._url_checks)
+    print(f"restore {total:,} rows:        {elapsed:.2f}s ({total / elapsed:,.0f} rows/s)")
@@ -0,0 +1,81 @@
+"""
+Benchmark: in-memory store vs SQLite backend
+Loads N URL-check rows into each backend, then times the calls the clients
+poll most (single insert, per-citizen history, dashboard stats).
+
+Run:
+    cd backend
+    python bench_storage.py                 # 1M rows
+    python bench_storage.py --rows 200000 --db /tmp/bench.db
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import database as memory_store
+import sqlite_store
+
+
+def _per_call(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def _load(store, rows, citizens, bulk):
+    rng = random.Random(42)
+    start = time.perf_counter()
+    with bulk():
+        for i in range(rows):
+            store.insert_url_check(
+                f"https://site{i % 5000}.example/path/{i}",
+                "UNSAFE" if rng.random() < 0.05 else "SAFE",
+                None,
+                citizen_id=rng.randint(1, citizens),
+            )
+    return time.perf_counter() - start
+
+
+def _measure(name, store, rows, citizens, bulk, repeat):
+    load_s = _load(store, rows, citizens, bulk)
+    rng = random.Random(7)
+    results = {
+        "load (rows/s)": f"{rows / load_s:,.0f}",
+        "insert_url_check": _per_call(lambda: store.insert_url_check("https://new.example", "SAFE", None, 1), repeat),
+        "get_recent_url_checks(citizen)": _per_call(
+            lambda: store.get_recent_url_checks(rng.randint(1, citizens), 20), repeat),
+        "get_recent_url_checks(global)": _per_call(lambda: store.get_recent_url_checks(0, 20), repeat),
+        "get_dashboard_stats": _per_call(store.get_dashboard_stats, max(1, repeat // 100)),
+    }
+    print(f"\n{name}")
+    for op, value in results.items():
+        shown = value if isinstance(value, str) else f"{value * 1e6:,.1f} us"
+        print(f"  {op:<34} {shown:>14}")
+
+
+class _NoBatch:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--citizens", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--db", default=None, help="SQLite file (default: temp file)")
+    args = parser.parse_args()
+
+    print(f"Benchmarking {args.rows:,} URL checks across {args.citizens:,} citizens")
+    _measure("In-memory store", memory_store, args.rows, args.citizens, _NoBatch, args.repeat)
+
+    db_path = args.db or os.path.join(tempfile.mkdtemp(), "bench.db")
+    sqlite_store.init_db(db_path)
+    _measure(f"SQLite store ({db_path})", sqlite_store, args.rows, args.citizens, sqlite_store.transaction, args.repeat)
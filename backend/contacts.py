@@ -0,0 +1,75 @@
+"""
+Contact Identifier Normalization
+Turns the free-form contact_info of a fraud report (phone numbers, UPI IDs,
+emails, URLs) into canonical keys, so "+91 98765-43210" and "09876543210" or
+"https://www.Shop.example/pay/" and "shop.example/pay" land on the same entry
+of the reported-contact index.
+"""
+
+import re
+from urllib.parse import urlsplit
+
+_SEPARATORS = re.compile(r"[,;\s]+")
+_UPI = re.compile(r"^[a-z0-9._-]{2,256}@[a-z][a-z0-9]{1,64}$")
+_EMAIL = re.compile(r"^[a-z0-9._%+-]+@[a-z0-9-]+(\.[a-z0-9-]+)+$")
+_PHONE_CHARS = re.compile(r"^\+?[\d\s().-]{7,20}$")
+_URL_HOST = re.compile(r"^[a-z0-9-]+(\.[a-z0-9-]+)+$")
+
+
+def normalize_phone(value):
+    digits = re.sub(r"\D", "", value)
+    if len(digits) == 12 and digits.startswith("91"):
+        digits = digits[2:]
+    elif len(digits) == 11 and digits.startswith("0"):
+        digits = digits[1:]
+    return digits if 7 <= len(digits) <= 15 else None
+
+def normalize_url(value):
+    """Scheme-less, lowercase host without "www.", path without trailing slash; query/fragment dropped."""
+    raw = value.strip()
+    if "://" not in raw:
+        raw = "http://" + raw
+    try:
+        parts = urlsplit(raw)
+        host = (parts.hostname or "").lower()
+    except ValueError:
+        return None
+    if host.startswith("www."):
+        host = host[4:]
+    if not _URL_HOST.match(host):
+        return None
+    return host + parts.path.rstrip("/")
+
+def normalize_contact(value):
+    """Return (kind, key) for one identifier ("phone", "upi", "email" or "url"); None if unrecognised."""
+    value = value.strip().strip("<>\"'")
+    if not value:
+        return None
+    lowered = value.lower()
+    if "@" in lowered and "/" not in lowered:
+        if _UPI.match(lowered):
+            return "upi", lowered
+        if _EMAIL.match(lowered):
+            return "email", lowered
+        return None
+    if _PHONE_CHARS.match(value):
+        phone = normalize_phone(value)
+        if phone:
+            return "phone", phone
+        return None
+    url = normalize_url(value)
+    return ("url", url) if url else None
+
+def extract_contacts(contact_info):
+    """All distinct (kind, key) identifiers in a report's contact_info, in order of appearance."""
+    if not contact_info:
+        return []
+    found = normalize_contact(contact_info)
+    if found:
+        return [found]
+    seen = []
+    for part in _SEPARATORS.split(contact_info):
+        found = normalize_contact(part)
+        if found and found not in seen:
+            seen.append(found)
+    return seen
@@ -0,0 +1,145 @@
+"""
+CPU Inference Modes for DeepfakeModel
+Alternatives to running the fp32 ResNet50 + Bi-LSTM eagerly, for CPU-only
+inference boxes:
+
+    fp32           eager fp32 (reference)
+    channels_last  eager fp32, backbone in NHWC memory format
+    dynamic_int8   Linear / LSTM weights quantized to INT8, activations at run time
+    static_int8    backbone quantized with FX graph mode (needs calibration
+                   sequences) + dynamic_int8 head
+    torchscript    traced, frozen and optimize_for_inference'd fp32 graph
+    onnx           fp32 graph exported to ONNX and run by ONNX Runtime
+                   (optional: pip install onnx onnxruntime)
+
+Quantized modes change the logits slightly; parity() measures by how much
+against the fp32 model so a mode can be checked before it is deployed.
+"""
+
+import copy
+import os
+import tempfile
+
+import torch
+import torch.nn as nn
+
+try:
+    import onnxruntime as ort
+except ImportError:
+    ort = None
+
+MODES = ("fp32", "channels_last", "dynamic_int8", "static_int8", "torchscript", "onnx")
+
+
+class _ChannelsLast(nn.Module):
+    """Runs a conv backbone on NHWC tensors (faster oneDNN kernels on most CPUs)."""
+
+    def __init__(self, cnn):
+        super().__init__()
+        self.cnn = cnn.to(memory_format=torch.channels_last)
+
+    def forward(self, x):
+        return self.cnn(x.contiguous(memory_format=torch.channels_last))
+
+
+class OnnxRuntimeModel:
+    """Callable stand-in for DeepfakeModel backed by an ONNX Runtime session."""
+
+    def __init__(self, path):
+        if ort is None:
+            raise RuntimeError("The onnx mode needs onnxruntime: pip install onnx onnxruntime")
+        self.path = path
+        self.session = ort.InferenceSession(path, providers=["CPUExecutionProvider"])
+
+    def __call__(self, frames):
+        logits = self.session.run(None, {"frames": frames.detach().cpu().numpy()})[0]
+        return torch.from_numpy(logits)
+
+
+def _quantized_engine():
+    engines = torch.backends.quantized.supported_engines
+    return "x86" if "x86" in engines else "qnnpack"
+
+def _dynamic_int8(model):
+    return torch.ao.quantization.quantize_dynamic(model, {nn.Linear, nn.LSTM}, dtype=torch.qint8)
+
+def _static_int8(model, calibration):
+    from torch.ao.quantization import get_default_qconfig_mapping
+    from torch.ao.quantization.quantize_fx import convert_fx, prepare_fx
+
+    if not calibration:
+        raise ValueError("static_int8 needs calibration sequences (face crops from representative videos)")
+    engine = _quantized_engine()
+    torch.backends.quantized.engine = engine
+    prepared = prepare_fx(model.cnn, get_default_qconfig_mapping(engine), (calibration[0],))
+    with torch.no_grad():
+        for sequence in calibration:
+            prepared(sequence)
+    model.cnn = convert_fx(prepared)
+    return _dynamic_int8(model)
+
+def optimize(model, mode, calibration=None, example=None, onnx_path=None):
+    """
+    Return an eval-mode callable equivalent to `model` (a fp32 DeepfakeModel
+    on the CPU, left untouched) for `mode`. `calibration` is a list of
+    (T, 3, 224, 224) face-crop sequences, required by static_int8; `example`
+    is a (B, T, 3, 224, 224) input used to trace/export (default: one
+    16-frame clip). onnx writes its graph to `onnx_path` (default: a temp file,
+    deleted once the session is built).
+    """
+    if mode not in MODES:
+        raise ValueError(f"cpu mode must be one of {', '.join(MODES)}")
+    model = copy.deepcopy(model).cpu().eval()
+    if example is None:
+        example = torch.zeros(1, 16, 3, 224, 224)
+
+    if mode == "fp32":
+        return model
+    if mode == "channels_last":
+        model.cnn = _ChannelsLast(model.cnn)
+        return model
+    if mode == "dynamic_int8":
+        return _dynamic_int8(model)
+    if mode == "static_int8":
+        return _static_int8(model, calibration).eval()
+    if mode == "torchscript":
+        with torch.no_grad():
+            traced = torch.jit.freeze(torch.jit.trace(model, example))
+            return torch.jit.optimize_for_inference(traced)
+
+    temporary = onnx_path is None
+    if temporary:
+        fd, onnx_path = tempfile.mkstemp(suffix=".onnx", prefix="deepfake_")
+        os.close(fd)
+    try:
+        torch.onnx.export(
+            model, (example,), onnx_path,
+            input_names=["frames"], output_names=["logits"],
+            dynamic_axes={"frames": {0: "batch", 1: "frames"}, "logits": {0: "batch"}},
+            dynamo=False,
+        )
+        return OnnxRuntimeModel(onnx_path)
+    finally:
+        if temporary:
+            os.remove(onnx_path)    # the session has already loaded the graph
+
+
+def parity(reference, candidate, sequences, batch_size=8):
+    """
+    Compare `candidate` against the fp32 `reference` on (T, 3, 224, 224)
+    sequences: max / mean absolute logit difference and the fraction of
+    sequences given the same REAL/FAKE prediction.
+    """
+    diffs, agree = [], 0
+    with torch.no_grad():
+        for start in range(0, len(sequences), batch_size):
+            batch = torch.stack(sequences[start:start + batch_size])
+            expected, actual = reference(batch), candidate(batch)
+            diffs.append((expected - actual).abs())
+            agree += int((expected.argmax(dim=1) == actual.argmax(dim=1)).sum())
+    diffs = torch.cat(diffs) if diffs else torch.zeros(0)
+    return {
+        "max_abs_diff": float(diffs.max()) if diffs.numel() else 0.0,
+        "mean_abs_diff": float(diffs.mean()) if diffs.numel() else 0.0,
+        "agreement": agree / len(sequences) if sequences else 1.0,
+    }
@@ -2,24 +2,323 @@
 In-Memory Storage Backend (No Database)
 All data lives in Python dicts/lists and resets on server restart.
 Perfect for prototyping.
+
+Set ARCHIVE_PATH to bound memory: tables over their RETENTION policy spill
+their oldest rows to that SQLite archive, which history reads fall back to.
+
+Set SNAPSHOT_DIR to keep data across restarts: mutations are journaled and the
+store is periodically snapshotted there (see snapshot.py).
+
+Set DATABASE_BACKEND=sqlite to swap in the durable backend from sqlite_store.py,
+which exposes the same function API.
 """
 
 import hashlib
-from datetime import datetime
+import heapq
+import hmac
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from bisect import bisect_left
+from datetime import date, datetime, timedelta
+from itertools import islice
+from operator import itemgetter
 from typing import Optional
 
+import rollups
+from contacts import extract_contacts, normalize_contact
+import snapshot
+from archive import Archive
+from text_index import InvertedIndex
+from pagination import (
+    InvalidCursor, cursor_id, decode_cursor, next_activity_cursor, next_cursor,
+)
+
+BACKEND = "memory"
+
+# ─── Record Log ──────────────────────────────────────────────────────────────
+
+_record_id = itemgetter("id")
+
+
+class RecordLog:
+    """
+    Append-only list of records that reads newest first.
+    Appends are O(1); reads walk the backing list from the end, so callers
+    keep newest-first semantics without paying for list.insert(0, ...).
+    Ids are assigned in append order, so a keyset page (id < cursor) is a
+    bisect plus O(limit) slice. Primary logs are created with indexed=True and
+    also keep an id -> record dict for O(1) get().
+
+    Thread safety: writers (append / pop_oldest) must hold _store_lock. Readers
+    take no lock: each read works on one reference to the backing list, and
+    pop_oldest swaps in a new list instead of shifting the old one, so a
+    concurrent reader never sees indices move under it.
+    """
+
+    __slots__ = ("_items", "_by_id")
+
+    def __init__(self, items=(), indexed=False):
+        self._items = list(items)
+        self._by_id = {_record_id(r): r for r in self._items} if indexed else None
+
+    def append(self, record):
+        self._items.append(record)
+        if self._by_id is not None:
+            self._by_id[record["id"]] = record
+
+    def get(self, record_id):
+        return self._by_id.get(record_id)
+
+    def latest(self, limit, before_id=None):
+        """Return up to `limit` records, newest first, optionally only those with id < before_id."""
+        if limit <= 0:
+            return []
+        items = self._items
+        if before_id is None:
+            return items[:-limit - 1:-1]
+        end = bisect_left(items, before_id, key=_record_id)
+        return items[max(end - limit, 0):end][::-1]
+
+    def iter_before(self, before_id=None):
+        """Newest-first iterator, optionally starting below `before_id`."""
+        items = self._items
+        if before_id is None:
+            return reversed(items)
+        end = bisect_left(items, before_id, key=_record_id)
+        return (items[i] for i in range(end - 1, -1, -1))
+
+    def iter_oldest(self):
+        """Oldest-first iterator (the eviction order)."""
+        return iter(self._items)
+
+    def iter_after(self, after_id=0):
+        """Oldest-first iterator over records with id > after_id."""
+        items = self._items
+        start = bisect_left(items, after_id + 1, key=_record_id)
+        return (items[i] for i in range(start, len(items)))
+
+    def count_before(self, before_id):
+        """Number of records with id < before_id."""
+        return bisect_left(self._items, before_id, key=_record_id)
+
+    def pop_oldest(self, count):
+        """Remove and return the `count` oldest records."""
+        removed = self._items[:count]
+        self._items = self._items[count:]
+        if self._by_id is not None:
+            for r in removed:
+                del self._by_id[_record_id(r)]
+        return removed
+
+    def rows(self):
+        """Shallow copy of every record, oldest first."""
+        return list(self._items)
+
+    def __iter__(self):
+        return reversed(self._items)
+
+    def __len__(self):
+        return len(self._items)
+
+
+_EMPTY_LOG = RecordLog()
+
+# ─── Compact Records ─────────────────────────────────────────────────────────
+# URL checks, deepfake scans and metadata entries are the high-volume tables, so
+# they are stored as slotted objects instead of dicts: no per-row key strings,
+# interned status strings, epoch-microsecond timestamps and raw threat lists
+# instead of a JSON string. Getters hand out plain dicts via to_dict().
+
+def _now_us():
+    return time.time_ns() // 1000
+
+def _iso(ts_us):
+    return datetime.fromtimestamp(ts_us // 1_000_000).replace(microsecond=ts_us % 1_000_000).isoformat()
+
+def _parse_us(iso):
+    return round(datetime.fromisoformat(iso).timestamp() * 1_000_000)
+
+def _day(ts_us):
+    return date.fromtimestamp(ts_us // 1_000_000).isoformat()
+
+
+class _CompactRecord:
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        # Lets shared code (keyset bisect, activity feed) read fields like a dict
+        return getattr(self, key)
+
+
+class URLCheck(_CompactRecord):
+    __slots__ = ("id", "url", "status", "threats", "citizen_id", "ts")
+    imported_at = None      # set on ImportedURLCheck only
+
+    def __init__(self, id, url, status, threats, citizen_id, ts):
+        self.id = id
+        self.url = url
+        self.status = sys.intern(status)
+        self.threats = threats or None
+        self.citizen_id = citizen_id
+        self.ts = ts
+
+    def __reduce__(self):
+        return URLCheck, (self.id, self.url, self.status, self.threats, self.citizen_id, self.ts)
+
+    @property
+    def checked_at(self):
+        return _iso(self.ts)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "url": self.url,
+            "status": self.status,
+            "threats_json": json.dumps(self.threats) if self.threats else "[]",
+            "citizen_id": self.citizen_id,
+            "checked_at": self.checked_at,
+            "imported_at": self.imported_at
+        }
+
+
+class DeepfakeScan(_CompactRecord):
+    __slots__ = ("id", "filename", "prediction", "confidence", "citizen_id", "ts")
+    imported_at = None      # set on ImportedDeepfakeScan only
+
+    def __init__(self, id, filename, prediction, confidence, citizen_id, ts):
+        self.id = id
+        self.filename = filename
+        self.prediction = sys.intern(prediction)
+        self.confidence = confidence
+        self.citizen_id = citizen_id
+        self.ts = ts
+
+    def __reduce__(self):
+        return DeepfakeScan, (self.id, self.filename, self.prediction, self.confidence, self.citizen_id, self.ts)
+
+    @property
+    def scanned_at(self):
+        return _iso(self.ts)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "filename": self.filename,
+            "prediction": self.prediction,
+            "confidence": self.confidence,
+            "citizen_id": self.citizen_id,
+            "scanned_at": self.scanned_at,
+            "imported_at": self.imported_at
+        }
+
+
+# Migrated rows keep their original ts (history, exports, daily counts) and
+# also remember when they were imported, which is where the activity feed
+# places them: ids and import times ascend together, original times don't.
+
+class ImportedURLCheck(URLCheck):
+    __slots__ = ("imported_ts",)
+
+    def __init__(self, id, url, status, threats, citizen_id, ts, imported_ts):
+        super().__init__(id, url, status, threats, citizen_id, ts)
+        self.imported_ts = imported_ts
+
+    def __reduce__(self):
+        return ImportedURLCheck, (self.id, self.url, self.status, self.threats, self.citizen_id, self.ts,
+                                  self.imported_ts)
+
+    @property
+    def imported_at(self):
+        return _iso(self.imported_ts)
+
+
+class ImportedDeepfakeScan(DeepfakeScan):
+    __slots__ = ("imported_ts",)
+
+    def __init__(self, id, filename, prediction, confidence, citizen_id, ts, imported_ts):
+        super().__init__(id, filename, prediction, confidence, citizen_id, ts)
+        self.imported_ts = imported_ts
+
+    def __reduce__(self):
+        return ImportedDeepfakeScan, (self.id, self.filename, self.prediction, self.confidence, self.citizen_id,
+                                      self.ts, self.imported_ts)
+
+    @property
+    def imported_at(self):
+        return _iso(self.imported_ts)
+
+
+class MetadataEntry(_CompactRecord):
+    __slots__ = ("id", "user_id", "user_type", "action", "details", "ts")
+
+    def __init__(self, id, user_id, user_type, action, details, ts):
+        self.id = id
+        self.user_id = user_id
+        self.user_type = sys.intern(user_type)
+        self.action = sys.intern(action)
+        self.details = details
+        self.ts = ts
+
+    def __reduce__(self):
+        return MetadataEntry, (self.id, self.user_id, self.user_type, self.action, self.details, self.ts)
+
+    @property
+    def created_at(self):
+        return _iso(self.ts)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "user_id": self.user_id,
+            "user_type": self.user_type,
+            "action": self.action,
+            "details": self.details,
+            "created_at": self.created_at
+        }
+
+
+def _dicts(records):
+    return [r.to_dict() for r in records]
+
 # ─── In-Memory Storage ────────────────────────────────────────────────────────
 
-_officials = []   # list of dicts
-_citizens = []     # list of dicts
-_alerts = []       # list of dicts
-_url_checks = []   # list of dicts
-_deepfake_scans = []
-_fraud_reports = []
-_chat_sessions = []
-_document_analyses = []
-_news_intel_queries = []
-_metadata_log = []
+# Primary tables: newest-first logs, each with an id -> record index
+_officials = RecordLog(indexed=True)
+_citizens = RecordLog(indexed=True)
+_alerts = RecordLog(indexed=True)
+_url_checks = RecordLog(indexed=True)
+_deepfake_scans = RecordLog(indexed=True)
+_fraud_reports = RecordLog(indexed=True)
+_chat_sessions = RecordLog(indexed=True)
+_document_analyses = RecordLog(indexed=True)
+_news_intel_queries = RecordLog(indexed=True)
+_metadata_log = RecordLog(indexed=True)
+
+# Per-user secondary indexes (newest first), kept alongside the global lists
+# so history lookups cost O(limit) instead of a scan over every record.
+_url_checks_by_citizen = {}
+_deepfake_scans_by_citizen = {}
+_fraud_reports_by_citizen = {}
+_chat_sessions_by_citizen = {}
+_document_analyses_by_citizen = {}
+_news_intel_by_user = {}
+_metadata_by_user = {}   # keyed by (user_id, user_type)
+_officials_by_username = {}   # username -> official
+_citizens_by_phone = {}       # phone -> citizen
+_fraud_text = InvertedIndex()  # full-text search over fraud reports
+_reports_by_contact = {}       # normalized phone / UPI / email / URL -> fraud report ids
+
+# Dashboard counters, maintained on insert and status change so /dashboard-stats
+# never scans the tables.
+_counters = {"unsafe_urls": 0, "deepfakes_detected": 0, "pending_reports": 0}
+
+# Rolling per-day activity buckets: "YYYY-MM-DD" -> {"url_checks": n, "deepfake_scans": n}
+DAILY_BUCKET_DAYS = 30
+_daily_counts = {}
 
 _next_id = {
     "official": 1, "citizen": 1, "alert": 1, "url_check": 1,
@@ -27,9 +326,16 @@ _next_id = {
     "document": 1, "news": 1, "metadata": 1
 }
 
+# Every mutation holds this lock while it assigns ids, applies the change and
+# journals it, so the journal order matches the in-memory order and a snapshot
+# can take a consistent cut.
+_store_lock = threading.RLock()
+
 def _get_id(key):
-    _id = _next_id[key]
-    _next_id[key] += 1
+    # Re-entrant, so callers already holding the lock pay almost nothing
+    with _store_lock:
+        _id = _next_id[key]
+        _next_id[key] += 1
     return _id
 
 def _now():
@@ -38,332 +344,1088 @@ def _now():
 def _hash(pw):
     return hashlib.sha256(pw.encode()).hexdigest()
 
+def _bump_daily(kind, day, n=1):
+    bucket = _daily_counts.get(day)
+    if bucket is None:
+        if n < 0:
+            return      # the day has already left the window
+        bucket = _daily_counts[day] = {"url_checks": 0, "deepfake_scans": 0}
+        if len(_daily_counts) > DAILY_BUCKET_DAYS:
+            del _daily_counts[min(_daily_counts)]
+    bucket[kind] += n
+
+def _index(index, key, record):
+    log = index.get(key)
+    if log is None:
+        log = index[key] = RecordLog()
+    log.append(record)
 
-# ─── Init (no-op) ────────────────────────────────────────────────────────────
 
-def init_db():
-    """No-op — nothing to initialize."""
+# ─── Init ────────────────────────────────────────────────────────────────────
+
+def init_db(snapshot_dir=None, archive_path=None):
+    """
+    Restore from SNAPSHOT_DIR (snapshot + journal replay) when persistence is
+    enabled, open the ARCHIVE_PATH spill archive, then seed the default admin.
+    Without either, data lives only in RAM and resets on restart.
+    """
+    archive_path = archive_path or ARCHIVE_PATH
+    if archive_path and _archive is None:
+        _open_archive(archive_path)
+    snapshot_dir = snapshot_dir or SNAPSHOT_DIR
+    if snapshot_dir and _persist["dir"] is None:
+        _restore(snapshot_dir)
+    if _archive is not None:
+        _start_retention()
     # Seed a default admin official
     if not _officials:
-        _officials.append({
-            "id": _get_id("official"),
-            "username": "admin",
-            "password_hash": _hash("admin123"),
-            "name": "IG Cyber Crime",
-            "created_at": _now()
-        })
-    print("✅ In-memory storage ready (no database)")
+        register_official("admin", "admin123", "IG Cyber Crime")
+    if _persist["dir"]:
+        print(f"✅ In-memory storage ready (snapshots in {_persist['dir']})")
+    else:
+        print("✅ In-memory storage ready (no database)")
+
+
+def load_read_only(snapshot_dir=None, archive_path=None):
+    """
+    Load SNAPSHOT_DIR / ARCHIVE_PATH for an offline reader (analytics_export.py)
+    while a server may own them: nothing is journalled, snapshotted or evicted,
+    so the server's files are never written.
+    """
+    archive_path = archive_path or ARCHIVE_PATH
+    if archive_path and _archive is None:
+        _open_archive(archive_path)
+    snapshot_dir = snapshot_dir or SNAPSHOT_DIR
+    if snapshot_dir and os.path.isdir(snapshot_dir):
+        with _store_lock:
+            _load(snapshot_dir)
 
 
 # ─── Auth ─────────────────────────────────────────────────────────────────────
 
 def login_official(username, password):
-    pw_hash = _hash(password)
-    for o in _officials:
-        if o["username"] == username and o["password_hash"] == pw_hash:
-            return {"success": True, "official_id": o["id"], "name": o["name"], "username": o["username"]}
+    o = _officials_by_username.get(username)
+    if o and hmac.compare_digest(o["password_hash"], _hash(password)):
+        return {"success": True, "official_id": o["id"], "name": o["name"], "username": o["username"]}
     return {"success": False, "error": "Invalid username or password"}
 
+def _add_official(official):
+    _officials.append(official)
+    _officials_by_username[official["username"]] = official
+
 def register_official(username, password, name="Official"):
-    for o in _officials:
-        if o["username"] == username:
+    pw_hash = _hash(password)
+    with _store_lock:
+        if username in _officials_by_username:
             return {"success": False, "error": "Username already exists"}
-    official = {
-        "id": _get_id("official"),
-        "username": username,
-        "password_hash": _hash(password),
-        "name": name,
-        "created_at": _now()
-    }
-    _officials.append(official)
+        official = {
+            "id": _get_id("official"),
+            "username": username,
+            "password_hash": pw_hash,
+            "name": name,
+            "created_at": _now()
+        }
+        _add_official(official)
+        _journal_op("add", "officials", official)
     return {"success": True, "official_id": official["id"], "name": name, "username": username}
 
 def login_citizen(phone, password):
-    pw_hash = _hash(password)
-    for c in _citizens:
-        if c["phone"] == phone and c["password_hash"] == pw_hash:
-            return {"success": True, "citizen_id": c["id"], "name": c["name"], "phone": c["phone"]}
+    c = _citizens_by_phone.get(phone)
+    if c and hmac.compare_digest(c["password_hash"], _hash(password)):
+        return {"success": True, "citizen_id": c["id"], "name": c["name"], "phone": c["phone"]}
     return {"success": False, "error": "Invalid phone or password"}
 
+def _add_citizen(citizen):
+    _citizens.append(citizen)
+    _citizens_by_phone[citizen["phone"]] = citizen
+
 def register_citizen(phone, password, name="Citizen"):
-    for c in _citizens:
-        if c["phone"] == phone:
+    pw_hash = _hash(password)
+    with _store_lock:
+        if phone in _citizens_by_phone:
             return {"success": False, "error": "Phone already registered"}
-    citizen = {
-        "id": _get_id("citizen"),
-        "phone": phone,
-        "password_hash": _hash(password),
-        "name": name,
-        "created_at": _now()
-    }
-    _citizens.append(citizen)
+        citizen = {
+            "id": _get_id("citizen"),
+            "phone": phone,
+            "password_hash": pw_hash,
+            "name": name,
+            "created_at": _now()
+        }
+        _add_citizen(citizen)
+        _journal_op("add", "citizens", citizen)
     return {"success": True, "citizen_id": citizen["id"], "name": name, "phone": phone}
 
 
 # ─── URL Checks ──────────────────────────────────────────────────────────────
 
+def _add_url_check(record):
+    _url_checks.append(record)
+    _index(_url_checks_by_citizen, record.citizen_id, record)
+    if record.status == "UNSAFE":
+        _counters["unsafe_urls"] += 1
+    _bump_daily("url_checks", _day(record.ts))
+
 def insert_url_check(url, status, threats, citizen_id=0):
-    import json
-    record = {
-        "id": _get_id("url_check"),
-        "url": url,
-        "status": status,
-        "threats_json": json.dumps(threats) if threats else "[]",
-        "citizen_id": citizen_id,
-        "checked_at": _now()
-    }
-    _url_checks.insert(0, record)
-    return record["id"]
+    with _store_lock:
+        record = URLCheck(_get_id("url_check"), url, status, threats, citizen_id, _now_us())
+        _add_url_check(record)
+        _journal_op("add", "url_checks", record)
+        _retain("url_checks", record)
+    return record.id
 
-def get_recent_url_checks(citizen_id=0, limit=20):
-    if citizen_id:
-        return [u for u in _url_checks if u["citizen_id"] == citizen_id][:limit]
-    return _url_checks[:limit]
+def get_recent_url_checks(citizen_id=0, limit=20, cursor=None):
+    return _dicts(_history("url_checks", citizen_id or None, limit, cursor))
 
 
 # ─── Deepfake Scans ──────────────────────────────────────────────────────────
 
+def _add_deepfake_scan(record):
+    _deepfake_scans.append(record)
+    _index(_deepfake_scans_by_citizen, record.citizen_id, record)
+    if record.prediction == "FAKE":
+        _counters["deepfakes_detected"] += 1
+    _bump_daily("deepfake_scans", _day(record.ts))
+
 def insert_deepfake_scan(filename, prediction, confidence, citizen_id=0):
-    record = {
-        "id": _get_id("deepfake"),
-        "filename": filename,
-        "prediction": prediction,
-        "confidence": confidence,
-        "citizen_id": citizen_id,
-        "scanned_at": _now()
-    }
-    _deepfake_scans.insert(0, record)
-    return record["id"]
+    with _store_lock:
+        record = DeepfakeScan(_get_id("deepfake"), filename, prediction, confidence, citizen_id, _now_us())
+        _add_deepfake_scan(record)
+        _journal_op("add", "deepfake_scans", record)
+        _retain("deepfake_scans", record)
+    return record.id
 
-def get_recent_deepfake_scans(citizen_id=0, limit=20):
-    if citizen_id:
-        return [s for s in _deepfake_scans if s["citizen_id"] == citizen_id][:limit]
-    return _deepfake_scans[:limit]
+def get_recent_deepfake_scans(citizen_id=0, limit=20, cursor=None):
+    return _dicts(_history("deepfake_scans", citizen_id or None, limit, cursor))
 
 
 # ─── Fraud Reports ───────────────────────────────────────────────────────────
 
+def _add_fraud_report(record):
+    _fraud_reports.append(record)
+    _index(_fraud_reports_by_citizen, record["citizen_id"], record)
+    if record["status"] == "pending":
+        _counters["pending_reports"] += 1
+    _fraud_text.add(record["id"], " ".join(
+        (record["fraud_type"], record["contact_info"], record["details"], record["location"])))
+    _rollup_add(record)
+    for _, contact in extract_contacts(record["contact_info"]):
+        ids = _reports_by_contact.get(contact)
+        if ids is None:
+            ids = _reports_by_contact[contact] = []
+        ids.append(record["id"])
+
 def insert_fraud_report(fraud_type, contact_info, details, amount_lost=0, location="Unknown", citizen_id=0):
-    record = {
-        "id": _get_id("fraud_report"),
-        "fraud_type": fraud_type,
-        "contact_info": contact_info,
-        "details": details,
-        "amount_lost": amount_lost,
-        "location": location,
-        "citizen_id": citizen_id,
-        "status": "pending",
-        "created_at": _now()
-    }
-    _fraud_reports.insert(0, record)
+    with _store_lock:
+        record = {
+            "id": _get_id("fraud_report"),
+            "fraud_type": fraud_type,
+            "contact_info": contact_info,
+            "details": details,
+            "amount_lost": amount_lost,
+            "location": location,
+            "citizen_id": citizen_id,
+            "status": "pending",
+            "created_at": _now(),
+            "imported_at": None
+        }
+        _add_fraud_report(record)
+        _journal_op("add", "fraud_reports", record)
     return record["id"]
 
-def get_fraud_reports(citizen_id=None, limit=50):
+def get_fraud_reports(citizen_id=None, limit=50, cursor=None):
     if citizen_id:
-        return [r for r in _fraud_reports if r["citizen_id"] == citizen_id][:limit]
-    return _fraud_reports[:limit]
+        return _fraud_reports_by_citizen.get(citizen_id, _EMPTY_LOG).latest(limit, cursor_id(cursor))
+    return _fraud_reports.latest(limit, cursor_id(cursor))
+
+def search_fraud_reports(query, limit=20):
+    """Fraud reports ranked by BM25 relevance to `query` (type, contact, details, location)."""
+    return [{**_fraud_reports.get(report_id), "score": round(score, 4)}
+            for report_id, score in _fraud_text.search(query, limit)]
+
+def get_contact_reports(contact):
+    """
+    "Has this been reported?" for one phone number, UPI ID, email or URL.
+    Returns None when `contact` isn't a recognisable identifier.
+    """
+    found = normalize_contact(contact)
+    if found is None:
+        return None
+    kind, key = found
+    ids = _reports_by_contact.get(key, ())
+    last = _fraud_reports.get(ids[-1]) if ids else None
+    return {
+        "contact": key,
+        "kind": kind,
+        "report_count": len(ids),
+        "last_reported_at": last["created_at"] if last else None,
+    }
+
+def _set_report_status(r, status):
+    if r["status"] != status:
+        if r["status"] == "pending":
+            _counters["pending_reports"] -= 1
+        elif status == "pending":
+            _counters["pending_reports"] += 1
+        _rollup_status(r, r["status"], status)
+    r["status"] = status
 
 def update_fraud_report_status(report_id, status, citizen_id=None):
-    for r in _fraud_reports:
-        if r["id"] == report_id:
-            r["status"] = status
-            return
+    """Returns False when no report has that id."""
+    with _store_lock:
+        r = _fraud_reports.get(report_id)
+        if r is None:
+            return False
+        _set_report_status(r, status)
+        _journal_op("fraud_status", report_id, status)
+    return True
+
+def update_fraud_report_statuses(report_ids, status):
+    """Bulk status change for the officials' workflow; returns the ids that were updated."""
+    updated = []
+    with _store_lock:
+        for report_id in report_ids:
+            r = _fraud_reports.get(report_id)
+            if r is not None:
+                _set_report_status(r, status)
+                _journal_op("fraud_status", report_id, status)
+                updated.append(report_id)
+    return updated
+
+
+# ─── Fraud Rollups ───────────────────────────────────────────────────────────
+# Per-period aggregates of fraud reports (count, amount lost, and counts by
+# type / location / status), maintained on insert and status change so
+# /fraud-stats never walks _fraud_reports. A report stays in the periods of
+# its created_at; a status change moves it between status counts there.
+# Hourly buckets older than rollups.HOURLY_DAYS are pruned.
+
+_fraud_totals = rollups.new_rollup()
+_fraud_rollups = {period: {} for period in rollups.PERIODS}
+
+def _rollups_for(record, create=False):
+    yield _fraud_totals
+    created = datetime.fromisoformat(record["created_at"])
+    for period, buckets in _fraud_rollups.items():
+        key = rollups.period_key(period, created)
+        bucket = buckets.get(key)
+        if bucket is None:
+            if not create:
+                continue   # hourly bucket already pruned
+            bucket = buckets[key] = rollups.new_rollup()
+            if period == "hour":
+                cutoff = rollups.period_key("hour", datetime.now() - timedelta(days=rollups.HOURLY_DAYS))
+                for stale in [k for k in buckets if k < cutoff]:
+                    del buckets[stale]
+        yield bucket
+
+def _rollup_add(record):
+    for rollup in _rollups_for(record, create=True):
+        rollup["count"] += 1
+        rollup["amount_lost"] += record["amount_lost"] or 0
+        rollups.tally(rollup["by_type"], record["fraud_type"], 1)
+        rollups.tally(rollup["by_location"], record["location"], 1)
+        rollups.tally(rollup["by_status"], record["status"], 1)
+
+def _rollup_status(record, old, new):
+    for rollup in _rollups_for(record):
+        rollups.tally(rollup["by_status"], old, -1)
+        rollups.tally(rollup["by_status"], new, 1)
+
+def get_fraud_stats(period="day", periods=30):
+    """All-time fraud report totals plus a zero-filled series for the last `periods` periods, oldest first."""
+    keys = rollups.recent_periods(period, periods)
+    buckets = _fraud_rollups[period]
+    empty = rollups.new_rollup()
+    with _store_lock:
+        return {
+            "period": period,
+            "totals": rollups.copy_rollup(_fraud_totals),
+            "series": [{"period": key, **rollups.copy_rollup(buckets.get(key, empty))} for key in keys],
+        }
 
 
 # ─── Alerts (shared) ─────────────────────────────────────────────────────────
 
+def _add_alert(record):
+    _alerts.append(record)
+
 def insert_alert(title, description, severity="medium", location="Pan India", alert_type="general"):
-    record = {
-        "id": _get_id("alert"),
-        "title": title,
-        "description": description,
-        "severity": severity,
-        "location": location,
-        "type": alert_type,
-        "active": True,
-        "created_at": _now()
-    }
-    _alerts.insert(0, record)
+    with _store_lock:
+        record = {
+            "id": _get_id("alert"),
+            "title": title,
+            "description": description,
+            "severity": severity,
+            "location": location,
+            "type": alert_type,
+            "active": True,
+            "created_at": _now()
+        }
+        _add_alert(record)
+        _journal_op("add", "alerts", record)
     return record["id"]
 
-def get_alerts(active_only=True, limit=50):
+def get_alerts(active_only=True, limit=50, cursor=None):
     if active_only:
-        return [a for a in _alerts if a.get("active", True)][:limit]
-    return _alerts[:limit]
+        active = (a for a in _alerts.iter_before(cursor_id(cursor)) if a.get("active", True))
+        return list(islice(active, max(limit, 0)))
+    return _alerts.latest(limit, cursor_id(cursor))
 
 def toggle_alert(alert_id, active=True):
-    for a in _alerts:
-        if a["id"] == alert_id:
-            a["active"] = active
-            return
+    """Returns False when no alert has that id."""
+    with _store_lock:
+        a = _alerts.get(alert_id)
+        if a is None:
+            return False
+        a["active"] = active
+        _journal_op("alert_active", alert_id, active)
+    return True
 
 
 # ─── Chat Sessions ───────────────────────────────────────────────────────────
 
-def save_chat_session(citizen_id, messages, session_id=None):
-    import json
-    if session_id:
-        for s in _chat_sessions:
-            if s["id"] == session_id:
-                s["messages_json"] = json.dumps(messages)
-                s["updated_at"] = _now()
-                # Update title from first user message
-                for m in messages:
-                    if m.get("role") == "user":
-                        s["title"] = m["content"][:50]
-                        break
-                return session_id
-
-    title = "New Chat"
+def _chat_title(messages, default="New Chat"):
     for m in messages:
         if m.get("role") == "user":
-            title = m["content"][:50]
-            break
+            return m["content"][:50]
+    return default
 
-    record = {
-        "id": _get_id("chat_session"),
-        "citizen_id": citizen_id,
-        "title": title,
-        "messages_json": json.dumps(messages),
-        "created_at": _now(),
-        "updated_at": _now()
-    }
-    _chat_sessions.insert(0, record)
+def _add_chat_session(record):
+    _chat_sessions.append(record)
+    _index(_chat_sessions_by_citizen, record["citizen_id"], record)
+
+def _set_chat_messages(s, start, new_messages, title, updated_at):
+    # Idempotent (truncate to `start`, then extend) so journal replay over a
+    # snapshot that already holds some of these messages converges.
+    del s["messages"][start:]
+    s["messages"].extend(new_messages)
+    s["title"] = title
+    s["updated_at"] = updated_at
+
+def save_chat_session(citizen_id, messages, session_id=None):
+    """
+    Create a session, or bring an existing one up to date with `messages`.
+    Clients resend the whole conversation each turn; only the messages past
+    what is already stored get appended, so a turn costs O(new messages).
+    """
+    with _store_lock:
+        if session_id:
+            s = _chat_sessions.get(session_id)
+            if s is not None:
+                # Append past what is stored; a shorter (edited/truncated) history replaces it
+                start = len(s["messages"]) if len(messages) >= len(s["messages"]) else 0
+                title = s["title"] if start and s["title"] != "New Chat" else _chat_title(messages)
+                new_messages = [dict(m) for m in messages[start:]]
+                _set_chat_messages(s, start, new_messages, title, _now())
+                _journal_op("chat_messages", session_id, start, new_messages, title, s["updated_at"])
+                return session_id
+
+        record = {
+            "id": _get_id("chat_session"),
+            "citizen_id": citizen_id,
+            "title": _chat_title(messages),
+            "messages": [dict(m) for m in messages],
+            "created_at": _now(),
+            "updated_at": _now()
+        }
+        _add_chat_session(record)
+        _journal_op("add", "chat_sessions", record)
     return record["id"]
 
-def get_chat_history(citizen_id, limit=20):
-    import json
-    results = [s for s in _chat_sessions if s["citizen_id"] == citizen_id][:limit]
+def get_chat_history(citizen_id, limit=20, cursor=None):
+    results = _chat_sessions_by_citizen.get(citizen_id, _EMPTY_LOG).latest(limit, cursor_id(cursor))
     return [{"id": s["id"], "title": s["title"], "updated_at": s["updated_at"]} for s in results]
 
-def get_chat_session(session_id, citizen_id):
-    import json
-    for s in _chat_sessions:
-        if s["id"] == session_id and s["citizen_id"] == citizen_id:
-            return {
-                "id": s["id"],
-                "title": s["title"],
-                "messages": json.loads(s["messages_json"]),
-                "updated_at": s["updated_at"]
-            }
-    return None
+def get_chat_session(session_id, citizen_id, start=0, limit=None):
+    """
+    Return a session with messages[start:start + limit]. A negative `start`
+    counts from the end, so start=-10 is the last ten messages.
+    """
+    s = _chat_sessions.get(session_id)
+    if s is None or s["citizen_id"] != citizen_id:
+        return None
+    messages = s["messages"]
+    if start < 0:
+        start = max(len(messages) + start, 0)
+    stop = len(messages) if limit is None else start + max(limit, 0)
+    return {
+        "id": s["id"],
+        "title": s["title"],
+        "messages": messages[start:stop],
+        "message_count": len(messages),
+        "updated_at": s["updated_at"]
+    }
 
 
 # ─── Document Analysis ───────────────────────────────────────────────────────
 
+def _add_document_analysis(record):
+    _document_analyses.append(record)
+    _index(_document_analyses_by_citizen, record["citizen_id"], record)
+
 def save_document_analysis(filename, result, citizen_id=0):
-    import json
-    record = {
-        "id": _get_id("document"),
-        "filename": filename,
-        "result_json": json.dumps(result),
-        "citizen_id": citizen_id,
-        "created_at": _now()
-    }
-    _document_analyses.insert(0, record)
+    analysis = result.get("analysis") if isinstance(result, dict) else None
+    with _store_lock:
+        record = {
+            "id": _get_id("document"),
+            "filename": filename,
+            "risk_level": analysis.get("risk_level", "Unknown") if isinstance(analysis, dict) else "Unknown",
+            "result": result,
+            "citizen_id": citizen_id,
+            "created_at": _now()
+        }
+        _add_document_analysis(record)
+        _journal_op("add", "document_analyses", record)
+        _retain("document_analyses", record)
     return record["id"]
 
-def get_document_analyses(citizen_id, limit=20):
-    return [d for d in _document_analyses if d["citizen_id"] == citizen_id][:limit]
+def _document_summary(d):
+    return {"id": d["id"], "filename": d["filename"], "risk_level": d["risk_level"], "created_at": d["created_at"]}
+
+def get_document_analyses(citizen_id, limit=20, cursor=None):
+    """History list view: summaries only; fetch the full result with get_document_analysis."""
+    return [_document_summary(d) for d in _history("document_analyses", citizen_id, limit, cursor)]
+
+def get_document_analysis(analysis_id, citizen_id):
+    d = _lookup("document_analyses", analysis_id)
+    if d is None or d["citizen_id"] != citizen_id:
+        return None
+    return {**_document_summary(d), "result": d["result"]}
 
 
 # ─── News Intelligence ───────────────────────────────────────────────────────
 
+def _add_news_intel(record):
+    _news_intel_queries.append(record)
+    _index(_news_intel_by_user, record["user_id"], record)
+
 def save_news_intel(result, user_type="citizen", user_id=0):
-    import json
-    record = {
-        "id": _get_id("news"),
-        "result_json": json.dumps(result),
-        "user_type": user_type,
-        "user_id": user_id,
-        "created_at": _now()
-    }
-    _news_intel_queries.insert(0, record)
+    analysis = result.get("analysis") if isinstance(result, dict) else None
+    articles = result.get("articles") if isinstance(result, dict) else None
+    with _store_lock:
+        record = {
+            "id": _get_id("news"),
+            "summary": str(analysis.get("summary", ""))[:200] if isinstance(analysis, dict) else "",
+            "article_count": len(articles) if isinstance(articles, list) else 0,
+            "result": result,
+            "user_type": user_type,
+            "user_id": user_id,
+            "created_at": _now()
+        }
+        _add_news_intel(record)
+        _journal_op("add", "news_intel_queries", record)
+        _retain("news_intel_queries", record)
     return record["id"]
 
-def get_news_intel_history(user_id, limit=20):
-    return [n for n in _news_intel_queries if n["user_id"] == user_id][:limit]
+def _news_summary(n):
+    return {"id": n["id"], "summary": n["summary"], "article_count": n["article_count"], "created_at": n["created_at"]}
+
+def get_news_intel_history(user_id, limit=20, cursor=None):
+    """History list view: summaries only; fetch the full result with get_news_intel_entry."""
+    return [_news_summary(n) for n in _history("news_intel_queries", user_id, limit, cursor)]
+
+def get_news_intel_entry(entry_id, user_id):
+    n = _lookup("news_intel_queries", entry_id)
+    if n is None or n["user_id"] != user_id:
+        return None
+    return {**_news_summary(n), "result": n["result"]}
 
 
 # ─── Metadata (no-op for prototyping) ────────────────────────────────────────
 
+def _add_metadata(record):
+    _metadata_log.append(record)
+    _index(_metadata_by_user, (record.user_id, record.user_type), record)
+
 def log_user_metadata(user_id, user_type, action, details=None):
-    record = {
-        "id": _get_id("metadata"),
-        "user_id": user_id,
-        "user_type": user_type,
-        "action": action,
-        "details": details or "",
-        "created_at": _now()
-    }
-    _metadata_log.insert(0, record)
+    with _store_lock:
+        record = MetadataEntry(_get_id("metadata"), user_id, user_type, action, details or "", _now_us())
+        _add_metadata(record)
+        _journal_op("add", "metadata_log", record)
+        _retain("metadata_log", record)
 
-def get_user_metadata(user_id, user_type="citizen", limit=50):
-    return [m for m in _metadata_log if m["user_id"] == user_id and m["user_type"] == user_type][:limit]
+def get_user_metadata(user_id, user_type="citizen", limit=50, cursor=None):
+    return _dicts(_history("metadata_log", (user_id, user_type), limit, cursor))
 
 
 # ─── Dashboard Stats ─────────────────────────────────────────────────────────
 
+def get_daily_counts(days=7):
+    """Per-day URL check / deepfake scan counts for the last `days` days, oldest first."""
+    today = date.today()
+    series = []
+    for offset in range(min(days, DAILY_BUCKET_DAYS) - 1, -1, -1):
+        day = (today - timedelta(days=offset)).isoformat()
+        bucket = _daily_counts.get(day, {"url_checks": 0, "deepfake_scans": 0})
+        series.append({"date": day, **bucket})
+    return series
+
 def get_dashboard_stats():
+    today = _daily_counts.get(date.today().isoformat(), {"url_checks": 0, "deepfake_scans": 0})
     return {
-        "total_url_checks": len(_url_checks),
-        "total_deepfake_scans": len(_deepfake_scans),
+        "total_url_checks": len(_url_checks) + _archived["url_checks"],
+        "total_deepfake_scans": len(_deepfake_scans) + _archived["deepfake_scans"],
         "total_fraud_reports": len(_fraud_reports),
         "total_citizens": len(_citizens),
         "total_officials": len(_officials),
-        "unsafe_urls": sum(1 for u in _url_checks if u["status"] == "UNSAFE"),
-        "deepfakes_detected": sum(1 for s in _deepfake_scans if s["prediction"] == "FAKE"),
-        "pending_reports": sum(1 for r in _fraud_reports if r["status"] == "pending"),
-        "today_url_checks": len(_url_checks),  # simplified for prototyping
-        "today_deepfake_scans": len(_deepfake_scans),
+        "unsafe_urls": _counters["unsafe_urls"],
+        "deepfakes_detected": _counters["deepfakes_detected"],
+        "pending_reports": _counters["pending_reports"],
+        "today_url_checks": today["url_checks"],
+        "today_deepfake_scans": today["deepfake_scans"],
     }
 
 def get_user_stats(citizen_id):
     return {
-        "total_url_checks": sum(1 for u in _url_checks if u["citizen_id"] == citizen_id),
-        "total_deepfake_scans": sum(1 for s in _deepfake_scans if s["citizen_id"] == citizen_id),
-        "total_fraud_reports": sum(1 for r in _fraud_reports if r["citizen_id"] == citizen_id),
-        "total_chat_sessions": sum(1 for c in _chat_sessions if c["citizen_id"] == citizen_id),
+        "total_url_checks": _history_count("url_checks", citizen_id),
+        "total_deepfake_scans": _history_count("deepfake_scans", citizen_id),
+        "total_fraud_reports": len(_fraud_reports_by_citizen.get(citizen_id, _EMPTY_LOG)),
+        "total_chat_sessions": len(_chat_sessions_by_citizen.get(citizen_id, _EMPTY_LOG)),
     }
 
-def get_recent_activity(activity_type=None, limit=20, citizen_id=None):
-    activities = []
+def _url_check_activity(u):
+    return {
+        "id": f"url_check-{u['id']}",
+        "type": "url_check",
+        "description": f"URL checked: {u['url'][:50]}",
+        "status": u["status"],
+        "timestamp": u["imported_at"] or u["checked_at"]
+    }
 
-    for u in _url_checks:
-        if citizen_id and u["citizen_id"] != citizen_id:
-            continue
-        activities.append({
-            "id": f"url_check-{u['id']}",
-            "type": "url_check",
-            "description": f"URL checked: {u['url'][:50]}",
-            "status": u["status"],
-            "timestamp": u["checked_at"]
-        })
-
-    for s in _deepfake_scans:
-        if citizen_id and s["citizen_id"] != citizen_id:
-            continue
-        activities.append({
-            "id": f"deepfake-{s['id']}",
-            "type": "deepfake_scan",
-            "description": f"Deepfake scan: {s['filename']}",
-            "status": s["prediction"],
-            "timestamp": s["scanned_at"]
-        })
-
-    for r in _fraud_reports:
-        if citizen_id and r["citizen_id"] != citizen_id:
+def _deepfake_activity(s):
+    return {
+        "id": f"deepfake-{s['id']}",
+        "type": "deepfake_scan",
+        "description": f"Deepfake scan: {s['filename']}",
+        "status": s["prediction"],
+        "timestamp": s["imported_at"] or s["scanned_at"]
+    }
+
+def _fraud_activity(r):
+    return {
+        "id": f"fraud-{r['id']}",
+        "type": "fraud_report",
+        "description": f"Fraud report: {r['fraud_type']}",
+        "status": r["status"],
+        "timestamp": r.get("imported_at") or r["created_at"]
+    }
+
+# activity type -> (table, row formatter)
+_ACTIVITY_SOURCES = {
+    "url_check": ("url_checks", _url_check_activity),
+    "deepfake_scan": ("deepfake_scans", _deepfake_activity),
+    "fraud_report": ("fraud_reports", _fraud_activity),
+}
+
+def get_recent_activity(activity_type=None, limit=20, citizen_id=None, cursor=None):
+    """
+    Newest-first feed across URL checks, deepfake scans and fraud reports.
+    Imported rows are placed (and timestamped) at the time they were imported,
+    so every source is already newest first and a lazy k-way merge yields the top
+    `limit` rows while only formatting the rows it actually returns. The
+    cursor holds one id bound per source (see pagination.next_activity_cursor).
+    """
+    bounds = decode_cursor(cursor)
+    streams = []
+    for kind, (table, to_activity) in _ACTIVITY_SOURCES.items():
+        if activity_type and kind != activity_type:
             continue
-        activities.append({
-            "id": f"fraud-{r['id']}",
-            "type": "fraud_report",
-            "description": f"Fraud report: {r['fraud_type']}",
-            "status": r["status"],
-            "timestamp": r["created_at"]
-        })
-
-    if activity_type:
-        activities = [a for a in activities if a["type"] == activity_type]
-
-    activities.sort(key=lambda x: x["timestamp"], reverse=True)
-    return activities[:limit]
+        streams.append(map(to_activity, _iter_history(table, citizen_id or None, bounds.get(kind))))
+
+    merged = heapq.merge(*streams, key=itemgetter("timestamp"), reverse=True)
+    return list(islice(merged, max(limit, 0)))
+
+
+# ─── Bulk Import / Export ────────────────────────────────────────────────────
+# Streaming migration path for the high-volume tables. Exports walk the
+# archive and then the hot log oldest first without copying either; imports
+# keep each row's original timestamp and status but get fresh ids and an
+# import time, so imported history sorts by import order.
+
+BULK_TABLES = ("fraud_reports", "url_checks", "deepfake_scans")
+EXPORT_TABLES = BULK_TABLES + ("metadata_log",)   # readable via iter_records
+
+def _export_rows(table, after_id):
+    # Id order is not time order (imported rows keep their original timestamps),
+    # so time ranges are filtered row by row by the caller
+    hot = _HISTORY[table][0].iter_after(after_id)
+    first = next(hot, None)
+    if _archive is not None and table in RETENTION:
+        for record in _archive.iter_after(table, after_id):
+            if first is not None and record["id"] >= first["id"]:
+                break
+            yield record
+    if first is not None:
+        yield first
+        yield from hot
+
+def iter_records(table, after_id=0, since=None, until=None):
+    """
+    Yield every row of `table` with id > after_id as a plain dict, oldest
+    first. `since` (inclusive) and `until` (exclusive) are ISO timestamps
+    that restrict rows by their checked_at / scanned_at / created_at time.
+    """
+    if table not in EXPORT_TABLES:
+        raise ValueError(f"table must be one of {', '.join(EXPORT_TABLES)}")
+    lo = _parse_us(since) if since else None
+    hi = _parse_us(until) if until else None
+    for record in _export_rows(table, after_id):
+        if lo is not None or hi is not None:
+            ts = _record_ts(record)
+            if (lo is not None and ts < lo) or (hi is not None and ts >= hi):
+                continue
+        yield record.to_dict() if isinstance(record, _CompactRecord) else record
+
+def _import_fraud_report(row):
+    return {
+        "id": _get_id("fraud_report"),
+        "fraud_type": str(row["fraud_type"]),
+        "contact_info": str(row["contact_info"]),
+        "details": str(row["details"]),
+        "amount_lost": float(row.get("amount_lost") or 0),
+        "location": str(row.get("location") or "Unknown"),
+        "citizen_id": int(row.get("citizen_id") or 0),
+        "status": str(row.get("status") or "pending"),
+        "created_at": datetime.fromisoformat(row["created_at"]).isoformat() if row.get("created_at") else _now(),
+        "imported_at": _now(),
+    }
+
+def _import_url_check(row):
+    threats = row.get("threats")
+    if threats is None and row.get("threats_json"):
+        threats = json.loads(row["threats_json"])
+    checked_at = row.get("checked_at")
+    now = _now_us()
+    return ImportedURLCheck(_get_id("url_check"), str(row["url"]), str(row["status"]), threats,
+                            int(row.get("citizen_id") or 0), _parse_us(checked_at) if checked_at else now, now)
+
+def _import_deepfake_scan(row):
+    scanned_at = row.get("scanned_at")
+    now = _now_us()
+    return ImportedDeepfakeScan(_get_id("deepfake"), str(row["filename"]), str(row["prediction"]),
+                                float(row["confidence"]), int(row.get("citizen_id") or 0),
+                                _parse_us(scanned_at) if scanned_at else now, now)
+
+_IMPORTERS = {
+    "fraud_reports": _import_fraud_report,
+    "url_checks": _import_url_check,
+    "deepfake_scans": _import_deepfake_scan,
+}
+
+def import_records(table, rows):
+    """
+    Insert a batch of exported/migrated rows into `table` under one lock hold.
+    Returns {"imported": n, "errors": [{"index": i, "error": msg}, ...]} where
+    index is the row's position in `rows`; bad rows are skipped.
+    """
+    if table not in BULK_TABLES:
+        raise ValueError(f"table must be one of {', '.join(BULK_TABLES)}")
+    build, add = _IMPORTERS[table], _TABLES[table][2]
+    imported, errors = 0, []
+    with _store_lock:
+        for i, row in enumerate(rows):
+            try:
+                record = build(row)
+            except (KeyError, TypeError, ValueError) as e:
+                errors.append({"index": i, "error": f"{type(e).__name__}: {e}"})
+                continue
+            add(record)
+            _journal_op("add", table, record)
+            if table in RETENTION:
+                _retain(table, record)
+            imported += 1
+    return {"imported": imported, "errors": errors}
+
+
+# ─── Retention & Archive ─────────────────────────────────────────────────────
+# With ARCHIVE_PATH set, the history tables below are capped by RETENTION:
+# once a table passes any limit, its oldest rows are written to the archive
+# and dropped from RAM down to _LOW_WATER of the limit, so evictions come in
+# batches. Inserts only notice a table is over budget; the retention thread
+# moves the rows EVICT_BATCH at a time and writes the archive outside
+# _store_lock, so neither callers nor other writers wait on SQLite. Reads page
+# through the hot log first, then continue in the archive below the oldest
+# hot id, so a row is never returned twice.
+
+ARCHIVE_PATH = os.getenv("ARCHIVE_PATH")   # unset = keep everything in RAM
+RETENTION_INTERVAL = int(os.getenv("RETENTION_INTERVAL", "60"))  # age sweep, seconds
+
+# Any of max_rows / max_age_days / max_bytes (estimated in-RAM size)
+RETENTION = {
+    "url_checks": {"max_rows": 1_000_000, "max_age_days": 90},
+    "deepfake_scans": {"max_rows": 200_000, "max_age_days": 180},
+    "metadata_log": {"max_rows": 1_000_000, "max_age_days": 30},
+    "news_intel_queries": {"max_rows": 50_000, "max_bytes": 256 * 2**20},
+    "document_analyses": {"max_rows": 50_000, "max_bytes": 256 * 2**20},
+}
+_LOW_WATER = 0.9
+EVICT_BATCH = 5_000     # rows cut from a table per _store_lock hold
+
+# table -> (global log, per-owner index, owner key of a record)
+_HISTORY = {
+    "url_checks": (_url_checks, _url_checks_by_citizen, itemgetter("citizen_id")),
+    "deepfake_scans": (_deepfake_scans, _deepfake_scans_by_citizen, itemgetter("citizen_id")),
+    "fraud_reports": (_fraud_reports, _fraud_reports_by_citizen, itemgetter("citizen_id")),
+    "document_analyses": (_document_analyses, _document_analyses_by_citizen, itemgetter("citizen_id")),
+    "news_intel_queries": (_news_intel_queries, _news_intel_by_user, itemgetter("user_id")),
+    "metadata_log": (_metadata_log, _metadata_by_user, itemgetter("user_id", "user_type")),
+}
+
+_archive = None
+_table_bytes = dict.fromkeys(RETENTION, 0)
+_archived = dict.fromkeys(RETENTION, 0)   # rows per table that live only in the archive
+_evict_lock = threading.Lock()       # one eviction pass at a time (thread or enforce_retention caller)
+_retention_due = threading.Event()   # set by inserts that push a table over budget
+
+def _value_bytes(v):
+    if isinstance(v, dict):
+        return sys.getsizeof(v) + sum(_value_bytes(k) + _value_bytes(x) for k, x in v.items())
+    if isinstance(v, (list, tuple)):
+        return sys.getsizeof(v) + sum(_value_bytes(x) for x in v)
+    return sys.getsizeof(v)
+
+def _record_bytes(r):
+    # Deep for dict rows (document / news results nest), shallow for compact records
+    if isinstance(r, dict):
+        return _value_bytes(r)
+    return sys.getsizeof(r) + sum(sys.getsizeof(getattr(r, name))
+                                  for cls in type(r).__mro__ for name in getattr(cls, "__slots__", ()))
+
+def _record_ts(r):
+    if isinstance(r, _CompactRecord):
+        return r.ts
+    return _parse_us(r["created_at"])
+
+def _iter_history(table, owner, before_id=None):
+    """Newest-first rows of `table` (all owners when owner is None), hot then archived."""
+    log, index, _ = _HISTORY[table]
+    source = log if owner is None else index.get(owner, _EMPTY_LOG)
+    last_id = before_id
+    for record in source.iter_before(before_id):
+        last_id = record["id"]
+        yield record
+    if _archive is not None and table in RETENTION:
+        yield from _archive.iter_before(table, owner, last_id)
+
+def _history(table, owner, limit, cursor):
+    log, index, _ = _HISTORY[table]
+    source = log if owner is None else index.get(owner, _EMPTY_LOG)
+    before_id = cursor_id(cursor)
+    rows = source.latest(limit, before_id)
+    if len(rows) < limit and _archive is not None and table in RETENTION:
+        below = rows[-1]["id"] if rows else before_id
+        rows += _archive.latest(table, owner, limit - len(rows), below)
+    return rows
+
+def _lookup(table, record_id):
+    """Primary-key get that falls back to the archive for evicted rows."""
+    record = _HISTORY[table][0].get(record_id)
+    if record is None and _archive is not None and table in RETENTION:
+        record = _archive.get(table, record_id)
+    return record
+
+def _history_count(table, owner):
+    log, index, _ = _HISTORY[table]
+    hot = len(index.get(owner, _EMPTY_LOG))
+    if _archive is None or table not in RETENTION:
+        return hot
+    return hot + _archive.count(table, owner)
+
+def _over_budget(table, log, policy):
+    if not log:
+        return False
+    if "max_rows" in policy and len(log) > policy["max_rows"]:
+        return True
+    if "max_bytes" in policy and _table_bytes[table] > policy["max_bytes"]:
+        return True
+    if "max_age_days" in policy:
+        oldest = next(log.iter_oldest())
+        return _record_ts(oldest) < _now_us() - policy["max_age_days"] * 86_400_000_000
+    return False
+
+def _eviction_count(table, log, policy, limit):
+    """How many of the oldest rows (at most `limit`) to drop to get back under every limit's low-water mark."""
+    rows_over = len(log) - int(policy["max_rows"] * _LOW_WATER) if "max_rows" in policy else 0
+    bytes_over = _table_bytes[table] - policy["max_bytes"] * _LOW_WATER if "max_bytes" in policy else 0
+    cutoff = None
+    if "max_age_days" in policy:
+        cutoff = _now_us() - int(policy["max_age_days"] * _LOW_WATER * 86_400_000_000)
+    count = freed = 0
+    for r in log.iter_oldest():
+        if count >= limit:
+            break
+        if count >= rows_over and freed >= bytes_over and (cutoff is None or _record_ts(r) >= cutoff):
+            break
+        count += 1
+        freed += _record_bytes(r)
+    return count
+
+# Dashboard counters fed by retained tables: table -> (daily kind, counter, counts toward it)
+_TALLIED = {
+    "url_checks": ("url_checks", "unsafe_urls", lambda r: r["status"] == "UNSAFE"),
+    "deepfake_scans": ("deepfake_scans", "deepfakes_detected", lambda r: r["prediction"] == "FAKE"),
+}
+
+def _tallies(table, records):
+    """What `records` add to the dashboard counters: {counter or "daily:<kind>:<day>": n}."""
+    tallies = {}
+    if table in _TALLIED:
+        kind, counter, counts = _TALLIED[table]
+        for r in records:
+            if counts(r):
+                tallies[counter] = tallies.get(counter, 0) + 1
+            name = f"daily:{kind}:{_day(_record_ts(r))}"
+            tallies[name] = tallies.get(name, 0) + 1
+    return tallies
+
+def _apply_tallies(tallies, sign=1):
+    for name, n in tallies.items():
+        if name.startswith("daily:"):
+            _, kind, day = name.split(":")
+            _bump_daily(kind, day, sign * n)
+        else:
+            _counters[name] += sign * n
+
+def _drop_oldest(table, count):
+    """
+    Remove the `count` oldest rows of `table` from RAM (global log and owner
+    indexes), taking them out of the dashboard counters too.
+    """
+    log, index, owner_of = _HISTORY[table]
+    removed = log.pop_oldest(count)
+    per_owner = {}
+    for r in removed:
+        owner = owner_of(r)
+        per_owner[owner] = per_owner.get(owner, 0) + 1
+    for owner, n in per_owner.items():
+        owner_log = index[owner]
+        owner_log.pop_oldest(n)
+        if not owner_log:
+            del index[owner]
+    if table in _table_bytes:
+        _table_bytes[table] -= sum(map(_record_bytes, removed))
+    _apply_tallies(_tallies(table, removed), -1)
+    return removed
+
+def _evict(table):
+    """Move `table`'s oldest rows to the archive, one EVICT_BATCH slice at a time (caller holds _evict_lock)."""
+    log, _, owner_of = _HISTORY[table]
+    evicted = 0
+    while True:
+        with _store_lock:
+            batch = list(islice(log.iter_oldest(), _eviction_count(table, log, RETENTION[table], EVICT_BATCH)))
+        if not batch:
+            return evicted
+        # Archive first, without the store lock: rows are append-only and only
+        # evictions remove them, so the cut is still the oldest when dropped.
+        # A crash before the drop leaves rows in both places, which reads
+        # tolerate; the reverse order could lose them. The archive keeps the
+        # counter contributions of rows it had not seen before, and they go
+        # back into the counters once the drop has taken them out.
+        archived = _archive.spill(table, batch, owner_of, lambda records: _tallies(table, records))
+        with _store_lock:
+            removed = _drop_oldest(table, len(batch))
+            _apply_tallies(archived)
+            _archived[table] += len(removed)
+            _journal_op("evict", table, removed[-1]["id"])
+        evicted += len(removed)
+
+def _retain(table, record):
+    """Called by inserts (under _store_lock) on retained tables; eviction is left to the retention thread."""
+    if _archive is None:
+        return
+    _table_bytes[table] += _record_bytes(record)
+    if _over_budget(table, _HISTORY[table][0], RETENTION[table]):
+        _retention_due.set()
+
+def enforce_retention():
+    """Apply every policy now; returns {table: rows evicted}."""
+    if _archive is None:
+        return {}
+    with _evict_lock:
+        return {table: _evict(table) for table in RETENTION
+                if _over_budget(table, _HISTORY[table][0], RETENTION[table])}
+
+def _open_archive(path):
+    global _archive
+    _archive = Archive(path)
+    if _archive.needs_tallies:
+        for table in _TALLIED:
+            _archive.add_tallies(_tallies(table, _archive.iter_after(table)))
+    # Archived rows still count on the dashboard, and their ids stay taken
+    _apply_tallies(_archive.tallies())
+    for table in RETENTION:
+        _archived[table] = _archive.count(table)
+        id_key = _TABLES[table][0]
+        _next_id[id_key] = max(_next_id[id_key], _archive.max_id(table) + 1)
+
+def _start_retention():
+    with _store_lock:
+        for table in RETENTION:
+            _table_bytes[table] = sum(map(_record_bytes, _HISTORY[table][0].iter_oldest()))
+    enforce_retention()
+    threading.Thread(target=_retention_loop, name="retention", daemon=True).start()
+
+def _retention_loop():
+    # Woken by inserts that push a table over budget; the RETENTION_INTERVAL
+    # timeout catches rows ageing out of a table that has stopped receiving writes.
+    while True:
+        _retention_due.wait(RETENTION_INTERVAL if RETENTION_INTERVAL > 0 else None)
+        _retention_due.clear()
+        try:
+            enforce_retention()
+        except sqlite3.Error as e:
+            print(f"⚠ Retention sweep failed: {e}")
+
+
+# ─── Snapshot & Journal ──────────────────────────────────────────────────────
+# Optional durability for the in-memory store: every mutation is appended to
+# journal.<seq>, and a background thread periodically writes store.snap and
+# starts a fresh journal. Restart = load the snapshot, replay newer journals.
+
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR")          # unset = no persistence
+SNAPSHOT_INTERVAL = int(os.getenv("SNAPSHOT_INTERVAL", "300"))  # seconds
+_SNAPSHOT_FILE = "store.snap"
+
+_persist = {"dir": None, "journal": None, "seq": 0}
+_snapshot_lock = threading.Lock()      # one snapshot writer at a time
+_snapshot_stop = threading.Event()     # set at shutdown to end _snapshot_loop
+
+# table name -> (_next_id key, log, apply function)
+_TABLES = {
+    "officials": ("official", _officials, _add_official),
+    "citizens": ("citizen", _citizens, _add_citizen),
+    "alerts": ("alert", _alerts, _add_alert),
+    "url_checks": ("url_check", _url_checks, _add_url_check),
+    "deepfake_scans": ("deepfake", _deepfake_scans, _add_deepfake_scan),
+    "fraud_reports": ("fraud_report", _fraud_reports, _add_fraud_report),
+    "chat_sessions": ("chat_session", _chat_sessions, _add_chat_session),
+    "document_analyses": ("document", _document_analyses, _add_document_analysis),
+    "news_intel_queries": ("news", _news_intel_queries, _add_news_intel),
+    "metadata_log": ("metadata", _metadata_log, _add_metadata),
+}
+
+def _journal_op(*op):
+    journal = _persist["journal"]
+    if journal is not None:
+        journal.append(op)
+
+def _apply(op):
+    """Replay one journal op; must stay in step with the mutators above."""
+    kind = op[0]
+    if kind == "add":
+        _, table, record = op
+        id_key, _, add = _TABLES[table]
+        add(record)
+        _next_id[id_key] = max(_next_id[id_key], record["id"] + 1)
+    elif kind == "fraud_status":
+        r = _fraud_reports.get(op[1])
+        if r is not None:
+            _set_report_status(r, op[2])
+    elif kind == "alert_active":
+        a = _alerts.get(op[1])
+        if a is not None:
+            a["active"] = op[2]
+    elif kind == "chat_messages":
+        s = _chat_sessions.get(op[1])
+        if s is not None:
+            _set_chat_messages(s, *op[2:])
+    elif kind == "evict":
+        _, table, last_id = op
+        _drop_oldest(table, _HISTORY[table][0].count_before(last_id + 1))
+
+def _journal_path(directory, seq):
+    return os.path.join(directory, f"journal.{seq}")
+
+def _journal_seqs(directory):
+    seqs = []
+    for name in os.listdir(directory):
+        prefix, _, seq = name.partition(".")
+        if prefix == "journal" and seq.isdigit():
+            seqs.append(int(seq))
+    return sorted(seqs)
+
+def _load(directory):
+    """Replay the snapshot and journals in `directory`; returns (snapshot journal_seq, journal seqs replayed)."""
+    snap_path = os.path.join(directory, _SNAPSHOT_FILE)
+    while True:
+        header, chunks = {"next_id": {}, "journal_seq": 0}, ()
+        if os.path.exists(snap_path):
+            header, chunks = snapshot.read_snapshot(snap_path)
+        # Open every journal before replaying any: a server snapshotting the same
+        # directory meanwhile only unlinks files, which open handles still read
+        try:
+            journals = [(seq, open(_journal_path(directory, seq), "rb"))
+                        for seq in _journal_seqs(directory) if seq >= header["journal_seq"]]
+            break
+        except FileNotFoundError:
+            continue    # pruned by a newer snapshot: start over from that one
+    for table, rows in chunks:
+        add = _TABLES[table][2]
+        for record in rows:
+            add(record)
+    for key, next_id in header["next_id"].items():
+        _next_id[key] = max(_next_id[key], next_id)
+    for _, f in journals:
+        for op in snapshot.read_journal(f):
+            _apply(op)
+    return header["journal_seq"], [seq for seq, _ in journals]
+
+def _restore(directory):
+    os.makedirs(directory, exist_ok=True)
+    start = time.perf_counter()
+    with _store_lock:
+        first_seq, seqs = _load(directory)
+        _persist["dir"] = directory
+        _persist["seq"] = max(seqs, default=first_seq - 1) + 1
+        _persist["journal"] = snapshot.Journal(_journal_path(directory, _persist["seq"]))
+    print(f"📦 Restored in-memory store from {directory} in {time.perf_counter() - start:.2f}s")
+    if SNAPSHOT_INTERVAL > 0:
+        threading.Thread(target=_snapshot_loop, name="snapshot", daemon=True).start()
+
+def snapshot_now(wait=True):
+    """
+    Write a full snapshot and drop the journals it covers. The cut is taken
+    under the store lock by switching to a new journal and copying the table
+    row lists; serialisation then runs chunk by chunk, so writers only ever
+    wait for one chunk. If another snapshot is being written, wait for it
+    (or return False at once when wait is False).
+    """
+    if _persist["dir"] is None or not _snapshot_lock.acquire(blocking=wait):
+        return False
+    try:
+        return _write_snapshot(_persist["dir"])
+    finally:
+        _snapshot_lock.release()
+
+def _write_snapshot(directory):
+    with _store_lock:
+        _persist["journal"].close()
+        _persist["seq"] += 1
+        seq = _persist["seq"]
+        _persist["journal"] = snapshot.Journal(_journal_path(directory, seq))
+        header = {"next_id": dict(_next_id), "journal_seq": seq, "created_at": _now()}
+        tables = {name: log.rows() for name, (_, log, _) in _TABLES.items()}
+    snapshot.write_snapshot(os.path.join(directory, _SNAPSHOT_FILE), header, tables, _store_lock)
+    for old in _journal_seqs(directory):
+        if old < seq:
+            os.remove(_journal_path(directory, old))
+    return True
+
+def final_snapshot():
+    """Stop the snapshot thread and write one last snapshot once any pass in progress ends (shutdown)."""
+    _snapshot_stop.set()
+    return snapshot_now()
+
+def _snapshot_loop():
+    while not _snapshot_stop.wait(SNAPSHOT_INTERVAL):
+        try:
+            snapshot_now(wait=False)     # a manual snapshot is already running: skip this pass
+        except OSError as e:
+            print(f"⚠ Snapshot failed: {e}")
+
+
+# ─── Backend Selection ───────────────────────────────────────────────────────
+
+if os.getenv("DATABASE_BACKEND", "memory").lower() == "sqlite":
+    from sqlite_store import *  # noqa: F401,F403 — same API, durable storage
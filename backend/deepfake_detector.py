@@ -3,6 +3,7 @@ Deepfake Detector — ResNet50 + Bi-LSTM + Attention
 Loads best_model.pth and classifies videos as REAL or FAKE.
 """
 
+import hashlib
 import os
 import cv2
 import torch
@@ -11,6 +12,9 @@ import numpy as np
 from PIL import Image
 from facenet_pytorch import MTCNN
 from torchvision import models
+from frame_sampler import read_frames
+from inference_batcher import InferenceBatcher
+import cpu_optimize
 import warnings
 warnings.filterwarnings("ignore")
 
@@ -110,7 +114,8 @@ class DeepfakeModel(nn.Module):
 
 class DeepfakeDetector:
 
-    def __init__(self, weights_dir="weights", device="auto"):
+    def __init__(self, weights_dir="weights", device="auto", max_batch_size=1, max_wait_ms=10,
+                 cpu_mode="fp32", calibration_videos=None):
 
         self.device = torch.device(
             "cuda" if torch.cuda.is_available() else "cpu"
@@ -128,7 +133,24 @@ class DeepfakeDetector:
             device=self.device,
         )
 
+        self.weights_sha256 = None
         self.model = self._load_model(weights_dir)
+        self.cpu_mode = "fp32"
+
+        if self.model is not None and cpu_mode != "fp32":
+            self._optimize_for_cpu(cpu_mode, calibration_videos or [])
+
+        # Identifies the verdicts this detector gives (weights + inference mode), e.g. for result caching
+        self.model_version = f"{self.weights_sha256[:16]}-{self.cpu_mode}" if self.model is not None else None
+
+        # Face-crop sequences from concurrent predict_video calls share forward passes
+        self.batcher = InferenceBatcher(
+            self._classify_batch,
+            max_batch_size=max_batch_size,
+            max_wait_ms=max_wait_ms,
+            key=lambda sequence: tuple(sequence.shape),
+            name="deepfake-batcher",
+        ) if self.model is not None else None
 
     # --------------------------------------------------------
 
@@ -142,6 +164,12 @@ class DeepfakeDetector:
 
         print(f"📥 Loading model from {weight_path}...")
 
+        digest = hashlib.sha256()
+        with open(weight_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        self.weights_sha256 = digest.hexdigest()
+
         model = DeepfakeModel(num_classes=2, lstm_hidden=256, lstm_layers=2)
 
         state_dict = torch.load(weight_path, map_location="cpu", weights_only=False)
@@ -188,46 +216,36 @@ class DeepfakeDetector:
 
     # --------------------------------------------------------
 
-    def predict_video(self, video_path, num_frames=16):
+    def detect_faces(self, frames):
         """
-        Classify a video as REAL or FAKE using the ResNet50 + BiLSTM + Attention model.
-        Extracts face crops from evenly-sampled frames, then runs the full sequence
-        through the model for a single prediction.
+        MTCNN boxes for each RGB frame, at half resolution for speed, in the
+        frames' own coordinates (None where no face was found). Same-size frames
+        go through MTCNN as one batch, so the image pyramid is built once per
+        scale for the whole clip instead of once per frame.
         """
+        if not frames:
+            return []
 
-        if self.model is None:
-            return {"prediction": "ERROR: No model loaded", "confidence": 0.0}
-
-        cap = cv2.VideoCapture(video_path)
-        total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        h, w = frames[0].shape[:2]
+        if any(frame.shape[:2] != (h, w) for frame in frames):
+            return [boxes for frame in frames for boxes in self.detect_faces([frame])]
 
-        if total <= 0:
-            cap.release()
-            return {"prediction": "ERROR: Could not read video", "confidence": 0.0}
+        halves = [Image.fromarray(frame).resize((w // 2, h // 2)) for frame in frames]
+        batch_boxes, _ = self.detector.detect(halves)
+        return [None if boxes is None else boxes * 2 for boxes in batch_boxes]
 
-        indices = np.linspace(0, total - 1, num_frames, dtype=int)
+    def crop_faces(self, frames):
+        """Padded 224x224 crop of the largest face in each RGB frame; frames without a face are dropped."""
         face_crops = []
 
-        for idx in indices:
-            cap.set(cv2.CAP_PROP_POS_FRAMES, idx)
-            ret, frame = cap.read()
-            if not ret:
-                continue
-
-            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            h, w = frame.shape[:2]
-
-            # Half-resolution face detection for speed
-            img_half = Image.fromarray(frame).resize((w // 2, h // 2))
-            boxes, _ = self.detector.detect(img_half)
-
+        for frame, boxes in zip(frames, self.detect_faces(frames)):
             if boxes is None:
                 continue
 
             # Take the largest face
             areas = [(b[2] - b[0]) * (b[3] - b[1]) for b in boxes]
             bbox = boxes[np.argmax(areas)]
-            xmin, ymin, xmax, ymax = [int(b * 2) for b in bbox]
+            xmin, ymin, xmax, ymax = [int(b) for b in bbox]
 
             # Pad bounding box
             w_box = xmax - xmin
@@ -246,17 +264,55 @@ class DeepfakeDetector:
             crop = self.isotropic_resize(crop, 224)
             face_crops.append(crop)
 
+        return face_crops
+
+    # --------------------------------------------------------
+
+    def _optimize_for_cpu(self, cpu_mode, calibration_videos):
+        """Swap the fp32 model for a cpu_optimize mode, reporting logit parity on the calibration clips."""
+        if self.device.type != "cpu":
+            print(f"⚠ cpu_mode={cpu_mode} ignored on {self.device.type}")
+            return
+
+        sequences = [s for s in (self.face_sequence(path) for path in calibration_videos) if s is not None]
+        print(f"⚙ Optimizing model for CPU ({cpu_mode}, {len(sequences)} calibration clips)...")
+        optimized = cpu_optimize.optimize(self.model, cpu_mode, calibration=sequences)
+
+        if sequences:
+            report = cpu_optimize.parity(self.model, optimized, sequences)
+            print(
+                f"   parity vs fp32: max |Δlogit| {report['max_abs_diff']:.4f}, "
+                f"agreement {report['agreement'] * 100:.1f}%"
+            )
+
+        self.model = optimized
+        self.cpu_mode = cpu_mode
+
+    # --------------------------------------------------------
+
+    def sample_frames(self, video_path, num_frames=16, sampling="auto"):
+        """RGB frames at num_frames evenly spaced positions; None if the video can't be read."""
+        cap = cv2.VideoCapture(video_path)
+        total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+
+        if total <= 0:
+            cap.release()
+            return None
+
+        indices = np.linspace(0, total - 1, num_frames, dtype=int)
+        frames = [cv2.cvtColor(frame, cv2.COLOR_BGR2RGB) for _, frame in read_frames(cap, indices, sampling)]
         cap.release()
+        return frames
 
-        if len(face_crops) == 0:
-            return {"prediction": "UNKNOWN", "confidence": 0.0}
+    def to_sequence(self, face_crops, num_frames=16):
+        """Normalised (T, 3, 224, 224) model input from 224x224 face crops."""
 
         # Pad or truncate to exactly num_frames
         while len(face_crops) < num_frames:
             face_crops.append(face_crops[-1])  # repeat last frame
         face_crops = face_crops[:num_frames]
 
-        # Build tensor: (1, seq_len, C, H, W)
+        # Build tensor: (seq_len, C, H, W)
         frames_np = np.stack(face_crops, axis=0)  # (T, H, W, 3)
         tensor = torch.tensor(frames_np, dtype=torch.float32, device=self.device)
         tensor = tensor.permute(0, 3, 1, 2) / 255.0  # (T, 3, H, W)
@@ -264,15 +320,48 @@ class DeepfakeDetector:
         # ImageNet normalization
         mean = torch.tensor([0.485, 0.456, 0.406], device=self.device).view(1, 3, 1, 1)
         std = torch.tensor([0.229, 0.224, 0.225], device=self.device).view(1, 3, 1, 1)
-        tensor = (tensor - mean) / std
+        return (tensor - mean) / std
 
-        tensor = tensor.unsqueeze(0)  # (1, T, 3, 224, 224)
+    def face_sequence(self, video_path, num_frames=16, sampling="auto"):
+        """Model input for a video, or None if it can't be read or shows no face."""
+        frames = self.sample_frames(video_path, num_frames, sampling)
+        face_crops = self.crop_faces(frames or [])
+        return self.to_sequence(face_crops, num_frames) if face_crops else None
+
+    def _classify_batch(self, sequences):
+        """Class probabilities for a list of (T, 3, 224, 224) sequences, in one forward pass."""
+        tensor = torch.stack(sequences)                        # (B, T, 3, 224, 224)
 
         with torch.no_grad():
-            logits = self.model(tensor)                        # (1, 2)
-            probs = torch.softmax(logits, dim=1)[0]            # (2,)
-            pred_class = torch.argmax(probs).item()
-            confidence = probs[pred_class].item()
+            logits = self.model(tensor)                        # (B, 2)
+            probs = torch.softmax(logits, dim=1).cpu()         # (B, 2)
+
+        return list(probs)
+
+    def predict_video(self, video_path, num_frames=16, sampling="auto"):
+        """
+        Classify a video as REAL or FAKE using the ResNet50 + BiLSTM + Attention model.
+        Extracts face crops from evenly-sampled frames, then runs the full sequence
+        through the model for a single prediction.
+        `sampling` is the frame_sampler mode: "auto", "stream" or "seek".
+        """
+
+        if self.model is None:
+            return {"prediction": "ERROR: No model loaded", "confidence": 0.0}
+
+        frames = self.sample_frames(video_path, num_frames, sampling)
+
+        if frames is None:
+            return {"prediction": "ERROR: Could not read video", "confidence": 0.0}
+
+        face_crops = self.crop_faces(frames)
+
+        if len(face_crops) == 0:
+            return {"prediction": "UNKNOWN", "confidence": 0.0}
+
+        probs = self.batcher.submit(self.to_sequence(face_crops, num_frames))   # (2,)
+        pred_class = torch.argmax(probs).item()
+        confidence = probs[pred_class].item()
 
         # Class mapping: index 0 = REAL, index 1 = FAKE
         prediction = "FAKE" if pred_class == 1 else "REAL"
@@ -285,8 +374,9 @@ if __name__ == "__main__":
 
     parser = argparse.ArgumentParser()
     parser.add_argument("video_path")
+    parser.add_argument("--cpu-mode", choices=cpu_optimize.MODES, default="fp32")
     args = parser.parse_args()
 
-    detector = DeepfakeDetector()
+    detector = DeepfakeDetector(cpu_mode=args.cpu_mode, calibration_videos=[args.video_path])
     result = detector.predict_video(args.video_path)
     print(f"Prediction: {result}")
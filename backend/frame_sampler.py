@@ -0,0 +1,78 @@
+"""
+Video Frame Sampler
+Reads a handful of frames at given indices from a cv2.VideoCapture.
+
+Seeking (CAP_PROP_POS_FRAMES) makes the decoder jump back to the previous
+keyframe and decode forward to the target, so its cost grows with GOP length;
+streaming decodes every frame in between but skips colour conversion for the
+ones that are not wanted (grab() without retrieve()). read_frames picks per
+gap: it times both as it goes and seeks only when skipping the gap frame by
+frame is expected to cost more than a seek.
+"""
+
+import time
+
+import cv2
+
+MODES = ("auto", "stream", "seek")
+
+# Until a seek has been timed, assume one costs this many grab()s: about half
+# of x264's default 250-frame GOP has to be decoded to reach the target. The
+# first gap is always streamed to time grab() (the very first frame is not
+# representative: it includes decoder start-up).
+SEEK_COST_FRAMES = 125
+_EMA = 0.5   # weight of the newest timing in the running averages
+
+
+def _update(average, sample):
+    return sample if average is None else (1 - _EMA) * average + _EMA * sample
+
+def read_frames(cap, indices, mode="auto"):
+    """
+    Yield (index, BGR frame) for each of `indices` (ascending; repeats allowed)
+    in order. Frames that cannot be decoded or seeked to are skipped, and
+    reading stops when a sequential read runs past the real end of the stream
+    (CAP_PROP_FRAME_COUNT is only an estimate for some containers).
+    """
+    if mode not in MODES:
+        raise ValueError(f"mode must be one of {', '.join(MODES)}")
+    pos = 0                    # index the next grab() decodes (None after a failed seek)
+    last = (None, None)        # most recent (index, frame), for repeated indices
+    grab_cost = seek_cost = None
+    for idx in indices:
+        idx = int(idx)
+        if idx == last[0]:
+            yield last
+            continue
+        gap = None if pos is None else idx - pos
+        if mode == "seek" or gap is None or gap < 0:
+            seek = True
+        elif mode == "stream" or gap == 0 or grab_cost is None:
+            seek = False
+        else:
+            seek = (seek_cost if seek_cost is not None else SEEK_COST_FRAMES * grab_cost) < gap * grab_cost
+
+        if seek:
+            started = time.perf_counter()
+            cap.set(cv2.CAP_PROP_POS_FRAMES, idx)
+            ok = cap.grab()
+            seek_cost = _update(seek_cost, time.perf_counter() - started)
+        else:
+            started = time.perf_counter()
+            ok = True
+            for _ in range(gap + 1):
+                if not cap.grab():
+                    ok = False
+                    break
+            if gap:
+                grab_cost = _update(grab_cost, (time.perf_counter() - started) / (gap + 1))
+        if not ok:
+            if not seek:
+                return         # the stream ended before idx
+            pos = None         # the decoder's position is unknown, so seek again next time
+            continue
+        pos = idx + 1
+        ok, frame = cap.retrieve()
+        if ok:
+            last = (idx, frame)
+            yield last
@@ -0,0 +1,136 @@
+"""
+Dynamic Batching for Model Inference
+Collects inputs submitted by concurrent callers into batches and runs them
+through one forward pass on a dedicated worker thread, so N simultaneous
+deepfake scans cost one batch-N ResNet50 pass instead of N batch-1 passes.
+
+A batch is dispatched as soon as it holds max_batch_size inputs or its
+oldest input has waited max_wait_ms, whichever comes first. Callers block in
+submit() until their own result is ready.
+"""
+
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+_NOTHING = object()     # empty held slot (None is the close() sentinel)
+_WINDOW = 1024          # recent requests / batches kept for the metrics
+_THROUGHPUT_SECONDS = 60
+
+
+def _percentile(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+class InferenceBatcher:
+    """
+    `run_batch(inputs)` receives a list of inputs (all with the same `key`,
+    e.g. tensor shape, so they can be stacked) and returns one output per
+    input, in order. It always runs on the batcher's thread.
+    """
+
+    def __init__(self, run_batch, max_batch_size=8, max_wait_ms=10, key=None, name="inference-batcher"):
+        self.run_batch = run_batch
+        self.max_batch_size = max(int(max_batch_size), 1)
+        self.max_wait_ms = max(float(max_wait_ms), 0.0)
+        self.key = key or (lambda item: None)
+        self._queue = queue.Queue()
+        self._held = _NOTHING       # item taken off the queue that belongs to the next batch
+        self._stats_lock = threading.Lock()
+        self._requests = 0
+        self._batches = 0
+        self._delays = deque(maxlen=_WINDOW)     # seconds from submit() to batch start
+        self._recent = deque(maxlen=_WINDOW)     # (finished_at, batch_size, run seconds)
+        self._started = time.monotonic()
+        self._thread = threading.Thread(target=self._loop, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, item, timeout=None):
+        """Queue one input and block until its output is ready (run_batch errors are re-raised)."""
+        future = Future()
+        self._queue.put((item, time.monotonic(), future))
+        return future.result(timeout)
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    # ─── Worker ──────────────────────────────────────────────────────────────
+
+    def _next_batch(self):
+        first = self._queue.get() if self._held is _NOTHING else self._held
+        self._held = _NOTHING
+        if first is None:
+            return None
+        batch, key = [first], self.key(first[0])
+        deadline = first[1] + self.max_wait_ms / 1000
+        while len(batch) < self.max_batch_size:
+            try:
+                entry = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                break
+            if entry is None or self.key(entry[0]) != key:
+                self._held = entry      # close() or a different shape: it starts the next batch
+                break
+            batch.append(entry)
+        return batch
+
+    def _loop(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            started = time.monotonic()
+            try:
+                outputs, error = list(self.run_batch([item for item, _, _ in batch])), None
+                if len(outputs) != len(batch):
+                    raise RuntimeError(f"run_batch returned {len(outputs)} outputs for {len(batch)} inputs")
+            except Exception as e:
+                outputs, error = None, e
+            finished = time.monotonic()
+            with self._stats_lock:
+                self._requests += len(batch)
+                self._batches += 1
+                self._delays.extend(started - submitted for _, submitted, _ in batch)
+                self._recent.append((finished, len(batch), finished - started))
+            for i, (_, _, future) in enumerate(batch):
+                if error is None:
+                    future.set_result(outputs[i])
+                else:
+                    future.set_exception(error)
+
+    # ─── Metrics ─────────────────────────────────────────────────────────────
+
+    def metrics(self):
+        now = time.monotonic()
+        with self._stats_lock:
+            delays = list(self._delays)
+            recent = list(self._recent)
+            requests, batches = self._requests, self._batches
+        window = [r for r in recent if r[0] >= now - _THROUGHPUT_SECONDS]
+        span = min(_THROUGHPUT_SECONDS, now - self._started) or 1.0
+        run_times = [r[2] for r in recent]
+        return {
+            "requests": requests,
+            "batches": batches,
+            "queued": self._queue.qsize(),
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms,
+            "mean_batch_size": round(sum(r[1] for r in recent) / len(recent), 2) if recent else 0.0,
+            "throughput_per_s": round(sum(r[1] for r in window) / span, 3),
+            "queue_delay_ms": {
+                "mean": round(1000 * sum(delays) / len(delays), 2) if delays else 0.0,
+                "p50": round(1000 * _percentile(delays, 0.50), 2),
+                "p95": round(1000 * _percentile(delays, 0.95), 2),
+                "max": round(1000 * max(delays, default=0.0), 2),
+            },
+            "batch_ms": {
+                "mean": round(1000 * sum(run_times) / len(run_times), 2) if run_times else 0.0,
+                "p95": round(1000 * _percentile(run_times, 0.95), 2),
+            },
+        }
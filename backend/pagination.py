@@ -0,0 +1,50 @@
+"""
+Keyset Pagination Cursors
+Opaque cursors shared by both storage backends. A cursor is URL-safe base64
+JSON holding the id to continue below, e.g. {"before": 1234}; the activity
+feed keeps one bound per source, e.g. {"url_check": 88, "fraud_report": 12}.
+"""
+
+import base64
+import binascii
+import json
+
+
+class InvalidCursor(ValueError):
+    """Raised when a client sends a cursor we did not issue."""
+
+
+def encode_cursor(state):
+    raw = json.dumps(state, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor):
+    if not cursor:
+        return {}
+    try:
+        state = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, binascii.Error):
+        raise InvalidCursor("Invalid cursor")
+    if not isinstance(state, dict) or not all(isinstance(v, int) for v in state.values()):
+        raise InvalidCursor("Invalid cursor")
+    return state
+
+def cursor_id(cursor):
+    """The id a page should start below, or None for the first page."""
+    return decode_cursor(cursor).get("before")
+
+
+def next_cursor(rows, limit):
+    """Cursor for the page after `rows`, or None when this was the last page."""
+    if limit <= 0 or len(rows) < limit:
+        return None
+    return encode_cursor({"before": rows[-1]["id"]})
+
+def next_activity_cursor(rows, limit, cursor=None):
+    """Like next_cursor, for the merged activity feed (ids look like "fraud-12")."""
+    if limit <= 0 or len(rows) < limit:
+        return None
+    bounds = decode_cursor(cursor)
+    for row in rows:
+        bounds[row["type"]] = int(row["id"].rsplit("-", 1)[1])
+    return encode_cursor(bounds)
@@ -0,0 +1,51 @@
+"""
+Fraud Report Rollups
+Shared shape and period arithmetic for /fraud-stats: both storage backends
+return a totals rollup plus one rollup per hour/day/week period.
+"""
+
+from datetime import datetime, timedelta
+
+PERIODS = ("hour", "day", "week")
+HOURLY_DAYS = 14   # how far back hourly series go
+
+_STEP = {"hour": timedelta(hours=1), "day": timedelta(days=1), "week": timedelta(weeks=1)}
+# Longest series served per period (hourly buckets are only kept for HOURLY_DAYS)
+MAX_PERIODS = {"hour": HOURLY_DAYS * 24, "day": 366, "week": 520}
+
+
+def new_rollup():
+    return {"count": 0, "amount_lost": 0.0, "by_type": {}, "by_location": {}, "by_status": {}}
+
+def copy_rollup(rollup):
+    return {
+        "count": rollup["count"],
+        "amount_lost": rollup["amount_lost"],
+        "by_type": dict(rollup["by_type"]),
+        "by_location": dict(rollup["by_location"]),
+        "by_status": dict(rollup["by_status"]),
+    }
+
+def tally(counts, key, delta):
+    n = counts.get(key, 0) + delta
+    if n:
+        counts[key] = n
+    else:
+        counts.pop(key, None)
+
+def period_key(period, when):
+    """Bucket key for a datetime: "2024-05-06T13:00" (hour), "2024-05-06" (day) or the week's Monday."""
+    if period == "hour":
+        return when.strftime("%Y-%m-%dT%H:00")
+    day = when.date() if isinstance(when, datetime) else when
+    if period == "week":
+        day -= timedelta(days=day.weekday())
+    return day.isoformat()
+
+def recent_periods(period, periods):
+    """Keys of the last `periods` periods up to now (clamped to MAX_PERIODS), oldest first."""
+    if period not in _STEP:
+        raise ValueError(f"period must be one of {', '.join(PERIODS)}")
+    periods = min(max(periods, 1), MAX_PERIODS[period])
+    now = datetime.now()
+    return [period_key(period, now - _STEP[period] * offset) for offset in range(periods - 1, -1, -1)]
@@ -1,15 +1,23 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException, Form
+from fastapi import FastAPI, UploadFile, File, HTTPException, Form, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
+from starlette.background import BackgroundTask
 import asyncio
+import hashlib
 import json
+import math
 import shutil
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
 load_dotenv()
 
 import uuid
+import tempfile
+import analytics_export
+from ttl_cache import TTLCache
 try:
     from deepfake_detector import DeepfakeDetector
 except ImportError as e:
@@ -23,25 +31,30 @@ from url_detector import check_url_safety
 from pydantic import BaseModel
 from typing import List, Dict, Optional
 from database import (
-    init_db,
+    init_db, final_snapshot, BACKEND,
     # Auth
     login_official, register_official,
     login_citizen, register_citizen,
     # Per-user data
     insert_url_check, get_recent_url_checks,
     insert_deepfake_scan, get_recent_deepfake_scans,
-    insert_fraud_report, get_fraud_reports, update_fraud_report_status,
+    insert_fraud_report, get_fraud_reports, update_fraud_report_status, update_fraud_report_statuses,
+    search_fraud_reports, get_fraud_stats, get_contact_reports,
     # Shared data
     insert_alert, get_alerts, toggle_alert,
     # Dashboard & activity
-    get_dashboard_stats, get_recent_activity,
+    get_dashboard_stats, get_daily_counts, DAILY_BUCKET_DAYS, get_recent_activity,
     get_user_stats,
     # AI Content (generated content storage)
     save_chat_session, get_chat_history, get_chat_session,
-    save_document_analysis, get_document_analyses,
-    save_news_intel, get_news_intel_history,
+    save_document_analysis, get_document_analyses, get_document_analysis,
+    save_news_intel, get_news_intel_history, get_news_intel_entry,
     # Metadata
     log_user_metadata, get_user_metadata,
+    # Bulk import / export
+    BULK_TABLES, iter_records, import_records,
+    # Pagination
+    InvalidCursor, next_cursor, next_activity_cursor,
 )
 
 app = FastAPI()
@@ -49,6 +62,11 @@ app = FastAPI()
 # Initialize database on startup
 init_db()
 
+@app.on_event("shutdown")
+def _final_snapshot():
+    # No-op unless SNAPSHOT_DIR persistence is enabled for the in-memory store
+    final_snapshot()
+
 # Enable CORS for frontend communication
 app.add_middleware(
     CORSMiddleware,
@@ -56,8 +74,20 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
+@app.exception_handler(InvalidCursor)
+async def invalid_cursor_handler(request: Request, exc: InvalidCursor):
+    return JSONResponse(status_code=400, content={"detail": str(exc)})
+
+def paged(response: Response, rows, limit):
+    """Attach the keyset cursor for the following page as X-Next-Cursor."""
+    token = next_cursor(rows, limit)
+    if token:
+        response.headers["X-Next-Cursor"] = token
+    return rows
+
 # ─── Request Models ───────────────────────────────────────────────────────────
 
 class OfficialLoginRequest(BaseModel):
@@ -107,32 +137,43 @@ class UpdateReportStatusRequest(BaseModel):
     status: str
     citizen_id: Optional[int] = None
 
+class BulkUpdateReportStatusRequest(BaseModel):
+    report_ids: List[int]
+    status: str
+
 # ─── Authentication ───────────────────────────────────────────────────────────
 
+# Credential hashing/verification runs here instead of on the event loop, so a
+# burst of logins can't stall every other request.
+auth_pool = ThreadPoolExecutor(max_workers=int(os.getenv("AUTH_WORKERS", "4")), thread_name_prefix="auth")
+
+async def run_auth(fn, *args):
+    return await asyncio.get_running_loop().run_in_executor(auth_pool, fn, *args)
+
 @app.post("/auth/official/login")
 async def official_login(request: OfficialLoginRequest):
-    result = login_official(request.username, request.password)
+    result = await run_auth(login_official, request.username, request.password)
     if not result["success"]:
         raise HTTPException(status_code=401, detail=result["error"])
     return result
 
 @app.post("/auth/official/register")
 async def official_register(request: OfficialRegisterRequest):
-    result = register_official(request.username, request.password, request.name)
+    result = await run_auth(register_official, request.username, request.password, request.name)
     if not result["success"]:
         raise HTTPException(status_code=400, detail=result["error"])
     return result
 
 @app.post("/auth/citizen/register")
 async def citizen_register(request: CitizenRegisterRequest):
-    result = register_citizen(request.phone, request.password, request.name)
+    result = await run_auth(register_citizen, request.phone, request.password, request.name)
     if not result["success"]:
         raise HTTPException(status_code=400, detail=result["error"])
     return result
 
 @app.post("/auth/citizen/login")
 async def citizen_login(request: CitizenLoginRequest):
-    result = login_citizen(request.phone, request.password)
+    result = await run_auth(login_citizen, request.phone, request.password)
     if not result["success"]:
         raise HTTPException(status_code=401, detail=result["error"])
     return result
@@ -163,18 +204,30 @@ async def api_check_url(request: URLCheckRequest):
             )
     except Exception as e:
         print(f"Error triggering sheets sync: {e}")
-        
+
+    # How many citizens have reported this URL in a fraud report
+    reported = get_contact_reports(request.url)
+    result["report_count"] = reported["report_count"] if reported else 0
     return result
 
 @app.get("/url-history/{citizen_id}")
-async def url_history(citizen_id: int, limit: int = 20):
-    return get_recent_url_checks(citizen_id, limit)
+async def url_history(citizen_id: int, response: Response, limit: int = 20, cursor: Optional[str] = None):
+    return paged(response, get_recent_url_checks(citizen_id, limit, cursor), limit)
 
 # ─── Deepfake Detection (per-user) ──────────────────────────────────────────
 
 weights_path = os.path.join(os.path.dirname(__file__), "weights")
+calibration_dir = os.getenv("DETECT_CALIBRATION_DIR")
 try:
-    detector = DeepfakeDetector(weights_dir=weights_path)
+    detector = DeepfakeDetector(
+        weights_dir=weights_path,
+        max_batch_size=int(os.getenv("DETECT_MAX_BATCH", "1")),
+        max_wait_ms=float(os.getenv("DETECT_MAX_WAIT_MS", "10")),
+        cpu_mode=os.getenv("DETECT_CPU_MODE", "fp32"),
+        calibration_videos=sorted(
+            os.path.join(calibration_dir, name) for name in os.listdir(calibration_dir)
+        ) if calibration_dir else None,
+    )
 except Exception as e:
     print(f"Error initializing detector: {e}")
     detector = None
@@ -182,9 +235,60 @@ except Exception as e:
 UPLOAD_DIR = "uploads"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
+# Decode + MTCNN + model inference take seconds of CPU per video, so scans run
+# on their own pool instead of the event loop. At most DETECT_WORKERS running
+# plus DETECT_QUEUE_DEPTH waiting scans are admitted; the rest get a 503 with
+# a Retry-After estimated from recent scan times.
+DETECT_WORKERS = max(int(os.getenv("DETECT_WORKERS", "2")), 1)
+DETECT_QUEUE_DEPTH = max(int(os.getenv("DETECT_QUEUE_DEPTH", "8")), 0)
+detect_pool = ThreadPoolExecutor(max_workers=DETECT_WORKERS, thread_name_prefix="detect")
+detect_state = {"admitted": 0, "rejected": 0, "avg_seconds": 10.0}
+
+def _detect_retry_after():
+    waiting = detect_state["admitted"] - DETECT_WORKERS + 1
+    return max(math.ceil(detect_state["avg_seconds"] * waiting / DETECT_WORKERS), 1)
+
+# Verdicts keyed by (upload SHA-256, model version, frames sampled): a clip that
+# has been scanned before is answered without decoding it again.
+DETECT_NUM_FRAMES = 16
+scan_cache = TTLCache(
+    max_entries=int(os.getenv("SCAN_CACHE_SIZE", "4096")),
+    ttl_seconds=float(os.getenv("SCAN_CACHE_TTL", "86400")),
+)
+detect_inflight = {}   # cache key -> asyncio future of the scan already running for it
+
+def _remove_upload(file_path):
+    if os.path.exists(file_path):
+        try:
+            os.remove(file_path)
+        except OSError:
+            pass
+
+def _save_upload(upload, file_path):
+    """Stream the upload to disk, hashing it on the way through; returns the SHA-256 hex digest."""
+    digest = hashlib.sha256()
+    with open(file_path, "wb") as buffer:
+        for chunk in iter(lambda: upload.read(1 << 20), b""):
+            digest.update(chunk)
+            buffer.write(chunk)
+    return digest.hexdigest()
+
+def _detect(file_path):
+    try:
+        started = time.perf_counter()
+        result = detector.predict_video(file_path, num_frames=DETECT_NUM_FRAMES)
+        return result, time.perf_counter() - started
+    finally:
+        _remove_upload(file_path)
+
+def _release_detect_slot(job):
+    detect_state["admitted"] -= 1
+    if not job.cancelled() and job.exception() is None:
+        detect_state["avg_seconds"] = 0.8 * detect_state["avg_seconds"] + 0.2 * job.result()[1]
+
 @app.get("/")
 def read_root():
-    return {"status": "CG Police API is running", "database": "Per-user SQLite", "auth": "enabled"}
+    return {"status": "CG Police API is running", "database": "SQLite" if BACKEND == "sqlite" else "In-memory", "auth": "enabled"}
 
 @app.post("/detect")
 async def detect_deepfake(file: UploadFile = File(...), citizen_id: int = Form(0)):
@@ -200,13 +304,57 @@ async def detect_deepfake(file: UploadFile = File(...), citizen_id: int = Form(0
     file_extension = os.path.splitext(file.filename)[1]
     unique_filename = f"{uuid.uuid4()}{file_extension}"
     file_path = os.path.join(UPLOAD_DIR, unique_filename)
+    loop = asyncio.get_running_loop()
 
     try:
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        digest = await loop.run_in_executor(None, _save_upload, file.file, file_path)
+    except Exception as e:
+        _remove_upload(file_path)
+        raise HTTPException(status_code=500, detail=str(e))
 
-        result = detector.predict_video(file_path)
-        
+    key = (digest, detector.model_version, DETECT_NUM_FRAMES)
+    result = scan_cache.get(key)
+    cached = result is not None
+
+    if cached:
+        _remove_upload(file_path)
+    elif key in detect_inflight:
+        # Same clip is being scanned for another request right now: share its verdict
+        _remove_upload(file_path)
+        try:
+            result, _ = await asyncio.shield(detect_inflight[key])
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+        cached = True
+    else:
+        # Checked and claimed with no await in between, so the event loop keeps it atomic
+        if detect_state["admitted"] >= DETECT_WORKERS + DETECT_QUEUE_DEPTH:
+            _remove_upload(file_path)
+            detect_state["rejected"] += 1
+            raise HTTPException(
+                status_code=503,
+                detail="Deepfake scanner is busy, please retry shortly",
+                headers={"Retry-After": str(_detect_retry_after())},
+            )
+        detect_state["admitted"] += 1
+
+        # The slot is freed when the scan itself finishes, even if this request is cancelled first
+        job = detect_pool.submit(_detect, file_path)
+        job.add_done_callback(lambda done: loop.call_soon_threadsafe(_release_detect_slot, done))
+        detect_inflight[key] = asyncio.wrap_future(job)
+        try:
+            result, _ = await asyncio.shield(detect_inflight[key])
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            raise HTTPException(status_code=500, detail=str(e))
+        finally:
+            detect_inflight.pop(key, None)
+        if not result["prediction"].startswith("ERROR"):
+            scan_cache.put(key, result)
+
+    # Every upload is recorded, whether or not the verdict came from the cache
+    try:
         insert_deepfake_scan(
             filename=file.filename,
             prediction=result["prediction"],
@@ -232,6 +380,7 @@ async def detect_deepfake(file: UploadFile = File(...), citizen_id: int = Form(0
             "filename": file.filename,
             "prediction": result["prediction"],
             "confidence": result["confidence"],
+            "cached": cached,
             "details": "Processed successfully"
         }
 
@@ -239,17 +388,27 @@ async def detect_deepfake(file: UploadFile = File(...), citizen_id: int = Form(0
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
-    
-    finally:
-        if os.path.exists(file_path):
-            try:
-                os.remove(file_path)
-            except:
-                pass
+
+@app.get("/detect/metrics")
+def detect_metrics():
+    """Worker pool occupancy plus throughput, batch sizes and queue delay of the inference batcher."""
+    if detector is None or detector.batcher is None:
+        raise HTTPException(status_code=503, detail="Detector not initialized")
+    return {
+        "pool": {
+            "workers": DETECT_WORKERS,
+            "queue_depth": DETECT_QUEUE_DEPTH,
+            "admitted": detect_state["admitted"],
+            "rejected": detect_state["rejected"],
+            "avg_scan_seconds": round(detect_state["avg_seconds"], 2),
+        },
+        "cache": scan_cache.stats(),
+        **detector.batcher.metrics(),
+    }
 
 @app.get("/deepfake-history/{citizen_id}")
-async def deepfake_history(citizen_id: int, limit: int = 20):
-    return get_recent_deepfake_scans(citizen_id, limit)
+async def deepfake_history(citizen_id: int, response: Response, limit: int = 20, cursor: Optional[str] = None):
+    return paged(response, get_recent_deepfake_scans(citizen_id, limit, cursor), limit)
 
 # ─── Chat (per-user, stores generated content) ────────────────────────────────
 
@@ -295,12 +454,13 @@ async def chat_endpoint(request: ChatRequest):
     return StreamingResponse(generate_response(), media_type="text/event-stream")
 
 @app.get("/chat-history/{citizen_id}")
-async def chat_history(citizen_id: int, limit: int = 20):
-    return get_chat_history(citizen_id, limit)
+async def chat_history(citizen_id: int, response: Response, limit: int = 20, cursor: Optional[str] = None):
+    return paged(response, get_chat_history(citizen_id, limit, cursor), limit)
 
 @app.get("/chat-session/{citizen_id}/{session_id}")
-async def chat_session_detail(citizen_id: int, session_id: int):
-    session = get_chat_session(session_id, citizen_id)
+async def chat_session_detail(citizen_id: int, session_id: int, start: int = 0, limit: Optional[int] = None):
+    """Full session by default; `start=-20` returns just the last 20 messages."""
+    session = get_chat_session(session_id, citizen_id, start, limit)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     return session
@@ -346,8 +506,15 @@ async def analyze_document_endpoint(file: UploadFile = File(...), citizen_id: in
                 pass
 
 @app.get("/document-history/{citizen_id}")
-async def document_history(citizen_id: int, limit: int = 20):
-    return get_document_analyses(citizen_id, limit)
+async def document_history(citizen_id: int, response: Response, limit: int = 20, cursor: Optional[str] = None):
+    return paged(response, get_document_analyses(citizen_id, limit, cursor), limit)
+
+@app.get("/document-history/{citizen_id}/{analysis_id}")
+async def document_analysis_detail(citizen_id: int, analysis_id: int):
+    analysis = get_document_analysis(analysis_id, citizen_id)
+    if analysis is None:
+        raise HTTPException(status_code=404, detail="Document analysis not found")
+    return analysis
 
 # ─── News Intelligence (per-user, stores generated content) ──────────────────
 
@@ -363,8 +530,15 @@ async def news_intelligence_endpoint(user_id: int = 0, user_type: str = "citizen
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/news-intel-history/{user_id}")
-async def news_intel_history_endpoint(user_id: int, limit: int = 20):
-    return get_news_intel_history(user_id, limit)
+async def news_intel_history_endpoint(user_id: int, response: Response, limit: int = 20, cursor: Optional[str] = None):
+    return paged(response, get_news_intel_history(user_id, limit, cursor), limit)
+
+@app.get("/news-intel-history/{user_id}/{entry_id}")
+async def news_intel_detail(user_id: int, entry_id: int):
+    entry = get_news_intel_entry(entry_id, user_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="News intel entry not found")
+    return entry
 
 # ─── Fraud Reports ─────────────────────────────────────────────────────────────
 
@@ -400,16 +574,152 @@ async def report_fraud(request: FraudReportRequest):
     }
 
 @app.get("/fraud-reports")
-async def get_all_fraud_reports(citizen_id: Optional[int] = None, limit: int = 50):
+async def get_all_fraud_reports(response: Response, citizen_id: Optional[int] = None, limit: int = 50, cursor: Optional[str] = None):
     """Get fraud reports. If citizen_id provided, returns only that user's reports.
-       Without citizen_id (official view), aggregates across all users."""
-    return get_fraud_reports(citizen_id, limit)
+       Without citizen_id (official view), aggregates across all users.
+       Pass the X-Next-Cursor header back as `cursor` to fetch the next page."""
+    return paged(response, get_fraud_reports(citizen_id, limit, cursor), limit)
+
+@app.get("/fraud-reports/search")
+async def search_reports(q: str, limit: int = 20):
+    """Full-text search over report type, contact info, details and location, best match first."""
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="Query must not be empty")
+    return search_fraud_reports(q, limit)
+
+@app.get("/reported-contact")
+async def reported_contact(contact: str):
+    """Check a phone number, UPI ID, email or URL against fraud reports before paying or replying."""
+    result = get_contact_reports(contact)
+    if result is None:
+        raise HTTPException(status_code=400, detail="Not a recognisable phone number, UPI ID, email or URL")
+    return result
+
+@app.get("/fraud-stats")
+async def fraud_stats(period: str = "day", periods: int = 30):
+    """Fraud report breakdown by type, location, status and amount lost:
+       all-time totals plus a series over the last `periods` hours, days or weeks."""
+    try:
+        return get_fraud_stats(period, periods)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.put("/fraud-reports/status")
+async def bulk_update_reports(request: BulkUpdateReportStatusRequest):
+    """Move many reports to one status; ids that don't exist are reported back as not_found."""
+    updated = update_fraud_report_statuses(request.report_ids, request.status)
+    found = set(updated)
+    return {
+        "success": True,
+        "updated": updated,
+        "not_found": [i for i in request.report_ids if i not in found],
+        "message": f"{len(updated)} report(s) updated to '{request.status}'"
+    }
 
 @app.put("/fraud-reports/{report_id}/status")
 async def update_report(report_id: int, request: UpdateReportStatusRequest):
-    update_fraud_report_status(report_id, request.status, request.citizen_id)
+    if not update_fraud_report_status(report_id, request.status, request.citizen_id):
+        raise HTTPException(status_code=404, detail="Report not found")
     return {"success": True, "message": f"Report {report_id} updated to '{request.status}'"}
 
+# ─── Bulk Import / Export (NDJSON) ───────────────────────────────────────────
+
+BULK_BATCH_ROWS = 1000
+MAX_REPORTED_ERRORS = 100
+
+def _check_bulk_table(table: str):
+    if table not in BULK_TABLES:
+        raise HTTPException(status_code=404, detail=f"Unknown table; use one of {', '.join(BULK_TABLES)}")
+
+@app.get("/export/{table}")
+def export_table(table: str, after_id: int = 0):
+    """Stream a whole table as NDJSON (one JSON object per line), oldest first.
+       Pass the last exported id as `after_id` to resume or export incrementally."""
+    _check_bulk_table(table)
+
+    def ndjson():
+        lines = []
+        for record in iter_records(table, after_id):
+            lines.append(json.dumps(record, default=str))
+            if len(lines) >= BULK_BATCH_ROWS:
+                yield "\n".join(lines) + "\n"
+                lines = []
+        if lines:
+            yield "\n".join(lines) + "\n"
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson",
+                             headers={"Content-Disposition": f'attachment; filename="{table}.ndjson"'})
+
+@app.post("/import/{table}")
+async def import_table(table: str, request: Request):
+    """Bulk-insert an NDJSON request body (e.g. a file from /export) in batches of BULK_BATCH_ROWS.
+       The body is read incrementally, so memory stays flat however large the upload is."""
+    _check_bulk_table(table)
+    loop = asyncio.get_running_loop()
+    imported, errors, line_no = 0, [], 0
+    batch, batch_lines = [], []
+
+    def note_error(line, message):
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append({"line": line, "error": message})
+
+    async def flush():
+        nonlocal imported
+        result = await loop.run_in_executor(None, import_records, table, list(batch))
+        imported += result["imported"]
+        for err in result["errors"]:
+            note_error(batch_lines[err["index"]], err["error"])
+        batch.clear()
+        batch_lines.clear()
+
+    async def take(line):
+        nonlocal line_no
+        line_no += 1
+        if not line.strip():
+            return
+        try:
+            row = json.loads(line)
+            if not isinstance(row, dict):
+                raise ValueError("expected a JSON object")
+        except ValueError as e:
+            note_error(line_no, f"Invalid JSON: {e}")
+            return
+        batch.append(row)
+        batch_lines.append(line_no)
+        if len(batch) >= BULK_BATCH_ROWS:
+            await flush()
+
+    pending = b""
+    async for chunk in request.stream():
+        *lines, pending = (pending + chunk).split(b"\n")
+        for line in lines:
+            await take(line)
+    if pending:
+        await take(pending)
+    if batch:
+        await flush()
+    return {"success": True, "imported": imported, "lines": line_no, "errors": errors}
+
+@app.get("/analytics-export/{table}")
+def analytics_export_table(table: str, since: Optional[str] = None, until: Optional[str] = None, format: str = "parquet"):
+    """Columnar (Parquet / Arrow IPC) dump of an activity table for offline analysis.
+       `since` / `until` are ISO timestamps, so weekly exports only read the new rows."""
+    if analytics_export.pa is None:
+        raise HTTPException(status_code=501, detail="Columnar export needs pyarrow installed on the server")
+    if table not in analytics_export.COLUMNS:
+        raise HTTPException(status_code=404, detail=f"Unknown table; use one of {', '.join(analytics_export.COLUMNS)}")
+    if format not in analytics_export.FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(analytics_export.FORMATS)}")
+    fd, path = tempfile.mkstemp(suffix=f".{format}")
+    os.close(fd)
+    try:
+        analytics_export.export_table(table, path, iter_records(table, since=since, until=until), format)
+    except ValueError as e:
+        os.remove(path)
+        raise HTTPException(status_code=400, detail=str(e))
+    return FileResponse(path, filename=f"{table}.{format}", media_type="application/octet-stream",
+                        background=BackgroundTask(os.remove, path))
+
 # ─── Alerts (shared) ─────────────────────────────────────────────────────────
 
 @app.post("/alerts")
@@ -424,12 +734,13 @@ async def create_alert(request: AlertRequest):
     return {"success": True, "alert_id": alert_id, "message": "Alert created"}
 
 @app.get("/alerts")
-async def list_alerts(active_only: bool = True, limit: int = 50):
-    return get_alerts(active_only, limit)
+async def list_alerts(response: Response, active_only: bool = True, limit: int = 50, cursor: Optional[str] = None):
+    return paged(response, get_alerts(active_only, limit, cursor), limit)
 
 @app.put("/alerts/{alert_id}/toggle")
 async def toggle_alert_status(alert_id: int, active: bool = True):
-    toggle_alert(alert_id, active)
+    if not toggle_alert(alert_id, active):
+        raise HTTPException(status_code=404, detail="Alert not found")
     return {"success": True}
 
 # ─── Dashboard Stats (aggregated for officials) ──────────────────────────────
@@ -438,29 +749,40 @@ async def toggle_alert_status(alert_id: int, active: bool = True):
 async def dashboard_stats():
     return get_dashboard_stats()
 
+@app.get("/dashboard-stats/daily")
+async def dashboard_daily_stats(days: int = 7):
+    """Per-day URL check / deepfake scan counts for the officials' dashboard (1 to DAILY_BUCKET_DAYS days)."""
+    return get_daily_counts(min(max(days, 1), DAILY_BUCKET_DAYS))
+
 @app.get("/user-stats/{citizen_id}")
 async def user_stats(citizen_id: int):
     """Get per-user statistics."""
     return get_user_stats(citizen_id)
 
 @app.get("/recent-activity")
-async def recent_activity(type: Optional[str] = None, limit: int = 20, citizen_id: Optional[int] = None):
-    return get_recent_activity(activity_type=type, limit=limit, citizen_id=citizen_id)
+async def recent_activity(response: Response, type: Optional[str] = None, limit: int = 20,
+                          citizen_id: Optional[int] = None, cursor: Optional[str] = None):
+    rows = get_recent_activity(activity_type=type, limit=limit, citizen_id=citizen_id, cursor=cursor)
+    token = next_activity_cursor(rows, limit, cursor)
+    if token:
+        response.headers["X-Next-Cursor"] = token
+    return rows
 
 @app.get("/recent-url-checks/{citizen_id}")
-async def recent_url_checks(citizen_id: int, limit: int = 20):
-    return get_recent_url_checks(citizen_id, limit)
+async def recent_url_checks(citizen_id: int, response: Response, limit: int = 20, cursor: Optional[str] = None):
+    return paged(response, get_recent_url_checks(citizen_id, limit, cursor), limit)
 
 @app.get("/recent-deepfake-scans/{citizen_id}")
-async def recent_deepfake_scans(citizen_id: int, limit: int = 20):
-    return get_recent_deepfake_scans(citizen_id, limit)
+async def recent_deepfake_scans(citizen_id: int, response: Response, limit: int = 20, cursor: Optional[str] = None):
+    return paged(response, get_recent_deepfake_scans(citizen_id, limit, cursor), limit)
 
 # ─── Metadata ─────────────────────────────────────────────────────────────────
 
 @app.get("/user-metadata/{user_id}")
-async def user_metadata(user_id: int, user_type: str = "citizen", limit: int = 50):
+async def user_metadata(user_id: int, response: Response, user_type: str = "citizen", limit: int = 50,
+                        cursor: Optional[str] = None):
     """Get metadata/activity log for a specific user."""
-    return get_user_metadata(user_id, user_type, limit)
+    return paged(response, get_user_metadata(user_id, user_type, limit, cursor), limit)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,101 @@
+"""
+Snapshot & Journal Files
+Binary persistence for the in-memory store in database.py: a periodic full
+snapshot plus an append-only journal of every mutation made since it.
+
+Snapshot layout (one pickle stream, read back incrementally):
+    MAGIC, header dict, then per table: (name, row_count) followed by row
+    chunks of up to CHUNK_ROWS records, and a final None end marker.
+Journals are a plain sequence of pickled op tuples; a torn final write
+(crash mid-append) is ignored on replay.
+"""
+
+import os
+import pickle
+import tempfile
+
+MAGIC = b"CGPSNAP1"
+CHUNK_ROWS = 10_000
+_PROTOCOL = pickle.HIGHEST_PROTOCOL
+
+
+def write_snapshot(path, header, tables, lock):
+    """
+    Write `tables` ({name: list of rows}) atomically to `path`.
+    Each chunk is pickled while holding `lock`, so writers can interleave
+    between chunks but never mutate a row while it is being serialised.
+    """
+    # Unique temp name, so an interrupted or concurrent writer never shares it
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(MAGIC)
+            pickle.dump(header, f, protocol=_PROTOCOL)
+            for name, rows in tables.items():
+                pickle.dump((name, len(rows)), f, protocol=_PROTOCOL)
+                for start in range(0, len(rows), CHUNK_ROWS):
+                    with lock:
+                        blob = pickle.dumps(rows[start:start + CHUNK_ROWS], protocol=_PROTOCOL)
+                    f.write(blob)
+            pickle.dump(None, f, protocol=_PROTOCOL)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+
+def read_snapshot(path):
+    """
+    Return (header, chunks) where chunks lazily yields (table_name, rows)
+    straight off the file, so restore never holds the whole snapshot twice.
+    """
+    f = open(path, "rb")
+    if f.read(len(MAGIC)) != MAGIC:
+        f.close()
+        raise ValueError(f"{path} is not a store snapshot")
+    header = pickle.load(f)
+
+    def chunks():
+        with f:
+            while True:
+                table = pickle.load(f)
+                if table is None:
+                    return
+                name, count = table
+                remaining = count
+                while remaining > 0:
+                    rows = pickle.load(f)
+                    remaining -= len(rows)
+                    yield name, rows
+
+    return header, chunks()
+
+
+class Journal:
+    """Append-only op log; each op is flushed to the OS as soon as it is written."""
+
+    def __init__(self, path):
+        self.path = path
+        self._f = open(path, "ab")
+
+    def append(self, op):
+        pickle.dump(op, self._f, protocol=_PROTOCOL)
+        self._f.flush()
+
+    def close(self):
+        self._f.close()
+
+
+def read_journal(f):
+    """Yield the ops in an open (binary) journal file, stopping at a torn final write."""
+    with f:
+        while True:
+            try:
+                yield pickle.load(f)
+            except EOFError:
+                return
+            except (pickle.UnpicklingError, ValueError, AttributeError, IndexError):
+                print(f"⚠ Ignoring truncated tail of journal {f.name}")
+                return
@@ -0,0 +1,843 @@
+"""
+SQLite Storage Backend
+Durable drop-in for database.py — same function API, data survives restarts.
+
+Enable with DATABASE_BACKEND=sqlite (and optionally SQLITE_PATH=/path/to.db).
+Runs in WAL mode with one reused connection per thread, (citizen_id, id)
+indexes for every history table, and constant SQL strings so sqlite3's
+per-connection statement cache keeps them prepared.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+
+import rollups
+from contacts import extract_contacts, normalize_contact
+from pagination import cursor_id, decode_cursor
+
+BACKEND = "sqlite"
+
+DB_PATH = os.getenv("SQLITE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "cgpolice.db"))
+
+__all__ = [
+    "BACKEND", "init_db", "transaction",
+    "login_official", "register_official", "login_citizen", "register_citizen",
+    "insert_url_check", "get_recent_url_checks",
+    "insert_deepfake_scan", "get_recent_deepfake_scans",
+    "insert_fraud_report", "get_fraud_reports", "update_fraud_report_status", "update_fraud_report_statuses",
+    "search_fraud_reports", "get_fraud_stats", "get_contact_reports",
+    "BULK_TABLES", "EXPORT_TABLES", "iter_records", "import_records",
+    "insert_alert", "get_alerts", "toggle_alert",
+    "save_chat_session", "get_chat_history", "get_chat_session",
+    "save_document_analysis", "get_document_analyses", "get_document_analysis",
+    "save_news_intel", "get_news_intel_history", "get_news_intel_entry",
+    "log_user_metadata", "get_user_metadata",
+    "get_dashboard_stats", "get_daily_counts", "get_user_stats", "get_recent_activity",
+]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS officials (
+    id INTEGER PRIMARY KEY, username TEXT NOT NULL UNIQUE, password_hash TEXT NOT NULL,
+    name TEXT, created_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS citizens (
+    id INTEGER PRIMARY KEY, phone TEXT NOT NULL UNIQUE, password_hash TEXT NOT NULL,
+    name TEXT, created_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS alerts (
+    id INTEGER PRIMARY KEY, title TEXT, description TEXT, severity TEXT, location TEXT,
+    type TEXT, active INTEGER NOT NULL DEFAULT 1, created_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS url_checks (
+    id INTEGER PRIMARY KEY, url TEXT, status TEXT, threats_json TEXT,
+    citizen_id INTEGER NOT NULL, checked_at TEXT NOT NULL, imported_at TEXT
+);
+CREATE TABLE IF NOT EXISTS deepfake_scans (
+    id INTEGER PRIMARY KEY, filename TEXT, prediction TEXT, confidence REAL,
+    citizen_id INTEGER NOT NULL, scanned_at TEXT NOT NULL, imported_at TEXT
+);
+CREATE TABLE IF NOT EXISTS fraud_reports (
+    id INTEGER PRIMARY KEY, fraud_type TEXT, contact_info TEXT, details TEXT, amount_lost REAL,
+    location TEXT, citizen_id INTEGER NOT NULL, status TEXT, created_at TEXT NOT NULL, imported_at TEXT
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS fraud_reports_fts USING fts5 (
+    fraud_type, contact_info, details, location,
+    content='fraud_reports', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS fraud_reports_fts_insert AFTER INSERT ON fraud_reports BEGIN
+    INSERT INTO fraud_reports_fts (rowid, fraud_type, contact_info, details, location)
+    VALUES (new.id, new.fraud_type, new.contact_info, new.details, new.location);
+END;
+-- All-time /fraud-stats totals, kept current by triggers instead of a GROUP BY per request
+CREATE TABLE IF NOT EXISTS fraud_report_totals (
+    fraud_type TEXT, location TEXT, status TEXT, n INTEGER NOT NULL, amount REAL NOT NULL,
+    PRIMARY KEY (fraud_type, location, status)
+);
+CREATE TRIGGER IF NOT EXISTS fraud_report_totals_insert AFTER INSERT ON fraud_reports BEGIN
+    INSERT INTO fraud_report_totals VALUES (new.fraud_type, new.location, new.status, 1, coalesce(new.amount_lost, 0))
+    ON CONFLICT (fraud_type, location, status) DO UPDATE SET n = n + 1, amount = amount + excluded.amount;
+END;
+CREATE TRIGGER IF NOT EXISTS fraud_report_totals_status AFTER UPDATE OF status ON fraud_reports
+WHEN new.status IS NOT old.status BEGIN
+    UPDATE fraud_report_totals SET n = n - 1, amount = amount - coalesce(old.amount_lost, 0)
+    WHERE fraud_type = old.fraud_type AND location = old.location AND status = old.status;
+    INSERT INTO fraud_report_totals VALUES (new.fraud_type, new.location, new.status, 1, coalesce(new.amount_lost, 0))
+    ON CONFLICT (fraud_type, location, status) DO UPDATE SET n = n + 1, amount = amount + excluded.amount;
+END;
+-- Dashboard counters (keyed by their get_dashboard_stats name) and per-day check/scan counts,
+-- kept current by triggers so the dashboard poll reads a few rows instead of counting tables
+CREATE TABLE IF NOT EXISTS dashboard_totals (name TEXT PRIMARY KEY, n INTEGER NOT NULL) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS daily_counts (
+    day TEXT NOT NULL, kind TEXT NOT NULL, n INTEGER NOT NULL, PRIMARY KEY (day, kind)
+) WITHOUT ROWID;
+CREATE TRIGGER IF NOT EXISTS officials_dashboard_insert AFTER INSERT ON officials BEGIN
+    UPDATE dashboard_totals SET n = n + 1 WHERE name = 'total_officials';
+END;
+CREATE TRIGGER IF NOT EXISTS citizens_dashboard_insert AFTER INSERT ON citizens BEGIN
+    UPDATE dashboard_totals SET n = n + 1 WHERE name = 'total_citizens';
+END;
+CREATE TRIGGER IF NOT EXISTS url_checks_dashboard_insert AFTER INSERT ON url_checks BEGIN
+    UPDATE dashboard_totals SET n = n + 1 WHERE name = 'total_url_checks';
+    UPDATE dashboard_totals SET n = n + 1 WHERE name = 'unsafe_urls' AND new.status = 'UNSAFE';
+    INSERT INTO daily_counts VALUES (substr(new.checked_at, 1, 10), 'url_checks', 1)
+    ON CONFLICT (day, kind) DO UPDATE SET n = n + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS deepfake_scans_dashboard_insert AFTER INSERT ON deepfake_scans BEGIN
+    UPDATE dashboard_totals SET n = n + 1 WHERE name = 'total_deepfake_scans';
+    UPDATE dashboard_totals SET n = n + 1 WHERE name = 'deepfakes_detected' AND new.prediction = 'FAKE';
+    INSERT INTO daily_counts VALUES (substr(new.scanned_at, 1, 10), 'deepfake_scans', 1)
+    ON CONFLICT (day, kind) DO UPDATE SET n = n + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS fraud_reports_dashboard_insert AFTER INSERT ON fraud_reports BEGIN
+    UPDATE dashboard_totals SET n = n + 1 WHERE name = 'total_fraud_reports';
+    UPDATE dashboard_totals SET n = n + 1 WHERE name = 'pending_reports' AND new.status = 'pending';
+END;
+CREATE TRIGGER IF NOT EXISTS fraud_reports_dashboard_status AFTER UPDATE OF status ON fraud_reports
+WHEN new.status IS NOT old.status BEGIN
+    UPDATE dashboard_totals SET n = n + (new.status IS 'pending') - (old.status IS 'pending')
+    WHERE name = 'pending_reports';
+END;
+CREATE TABLE IF NOT EXISTS fraud_report_contacts (
+    contact TEXT NOT NULL, report_id INTEGER NOT NULL, PRIMARY KEY (contact, report_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS chat_sessions (
+    id INTEGER PRIMARY KEY, citizen_id INTEGER NOT NULL, title TEXT, message_count INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL, updated_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS chat_messages (
+    session_id INTEGER NOT NULL, seq INTEGER NOT NULL, message_json TEXT NOT NULL,
+    PRIMARY KEY (session_id, seq)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS document_analyses (
+    id INTEGER PRIMARY KEY, filename TEXT, result_json TEXT, citizen_id INTEGER NOT NULL,
+    created_at TEXT NOT NULL, risk_level TEXT
+);
+CREATE TABLE IF NOT EXISTS news_intel_queries (
+    id INTEGER PRIMARY KEY, result_json TEXT, user_type TEXT, user_id INTEGER NOT NULL,
+    created_at TEXT NOT NULL, summary TEXT, article_count INTEGER
+);
+CREATE TABLE IF NOT EXISTS metadata_log (
+    id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL, user_type TEXT, action TEXT, details TEXT,
+    created_at TEXT NOT NULL
+);
+
+-- History indexes. ids are assigned in insertion order, so (citizen_id, id) serves both
+-- "newest first" and keyset paging ("AND id < ?") as a single index range scan. Every
+-- history read pages on id, never on its timestamp column, so there is no
+-- (citizen_id, <timestamp>) index: it would only add a B-tree write to every insert.
+CREATE INDEX IF NOT EXISTS idx_url_checks_citizen_id ON url_checks (citizen_id, id);
+CREATE INDEX IF NOT EXISTS idx_deepfake_scans_citizen_id ON deepfake_scans (citizen_id, id);
+CREATE INDEX IF NOT EXISTS idx_fraud_reports_citizen_id ON fraud_reports (citizen_id, id);
+CREATE INDEX IF NOT EXISTS idx_chat_sessions_citizen_id ON chat_sessions (citizen_id, id);
+CREATE INDEX IF NOT EXISTS idx_document_analyses_citizen_id ON document_analyses (citizen_id, id);
+CREATE INDEX IF NOT EXISTS idx_news_intel_user_id ON news_intel_queries (user_id, id);
+CREATE INDEX IF NOT EXISTS idx_metadata_user_id ON metadata_log (user_id, user_type, id);
+CREATE INDEX IF NOT EXISTS idx_alerts_active ON alerts (active, id);
+
+-- Status / time lookups: seeding dashboard_totals and daily_counts, and the since/until
+-- ranges of iter_records and get_fraud_stats.
+CREATE INDEX IF NOT EXISTS idx_url_checks_status ON url_checks (status);
+CREATE INDEX IF NOT EXISTS idx_deepfake_scans_prediction ON deepfake_scans (prediction);
+CREATE INDEX IF NOT EXISTS idx_fraud_reports_status ON fraud_reports (status);
+CREATE INDEX IF NOT EXISTS idx_url_checks_time ON url_checks (checked_at);
+CREATE INDEX IF NOT EXISTS idx_deepfake_scans_time ON deepfake_scans (scanned_at);
+CREATE INDEX IF NOT EXISTS idx_fraud_reports_time ON fraud_reports (created_at);
+CREATE INDEX IF NOT EXISTS idx_metadata_time ON metadata_log (created_at);
+"""
+
+# Columns added after the first release: (table, column, type, backfill expression)
+_ADDED_COLUMNS = [
+    ("document_analyses", "risk_level", "TEXT",
+     "coalesce(json_extract(result_json, '$.analysis.risk_level'), 'Unknown')"),
+    ("news_intel_queries", "summary", "TEXT",
+     "substr(coalesce(json_extract(result_json, '$.analysis.summary'), ''), 1, 200)"),
+    ("news_intel_queries", "article_count", "INTEGER",
+     "coalesce(json_array_length(result_json, '$.articles'), 0)"),
+    # Set on imported rows only: where the activity feed places them (their own time may be years older)
+    ("url_checks", "imported_at", "TEXT", "NULL"),
+    ("deepfake_scans", "imported_at", "TEXT", "NULL"),
+    ("fraud_reports", "imported_at", "TEXT", "NULL"),
+]
+
+_MAX_ID = 2 ** 63 - 1   # "no cursor" bound for keyset queries
+
+_local = threading.local()
+
+
+def _now():
+    return datetime.now().isoformat()
+
+def _hash(pw):
+    return hashlib.sha256(pw.encode()).hexdigest()
+
+def _dict_factory(cursor, row):
+    return {col[0]: row[i] for i, col in enumerate(cursor.description)}
+
+
+# ─── Connections ─────────────────────────────────────────────────────────────
+
+def _conn():
+    """Return this thread's connection, opening it on first use."""
+    conn = getattr(_local, "conn", None)
+    if conn is None or _local.path != DB_PATH:
+        if conn is not None:
+            conn.close()
+        conn = sqlite3.connect(DB_PATH, cached_statements=256)
+        conn.row_factory = _dict_factory
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-65536")
+        conn.execute("PRAGMA busy_timeout=5000")
+        _local.conn = conn
+        _local.path = DB_PATH
+        _local.batch_depth = 0
+    return conn
+
+def _commit(conn):
+    if not _local.batch_depth:
+        conn.commit()
+
+@contextmanager
+def transaction():
+    """
+    Group every write made inside the block into a single commit.
+    Use for bulk loads; one-off writes commit on their own.
+    """
+    conn = _conn()
+    _local.batch_depth += 1
+    try:
+        yield conn
+    except Exception:
+        _local.batch_depth -= 1
+        if not _local.batch_depth:
+            conn.rollback()
+        raise
+    _local.batch_depth -= 1
+    _commit(conn)
+
+
+# ─── Init ────────────────────────────────────────────────────────────────────
+
+def _has_column(conn, table, column):
+    return any(c["name"] == column for c in conn.execute(f"PRAGMA table_info({table})").fetchall())
+
+def init_db(path=None):
+    global DB_PATH
+    if path:
+        DB_PATH = path
+    conn = _conn()
+    new_fts = not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'fraud_reports_fts'").fetchone()
+    new_contacts = not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'fraud_report_contacts'").fetchone()
+    new_totals = not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'fraud_report_totals'").fetchone()
+    new_dashboard = not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'dashboard_totals'").fetchone()
+    conn.executescript(_SCHEMA)
+    if new_fts:
+        # Index reports written before full-text search existed
+        conn.execute("INSERT INTO fraud_reports_fts (fraud_reports_fts) VALUES ('rebuild')")
+    if new_contacts:
+        for row in conn.execute("SELECT id, contact_info FROM fraud_reports").fetchall():
+            _index_contacts(conn, row["id"], row["contact_info"])
+    if new_totals:
+        conn.execute(
+            "INSERT INTO fraud_report_totals SELECT fraud_type, location, status, COUNT(*),"
+            " coalesce(SUM(amount_lost), 0) FROM fraud_reports GROUP BY fraud_type, location, status"
+        )
+    if new_dashboard:
+        # Seed the counters from the rows already on disk; the triggers keep them from here on
+        conn.execute(
+            "INSERT INTO dashboard_totals"
+            " SELECT 'total_url_checks', COUNT(*) FROM url_checks"
+            " UNION ALL SELECT 'unsafe_urls', COUNT(*) FROM url_checks WHERE status = 'UNSAFE'"
+            " UNION ALL SELECT 'total_deepfake_scans', COUNT(*) FROM deepfake_scans"
+            " UNION ALL SELECT 'deepfakes_detected', COUNT(*) FROM deepfake_scans WHERE prediction = 'FAKE'"
+            " UNION ALL SELECT 'total_fraud_reports', COUNT(*) FROM fraud_reports"
+            " UNION ALL SELECT 'pending_reports', COUNT(*) FROM fraud_reports WHERE status = 'pending'"
+            " UNION ALL SELECT 'total_citizens', COUNT(*) FROM citizens"
+            " UNION ALL SELECT 'total_officials', COUNT(*) FROM officials"
+        )
+        conn.execute(
+            "INSERT INTO daily_counts"
+            " SELECT substr(checked_at, 1, 10), 'url_checks', COUNT(*) FROM url_checks GROUP BY 1"
+            " UNION ALL SELECT substr(scanned_at, 1, 10), 'deepfake_scans', COUNT(*) FROM deepfake_scans GROUP BY 1"
+        )
+    for table, column, kind, backfill in _ADDED_COLUMNS:
+        if not _has_column(conn, table, column):
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {kind}")
+            conn.execute(f"UPDATE {table} SET {column} = {backfill}")
+    if not _has_column(conn, "chat_sessions", "message_count"):
+        # Sessions from before chat_messages kept the whole conversation in one messages_json blob
+        conn.execute("ALTER TABLE chat_sessions ADD COLUMN message_count INTEGER NOT NULL DEFAULT 0")
+        conn.execute(
+            "INSERT INTO chat_messages (session_id, seq, message_json)"
+            " SELECT s.id, m.key, m.value FROM chat_sessions s, json_each(coalesce(s.messages_json, '[]')) m"
+        )
+        conn.execute(
+            "UPDATE chat_sessions SET message_count ="
+            " (SELECT COUNT(*) FROM chat_messages WHERE session_id = chat_sessions.id)"
+        )
+        conn.execute("ALTER TABLE chat_sessions DROP COLUMN messages_json")
+    conn.execute(
+        "INSERT OR IGNORE INTO officials (username, password_hash, name, created_at) VALUES (?, ?, ?, ?)",
+        ("admin", _hash("admin123"), "IG Cyber Crime", _now()),
+    )
+    conn.commit()
+    print(f"✅ SQLite storage ready ({DB_PATH})")
+
+
+# ─── Auth ─────────────────────────────────────────────────────────────────────
+
+def login_official(username, password):
+    o = _conn().execute(
+        "SELECT id, name, username FROM officials WHERE username = ? AND password_hash = ?",
+        (username, _hash(password)),
+    ).fetchone()
+    if o:
+        return {"success": True, "official_id": o["id"], "name": o["name"], "username": o["username"]}
+    return {"success": False, "error": "Invalid username or password"}
+
+def register_official(username, password, name="Official"):
+    conn = _conn()
+    try:
+        cur = conn.execute(
+            "INSERT INTO officials (username, password_hash, name, created_at) VALUES (?, ?, ?, ?)",
+            (username, _hash(password), name, _now()),
+        )
+    except sqlite3.IntegrityError:
+        return {"success": False, "error": "Username already exists"}
+    _commit(conn)
+    return {"success": True, "official_id": cur.lastrowid, "name": name, "username": username}
+
+def login_citizen(phone, password):
+    c = _conn().execute(
+        "SELECT id, name, phone FROM citizens WHERE phone = ? AND password_hash = ?",
+        (phone, _hash(password)),
+    ).fetchone()
+    if c:
+        return {"success": True, "citizen_id": c["id"], "name": c["name"], "phone": c["phone"]}
+    return {"success": False, "error": "Invalid phone or password"}
+
+def register_citizen(phone, password, name="Citizen"):
+    conn = _conn()
+    try:
+        cur = conn.execute(
+            "INSERT INTO citizens (phone, password_hash, name, created_at) VALUES (?, ?, ?, ?)",
+            (phone, _hash(password), name, _now()),
+        )
+    except sqlite3.IntegrityError:
+        return {"success": False, "error": "Phone already registered"}
+    _commit(conn)
+    return {"success": True, "citizen_id": cur.lastrowid, "name": name, "phone": phone}
+
+
+# ─── URL Checks ──────────────────────────────────────────────────────────────
+
+def insert_url_check(url, status, threats, citizen_id=0):
+    conn = _conn()
+    cur = conn.execute(
+        "INSERT INTO url_checks (url, status, threats_json, citizen_id, checked_at) VALUES (?, ?, ?, ?, ?)",
+        (url, status, json.dumps(threats) if threats else "[]", citizen_id, _now()),
+    )
+    _commit(conn)
+    return cur.lastrowid
+
+def get_recent_url_checks(citizen_id=0, limit=20, cursor=None):
+    before = cursor_id(cursor) or _MAX_ID
+    if citizen_id:
+        return _conn().execute(
+            "SELECT * FROM url_checks WHERE citizen_id = ? AND id < ? ORDER BY id DESC LIMIT ?",
+            (citizen_id, before, limit),
+        ).fetchall()
+    return _conn().execute("SELECT * FROM url_checks WHERE id < ? ORDER BY id DESC LIMIT ?", (before, limit)).fetchall()
+
+
+# ─── Deepfake Scans ──────────────────────────────────────────────────────────
+
+def insert_deepfake_scan(filename, prediction, confidence, citizen_id=0):
+    conn = _conn()
+    cur = conn.execute(
+        "INSERT INTO deepfake_scans (filename, prediction, confidence, citizen_id, scanned_at) VALUES (?, ?, ?, ?, ?)",
+        (filename, prediction, confidence, citizen_id, _now()),
+    )
+    _commit(conn)
+    return cur.lastrowid
+
+def get_recent_deepfake_scans(citizen_id=0, limit=20, cursor=None):
+    before = cursor_id(cursor) or _MAX_ID
+    if citizen_id:
+        return _conn().execute(
+            "SELECT * FROM deepfake_scans WHERE citizen_id = ? AND id < ? ORDER BY id DESC LIMIT ?",
+            (citizen_id, before, limit),
+        ).fetchall()
+    return _conn().execute("SELECT * FROM deepfake_scans WHERE id < ? ORDER BY id DESC LIMIT ?", (before, limit)).fetchall()
+
+
+# ─── Fraud Reports ───────────────────────────────────────────────────────────
+
+def insert_fraud_report(fraud_type, contact_info, details, amount_lost=0, location="Unknown", citizen_id=0):
+    conn = _conn()
+    cur = conn.execute(
+        "INSERT INTO fraud_reports (fraud_type, contact_info, details, amount_lost, location, citizen_id, status, created_at)"
+        " VALUES (?, ?, ?, ?, ?, ?, 'pending', ?)",
+        (fraud_type, contact_info, details, amount_lost, location, citizen_id, _now()),
+    )
+    _index_contacts(conn, cur.lastrowid, contact_info)
+    _commit(conn)
+    return cur.lastrowid
+
+def _index_contacts(conn, report_id, contact_info):
+    conn.executemany(
+        "INSERT OR IGNORE INTO fraud_report_contacts (contact, report_id) VALUES (?, ?)",
+        [(contact, report_id) for _, contact in extract_contacts(contact_info)],
+    )
+
+def get_contact_reports(contact):
+    found = normalize_contact(contact)
+    if found is None:
+        return None
+    kind, key = found
+    row = _conn().execute(
+        "SELECT COUNT(*) AS n, MAX(f.created_at) AS last FROM fraud_report_contacts c"
+        " JOIN fraud_reports f ON f.id = c.report_id WHERE c.contact = ?",
+        (key,),
+    ).fetchone()
+    return {"contact": key, "kind": kind, "report_count": row["n"], "last_reported_at": row["last"]}
+
+def get_fraud_reports(citizen_id=None, limit=50, cursor=None):
+    before = cursor_id(cursor) or _MAX_ID
+    if citizen_id:
+        return _conn().execute(
+            "SELECT * FROM fraud_reports WHERE citizen_id = ? AND id < ? ORDER BY id DESC LIMIT ?",
+            (citizen_id, before, limit),
+        ).fetchall()
+    return _conn().execute("SELECT * FROM fraud_reports WHERE id < ? ORDER BY id DESC LIMIT ?", (before, limit)).fetchall()
+
+def search_fraud_reports(query, limit=20):
+    # Quote each word so user input can't inject FTS5 query syntax; OR keeps it a ranked search
+    words = query.replace('"', " ").split()
+    if not words:
+        return []
+    match = " OR ".join(f'"{w}"' for w in words)
+    return _conn().execute(
+        "SELECT f.*, -bm25(fraud_reports_fts) AS score FROM fraud_reports_fts"
+        " JOIN fraud_reports f ON f.id = fraud_reports_fts.rowid"
+        " WHERE fraud_reports_fts MATCH ? ORDER BY bm25(fraud_reports_fts) LIMIT ?",
+        (match, limit),
+    ).fetchall()
+
+_PERIOD_SQL = {
+    "hour": "substr(created_at, 1, 13) || ':00'",
+    "day": "substr(created_at, 1, 10)",
+    "week": "date(substr(created_at, 1, 10), '-6 days', 'weekday 1')",
+}
+
+def _fold(rollup, row):
+    rollup["count"] += row["n"]
+    rollup["amount_lost"] += row["amount"] or 0
+    rollups.tally(rollup["by_type"], row["fraud_type"], row["n"])
+    rollups.tally(rollup["by_location"], row["location"], row["n"])
+    rollups.tally(rollup["by_status"], row["status"], row["n"])
+
+def get_fraud_stats(period="day", periods=30):
+    """
+    Same shape as database.get_fraud_stats: totals come from the trigger-kept
+    fraud_report_totals, the series from a GROUP BY on the created_at index.
+    """
+    keys = rollups.recent_periods(period, periods)
+    conn = _conn()
+    totals = rollups.new_rollup()
+    for row in conn.execute("SELECT fraud_type, location, status, n, amount FROM fraud_report_totals WHERE n > 0"):
+        _fold(totals, row)
+    series = {key: rollups.new_rollup() for key in keys}
+    for row in conn.execute(
+        f"SELECT {_PERIOD_SQL[period]} AS period, fraud_type, location, status, COUNT(*) AS n,"
+        " SUM(amount_lost) AS amount FROM fraud_reports WHERE created_at >= ?"
+        " GROUP BY period, fraud_type, location, status",
+        (keys[0],),
+    ):
+        if row["period"] in series:
+            _fold(series[row["period"]], row)
+    return {"period": period, "totals": totals, "series": [{"period": k, **v} for k, v in series.items()]}
+
+def update_fraud_report_status(report_id, status, citizen_id=None):
+    conn = _conn()
+    cur = conn.execute("UPDATE fraud_reports SET status = ? WHERE id = ?", (status, report_id))
+    _commit(conn)
+    return cur.rowcount > 0
+
+def update_fraud_report_statuses(report_ids, status):
+    updated = []
+    with transaction() as conn:
+        for report_id in report_ids:
+            if conn.execute("UPDATE fraud_reports SET status = ? WHERE id = ?", (status, report_id)).rowcount:
+                updated.append(report_id)
+    return updated
+
+
+# ─── Bulk Import / Export ────────────────────────────────────────────────────
+
+BULK_TABLES = ("fraud_reports", "url_checks", "deepfake_scans")
+EXPORT_TABLES = BULK_TABLES + ("metadata_log",)
+
+_TIME_COLUMN = {
+    "fraud_reports": "created_at", "url_checks": "checked_at",
+    "deepfake_scans": "scanned_at", "metadata_log": "created_at",
+}
+
+def iter_records(table, after_id=0, since=None, until=None, page=1000):
+    """Yield every row of `table` with id > after_id, oldest first, one keyset page at a time.
+       `since` (inclusive) / `until` (exclusive) filter on the row's timestamp column."""
+    if table not in EXPORT_TABLES:
+        raise ValueError(f"table must be one of {', '.join(EXPORT_TABLES)}")
+    column = _TIME_COLUMN[table]
+    if since:
+        # Jump straight to the first row in range via the time index
+        start = _conn().execute(f"SELECT MIN(id) AS id FROM {table} WHERE {column} >= ?", (since,)).fetchone()["id"]
+        if start is None:
+            return
+        after_id = max(after_id, start - 1)
+    sql = (f"SELECT * FROM {table} WHERE id > ? AND {column} >= ? AND {column} < ?"
+           " ORDER BY id LIMIT ?")
+    params = [after_id, since or "", until or "\uffff", page]
+    while True:
+        rows = _conn().execute(sql, params).fetchall()
+        yield from rows
+        if len(rows) < page:
+            return
+        params[0] = rows[-1]["id"]
+
+def _iso(value):
+    return datetime.fromisoformat(value).isoformat() if value else _now()
+
+def _import_fraud_report(conn, row):
+    contact_info = str(row["contact_info"])
+    cur = conn.execute(
+        "INSERT INTO fraud_reports (fraud_type, contact_info, details, amount_lost, location, citizen_id, status,"
+        " created_at, imported_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (str(row["fraud_type"]), contact_info, str(row["details"]), float(row.get("amount_lost") or 0),
+         str(row.get("location") or "Unknown"), int(row.get("citizen_id") or 0),
+         str(row.get("status") or "pending"), _iso(row.get("created_at")), _now()),
+    )
+    _index_contacts(conn, cur.lastrowid, contact_info)
+
+def _import_url_check(conn, row):
+    threats_json = row.get("threats_json") or json.dumps(row.get("threats") or [])
+    json.loads(threats_json)  # reject malformed JSON up front
+    conn.execute(
+        "INSERT INTO url_checks (url, status, threats_json, citizen_id, checked_at, imported_at) VALUES (?, ?, ?, ?, ?, ?)",
+        (str(row["url"]), str(row["status"]), threats_json, int(row.get("citizen_id") or 0),
+         _iso(row.get("checked_at")), _now()),
+    )
+
+def _import_deepfake_scan(conn, row):
+    conn.execute(
+        "INSERT INTO deepfake_scans (filename, prediction, confidence, citizen_id, scanned_at, imported_at)"
+        " VALUES (?, ?, ?, ?, ?, ?)",
+        (str(row["filename"]), str(row["prediction"]), float(row["confidence"]),
+         int(row.get("citizen_id") or 0), _iso(row.get("scanned_at")), _now()),
+    )
+
+_IMPORTERS = {
+    "fraud_reports": _import_fraud_report,
+    "url_checks": _import_url_check,
+    "deepfake_scans": _import_deepfake_scan,
+}
+
+def import_records(table, rows):
+    """Insert a batch in one transaction; same result shape as database.import_records."""
+    if table not in BULK_TABLES:
+        raise ValueError(f"table must be one of {', '.join(BULK_TABLES)}")
+    insert = _IMPORTERS[table]
+    imported, errors = 0, []
+    with transaction() as conn:
+        for i, row in enumerate(rows):
+            try:
+                insert(conn, row)
+            except (KeyError, TypeError, ValueError) as e:
+                errors.append({"index": i, "error": f"{type(e).__name__}: {e}"})
+                continue
+            imported += 1
+    return {"imported": imported, "errors": errors}
+
+
+# ─── Alerts (shared) ─────────────────────────────────────────────────────────
+
+def insert_alert(title, description, severity="medium", location="Pan India", alert_type="general"):
+    conn = _conn()
+    cur = conn.execute(
+        "INSERT INTO alerts (title, description, severity, location, type, active, created_at) VALUES (?, ?, ?, ?, ?, 1, ?)",
+        (title, description, severity, location, alert_type, _now()),
+    )
+    _commit(conn)
+    return cur.lastrowid
+
+def get_alerts(active_only=True, limit=50, cursor=None):
+    before = cursor_id(cursor) or _MAX_ID
+    if active_only:
+        rows = _conn().execute(
+            "SELECT * FROM alerts WHERE active = 1 AND id < ? ORDER BY id DESC LIMIT ?", (before, limit)
+        ).fetchall()
+    else:
+        rows = _conn().execute("SELECT * FROM alerts WHERE id < ? ORDER BY id DESC LIMIT ?", (before, limit)).fetchall()
+    for a in rows:
+        a["active"] = bool(a["active"])
+    return rows
+
+def toggle_alert(alert_id, active=True):
+    conn = _conn()
+    cur = conn.execute("UPDATE alerts SET active = ? WHERE id = ?", (1 if active else 0, alert_id))
+    _commit(conn)
+    return cur.rowcount > 0
+
+
+# ─── Chat Sessions ───────────────────────────────────────────────────────────
+
+def _chat_title(messages, default="New Chat"):
+    for m in messages:
+        if m.get("role") == "user":
+            return m["content"][:50]
+    return default
+
+def _append_messages(conn, session_id, messages, first_seq):
+    conn.executemany(
+        "INSERT INTO chat_messages (session_id, seq, message_json) VALUES (?, ?, ?)",
+        [(session_id, first_seq + i, json.dumps(m)) for i, m in enumerate(messages)],
+    )
+
+def save_chat_session(citizen_id, messages, session_id=None):
+    """Only messages past the stored count are written; an edited history is replaced."""
+    conn = _conn()
+    now = _now()
+    if session_id:
+        existing = conn.execute(
+            "SELECT title, message_count FROM chat_sessions WHERE id = ?", (session_id,)
+        ).fetchone()
+        if existing:
+            stored = existing["message_count"]
+            if len(messages) < stored:
+                conn.execute("DELETE FROM chat_messages WHERE session_id = ?", (session_id,))
+                stored = 0
+            _append_messages(conn, session_id, messages[stored:], stored)
+            title = existing["title"] if stored and existing["title"] != "New Chat" else _chat_title(messages)
+            conn.execute(
+                "UPDATE chat_sessions SET message_count = ?, updated_at = ?, title = ? WHERE id = ?",
+                (len(messages), now, title, session_id),
+            )
+            _commit(conn)
+            return session_id
+
+    cur = conn.execute(
+        "INSERT INTO chat_sessions (citizen_id, title, message_count, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+        (citizen_id, _chat_title(messages), len(messages), now, now),
+    )
+    _append_messages(conn, cur.lastrowid, messages, 0)
+    _commit(conn)
+    return cur.lastrowid
+
+def get_chat_history(citizen_id, limit=20, cursor=None):
+    return _conn().execute(
+        "SELECT id, title, updated_at FROM chat_sessions WHERE citizen_id = ? AND id < ? ORDER BY id DESC LIMIT ?",
+        (citizen_id, cursor_id(cursor) or _MAX_ID, limit),
+    ).fetchall()
+
+def get_chat_session(session_id, citizen_id, start=0, limit=None):
+    conn = _conn()
+    s = conn.execute(
+        "SELECT id, title, message_count, updated_at FROM chat_sessions WHERE id = ? AND citizen_id = ?",
+        (session_id, citizen_id),
+    ).fetchone()
+    if not s:
+        return None
+    if start < 0:
+        start = max(s["message_count"] + start, 0)
+    rows = conn.execute(
+        "SELECT message_json FROM chat_messages WHERE session_id = ? AND seq >= ? ORDER BY seq LIMIT ?",
+        (session_id, start, -1 if limit is None else max(limit, 0)),
+    ).fetchall()
+    return {
+        "id": s["id"],
+        "title": s["title"],
+        "messages": [json.loads(r["message_json"]) for r in rows],
+        "message_count": s["message_count"],
+        "updated_at": s["updated_at"],
+    }
+
+
+# ─── Document Analysis ───────────────────────────────────────────────────────
+
+def save_document_analysis(filename, result, citizen_id=0):
+    analysis = result.get("analysis") if isinstance(result, dict) else None
+    risk_level = analysis.get("risk_level", "Unknown") if isinstance(analysis, dict) else "Unknown"
+    conn = _conn()
+    cur = conn.execute(
+        "INSERT INTO document_analyses (filename, result_json, citizen_id, created_at, risk_level) "
+        "VALUES (?, ?, ?, ?, ?)",
+        (filename, json.dumps(result), citizen_id, _now(), risk_level),
+    )
+    _commit(conn)
+    return cur.lastrowid
+
+def get_document_analyses(citizen_id, limit=20, cursor=None):
+    """History list view: summaries only; fetch the full result with get_document_analysis."""
+    return _conn().execute(
+        "SELECT id, filename, risk_level, created_at FROM document_analyses "
+        "WHERE citizen_id = ? AND id < ? ORDER BY id DESC LIMIT ?",
+        (citizen_id, cursor_id(cursor) or _MAX_ID, limit),
+    ).fetchall()
+
+def get_document_analysis(analysis_id, citizen_id):
+    row = _conn().execute(
+        "SELECT id, filename, risk_level, created_at, result_json FROM document_analyses "
+        "WHERE id = ? AND citizen_id = ?",
+        (analysis_id, citizen_id),
+    ).fetchone()
+    if row:
+        row["result"] = json.loads(row.pop("result_json"))
+    return row
+
+
+# ─── News Intelligence ───────────────────────────────────────────────────────
+
+def save_news_intel(result, user_type="citizen", user_id=0):
+    analysis = result.get("analysis") if isinstance(result, dict) else None
+    articles = result.get("articles") if isinstance(result, dict) else None
+    conn = _conn()
+    cur = conn.execute(
+        "INSERT INTO news_intel_queries (result_json, user_type, user_id, created_at, summary, article_count) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        (json.dumps(result), user_type, user_id, _now(),
+         str(analysis.get("summary", ""))[:200] if isinstance(analysis, dict) else "",
+         len(articles) if isinstance(articles, list) else 0),
+    )
+    _commit(conn)
+    return cur.lastrowid
+
+def get_news_intel_history(user_id, limit=20, cursor=None):
+    """History list view: summaries only; fetch the full result with get_news_intel_entry."""
+    return _conn().execute(
+        "SELECT id, summary, article_count, created_at FROM news_intel_queries "
+        "WHERE user_id = ? AND id < ? ORDER BY id DESC LIMIT ?",
+        (user_id, cursor_id(cursor) or _MAX_ID, limit),
+    ).fetchall()
+
+def get_news_intel_entry(entry_id, user_id):
+    row = _conn().execute(
+        "SELECT id, summary, article_count, created_at, result_json FROM news_intel_queries "
+        "WHERE id = ? AND user_id = ?",
+        (entry_id, user_id),
+    ).fetchone()
+    if row:
+        row["result"] = json.loads(row.pop("result_json"))
+    return row
+
+
+# ─── Metadata ────────────────────────────────────────────────────────────────
+
+def log_user_metadata(user_id, user_type, action, details=None):
+    conn = _conn()
+    conn.execute(
+        "INSERT INTO metadata_log (user_id, user_type, action, details, created_at) VALUES (?, ?, ?, ?, ?)",
+        (user_id, user_type, action, details or "", _now()),
+    )
+    _commit(conn)
+
+def get_user_metadata(user_id, user_type="citizen", limit=50, cursor=None):
+    return _conn().execute(
+        "SELECT * FROM metadata_log WHERE user_id = ? AND user_type = ? AND id < ? ORDER BY id DESC LIMIT ?",
+        (user_id, user_type, cursor_id(cursor) or _MAX_ID, limit),
+    ).fetchall()
+
+
+# ─── Dashboard Stats ─────────────────────────────────────────────────────────
+
+def _count(sql, params=()):
+    return _conn().execute(sql, params).fetchone()["n"]
+
+def get_daily_counts(days=7):
+    """Per-day URL check / deepfake scan counts for the last `days` days, oldest first."""
+    since = (date.today() - timedelta(days=days - 1)).isoformat()
+    series = {
+        (date.today() - timedelta(days=offset)).isoformat(): {"url_checks": 0, "deepfake_scans": 0}
+        for offset in range(days - 1, -1, -1)
+    }
+    for row in _conn().execute("SELECT day, kind, n FROM daily_counts WHERE day >= ?", (since,)):
+        if row["day"] in series:
+            series[row["day"]][row["kind"]] = row["n"]
+    return [{"date": day, **bucket} for day, bucket in series.items()]
+
+def get_dashboard_stats():
+    """Read straight off the trigger-maintained dashboard_totals and daily_counts rows."""
+    conn = _conn()
+    stats = {row["name"]: row["n"] for row in conn.execute("SELECT name, n FROM dashboard_totals")}
+    today = {"url_checks": 0, "deepfake_scans": 0}
+    for row in conn.execute("SELECT kind, n FROM daily_counts WHERE day = ?", (date.today().isoformat(),)):
+        today[row["kind"]] = row["n"]
+    stats["today_url_checks"] = today["url_checks"]
+    stats["today_deepfake_scans"] = today["deepfake_scans"]
+    return stats
+
+def get_user_stats(citizen_id):
+    return {
+        "total_url_checks": _count("SELECT COUNT(*) AS n FROM url_checks WHERE citizen_id = ?", (citizen_id,)),
+        "total_deepfake_scans": _count("SELECT COUNT(*) AS n FROM deepfake_scans WHERE citizen_id = ?", (citizen_id,)),
+        "total_fraud_reports": _count("SELECT COUNT(*) AS n FROM fraud_reports WHERE citizen_id = ?", (citizen_id,)),
+        "total_chat_sessions": _count("SELECT COUNT(*) AS n FROM chat_sessions WHERE citizen_id = ?", (citizen_id,)),
+    }
+
+# kind -> subquery taking that source's newest rows below its cursor bound off an index
+_ACTIVITY_SOURCES = {
+    "url_check": (
+        "SELECT 'url_check-' || id AS id, 'url_check' AS type, 'URL checked: ' || substr(url, 1, 50) AS description,"
+        " status, coalesce(imported_at, checked_at) AS timestamp FROM url_checks WHERE {where} id < :url_check ORDER BY id DESC LIMIT :limit"
+    ),
+    "deepfake_scan": (
+        "SELECT 'deepfake-' || id AS id, 'deepfake_scan' AS type, 'Deepfake scan: ' || filename AS description,"
+        " prediction AS status, coalesce(imported_at, scanned_at) AS timestamp FROM deepfake_scans WHERE {where} id < :deepfake_scan"
+        " ORDER BY id DESC LIMIT :limit"
+    ),
+    "fraud_report": (
+        "SELECT 'fraud-' || id AS id, 'fraud_report' AS type, 'Fraud report: ' || fraud_type AS description,"
+        " status, coalesce(imported_at, created_at) AS timestamp FROM fraud_reports WHERE {where} id < :fraud_report"
+        " ORDER BY id DESC LIMIT :limit"
+    ),
+}
+
+def get_recent_activity(activity_type=None, limit=20, citizen_id=None, cursor=None):
+    where = "citizen_id = :citizen_id AND" if citizen_id else ""
+    parts = [
+        f"SELECT * FROM ({sql.format(where=where)})"
+        for kind, sql in _ACTIVITY_SOURCES.items()
+        if not activity_type or kind == activity_type
+    ]
+    if not parts:
+        return []
+    bounds = decode_cursor(cursor)
+    params = {kind: bounds.get(kind) or _MAX_ID for kind in _ACTIVITY_SOURCES}
+    params.update(citizen_id=citizen_id, limit=limit)
+    sql = " UNION ALL ".join(parts) + " ORDER BY timestamp DESC LIMIT :limit"
+    return _conn().execute(sql, params).fetchall()
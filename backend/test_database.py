@@ -0,0 +1,669 @@
+"""
+Unit Tests for the In-Memory Storage Backend
+Exercises database.py directly — no running server needed.
+
+Run:
+    cd backend
+    python -m pytest test_database.py
+"""
+
+import importlib
+import json
+import sqlite3
+import sys
+import threading
+from datetime import date, datetime, timedelta
+
+import pytest
+
+import database
+import sqlite_store
+
+
+@pytest.fixture
+def db():
+    """Fresh copy of the module-level store for every test."""
+    return importlib.reload(database)
+
+
+def test_per_citizen_history_is_isolated_and_newest_first(db):
+    for i in range(5):
+        db.insert_url_check(f"https://a.example/{i}", "SAFE", None, citizen_id=1)
+        db.insert_url_check(f"https://b.example/{i}", "SAFE", None, citizen_id=2)
+
+    history = db.get_recent_url_checks(1, limit=3)
+    assert [u["url"] for u in history] == [
+        "https://a.example/4", "https://a.example/3", "https://a.example/2"
+    ]
+    assert all(u["citizen_id"] == 1 for u in db.get_recent_url_checks(1, limit=50))
+    assert db.get_recent_url_checks(3) == []
+    assert len(db.get_recent_url_checks(0, limit=50)) == 10
+
+
+def test_history_indexes_cover_every_table(db):
+    db.insert_deepfake_scan("clip.mp4", "FAKE", 0.9, citizen_id=7)
+    db.insert_fraud_report("upi", "x@upi", "asked for OTP", citizen_id=7)
+    db.save_chat_session(7, [{"role": "user", "content": "hello"}])
+    db.save_document_analysis("doc.png", {"risk_level": "low"}, citizen_id=7)
+    db.save_news_intel({"analysis": {}}, user_type="official", user_id=7)
+    db.log_user_metadata(7, "citizen", "login")
+    db.log_user_metadata(7, "official", "login")
+
+    assert len(db.get_recent_deepfake_scans(7)) == 1
+    assert len(db.get_fraud_reports(7)) == 1
+    assert len(db.get_chat_history(7)) == 1
+    assert len(db.get_document_analyses(7)) == 1
+    assert len(db.get_news_intel_history(7)) == 1
+    assert len(db.get_user_metadata(7, "citizen")) == 1
+    assert db.get_user_stats(7)["total_chat_sessions"] == 1
+    assert db.get_user_stats(8)["total_fraud_reports"] == 0
+
+
+def test_auth_lookups_use_username_and_phone_indexes(db):
+    db.init_db()
+    assert db.login_official("admin", "admin123")["success"]
+    assert not db.login_official("admin", "wrong")["success"]
+    assert not db.register_official("admin", "x")["success"]
+
+    citizen = db.register_citizen("9999000001", "pw", "Alice")
+    assert citizen["success"]
+    assert not db.register_citizen("9999000001", "other")["success"]
+    assert db.login_citizen("9999000001", "pw")["citizen_id"] == citizen["citizen_id"]
+    assert not db.login_citizen("9999000002", "pw")["success"]
+
+
+def test_status_updates_use_primary_key_indexes(db):
+    ids = [db.insert_fraud_report("upi", "", f"r{i}", citizen_id=1) for i in range(4)]
+    assert db.update_fraud_report_status(ids[0], "resolved")
+    assert not db.update_fraud_report_status(999, "resolved")
+    assert db.update_fraud_report_statuses([ids[1], ids[2], 999], "investigating") == [ids[1], ids[2]]
+    assert [r["status"] for r in db.get_fraud_reports(1)] == ["pending", "investigating", "investigating", "resolved"]
+    assert db.get_dashboard_stats()["pending_reports"] == 1
+
+    alert = db.insert_alert("t", "d")
+    assert db.toggle_alert(alert, active=False) and not db.toggle_alert(999)
+    assert db._url_checks.get(db.insert_url_check("https://x.example", "SAFE", None, 1)).url == "https://x.example"
+
+
+def test_compact_records_keep_the_dict_api(db):
+    threats = [{"threatType": "MALWARE"}]
+    db.insert_url_check("https://phishing.example", "UNSAFE", threats, citizen_id=3)
+    db.insert_url_check("https://ok.example", "SAFE", None, citizen_id=3)
+    db.log_user_metadata(3, "citizen", "login", None)
+
+    unsafe, safe = reversed(db.get_recent_url_checks(3))
+    assert json.loads(unsafe["threats_json"]) == threats and safe["threats_json"] == "[]"
+    assert set(unsafe) == {"id", "url", "status", "threats_json", "citizen_id", "checked_at", "imported_at"}
+    assert datetime.fromisoformat(unsafe["checked_at"]).date() == date.today()
+    assert db.get_user_metadata(3)[0]["details"] == ""
+
+
+def test_record_log_reads_newest_first(db):
+    log = db.RecordLog()
+    for i in range(5):
+        log.append(i)
+    assert list(log) == [4, 3, 2, 1, 0]
+    assert log.latest(2) == [4, 3]
+    assert log.latest(99) == [4, 3, 2, 1, 0]
+    assert log.latest(0) == []
+    assert len(log) == 5
+
+
+def test_alerts_keep_newest_first_semantics(db):
+    first = db.insert_alert("Old scam", "...")
+    second = db.insert_alert("New scam", "...")
+    db.toggle_alert(second, active=False)
+    assert [a["id"] for a in db.get_alerts(active_only=False)] == [second, first]
+    assert [a["id"] for a in db.get_alerts()] == [first]
+
+
+def test_dashboard_counters_track_inserts_and_status_changes(db):
+    db.insert_url_check("https://phishing.example", "UNSAFE", [{"threatType": "MALWARE"}], 1)
+    db.insert_url_check("https://ok.example", "SAFE", None, 1)
+    db.insert_deepfake_scan("a.mp4", "FAKE", 0.8, 1)
+    first = db.insert_fraud_report("upi", "", "...", citizen_id=1)
+    db.insert_fraud_report("sms", "", "...", citizen_id=1)
+    db.update_fraud_report_status(first, "investigating")
+    db.update_fraud_report_status(first, "resolved")
+
+    stats = db.get_dashboard_stats()
+    assert stats["unsafe_urls"] == 1
+    assert stats["deepfakes_detected"] == 1
+    assert stats["pending_reports"] == 1
+    assert stats["today_url_checks"] == 2
+    assert stats["today_deepfake_scans"] == 1
+    assert db.get_daily_counts(3)[-1]["url_checks"] == 2
+    assert db.get_daily_counts(3)[0]["url_checks"] == 0
+
+
+def test_recent_activity_merges_sources_newest_first(db):
+    db.insert_url_check("https://1.example", "SAFE", None, 1)
+    db.insert_fraud_report("upi", "", "...", citizen_id=2)
+    db.insert_deepfake_scan("a.mp4", "REAL", 0.7, 1)
+    db.insert_url_check("https://2.example", "UNSAFE", None, 2)
+
+    assert [a["id"] for a in db.get_recent_activity()] == [
+        "url_check-2", "deepfake-1", "fraud-1", "url_check-1"
+    ]
+    assert [a["id"] for a in db.get_recent_activity(limit=2, citizen_id=1)] == ["deepfake-1", "url_check-1"]
+    assert [a["id"] for a in db.get_recent_activity("url_check")] == ["url_check-2", "url_check-1"]
+    assert db.get_recent_activity("unknown") == []
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+def test_activity_feed_places_imported_rows_at_their_import_time(db, tmp_path, backend):
+    store = db
+    if backend == "sqlite":
+        store = sqlite_store
+        store.init_db(str(tmp_path / "cgpolice.db"))
+    store.insert_url_check("https://live.example", "SAFE", None)
+    store.insert_deepfake_scan("clip.mp4", "REAL", 0.8)
+    store.insert_fraud_report("UPI", "a@ybl", "x")
+    store.import_records("url_checks", [{"url": "https://old.example", "status": "SAFE", "checked_at": "2020-01-01T00:00:00"}])
+
+    feed = store.get_recent_activity(limit=10)
+    assert feed[0]["description"] == "URL checked: https://old.example"
+    assert [a["timestamp"] for a in feed] == sorted((a["timestamp"] for a in feed), reverse=True)
+    paged, cursor = [], None
+    while True:
+        page = store.get_recent_activity(limit=1, cursor=cursor)
+        paged += page
+        cursor = database.next_activity_cursor(page, 1, cursor)
+        if cursor is None:
+            break
+    assert [a["id"] for a in paged] == [a["id"] for a in feed]
+    assert store.get_recent_url_checks(0)[0]["checked_at"].startswith("2020-01-01")   # original time kept
+
+
+def test_chat_sessions_append_only_new_messages(db):
+    turn1 = [{"role": "user", "content": "What is digital arrest?"}, {"role": "assistant", "content": "A scam."}]
+    session = db.save_chat_session(4, turn1)
+    stored = db._chat_sessions.get(session)["messages"]
+    turn2 = turn1 + [{"role": "user", "content": "How to report?"}, {"role": "assistant", "content": "Call 1930."}]
+    assert db.save_chat_session(4, turn2, session) == session
+    assert db._chat_sessions.get(session)["messages"] is stored  # appended in place
+
+    full = db.get_chat_session(session, 4)
+    assert full["messages"] == turn2 and full["message_count"] == 4
+    assert full["title"] == "What is digital arrest?"
+    assert db.get_chat_session(session, 4, start=-1)["messages"] == turn2[-1:]
+    assert db.get_chat_session(session, 4, start=1, limit=2)["messages"] == turn2[1:3]
+    assert db.get_chat_session(session, 5) is None
+
+    db.save_chat_session(4, turn2[:1], session)  # edited history replaces the stored one
+    assert db.get_chat_session(session, 4)["messages"] == turn2[:1]
+
+
+def test_snapshot_and_journal_restore_state(db, tmp_path):
+    db.init_db(str(tmp_path))
+    db.register_citizen("9000000001", "pw", "Asha")
+    db.insert_url_check("https://a.example", "UNSAFE", [{"threatType": "MALWARE"}], citizen_id=2)
+    report = db.insert_fraud_report("UPI", "9876543210", "Fake refund", citizen_id=2)
+    session = db.save_chat_session(2, [{"role": "user", "content": "hi"}])
+    assert db.snapshot_now()
+
+    # Mutations after the snapshot live only in the journal
+    db.update_fraud_report_status(report, "resolved")
+    db.save_chat_session(2, [{"role": "user", "content": "hi"}, {"role": "assistant", "content": "hello"}], session)
+    db.insert_deepfake_scan("clip.mp4", "FAKE", 0.9, citizen_id=2)
+    expected = (db.get_dashboard_stats(), db.get_chat_session(session, 2), db.get_fraud_reports(2))
+
+    restored = importlib.reload(database)
+    restored.init_db(str(tmp_path))
+    assert (restored.get_dashboard_stats(), restored.get_chat_session(session, 2),
+            restored.get_fraud_reports(2)) == expected
+    assert restored.login_citizen("9000000001", "pw")["success"]
+    assert restored.get_recent_url_checks(2)[0]["threats_json"] == '[{"threatType": "MALWARE"}]'
+    assert restored.insert_url_check("https://b.example", "SAFE", None) == 2  # ids continue
+
+
+def test_overlapping_snapshots_leave_a_complete_store(db, tmp_path):
+    db.init_db(str(tmp_path))
+    for i in range(200):
+        db.insert_url_check(f"https://a.example/{i}", "SAFE", None)
+    snapshots = [threading.Thread(target=db.snapshot_now) for _ in range(4)]
+    for t in snapshots:
+        t.start()
+    for i in range(200, 400):
+        db.insert_url_check(f"https://a.example/{i}", "SAFE", None)
+    for t in snapshots:
+        t.join()
+    assert db.final_snapshot() and db._snapshot_stop.is_set()
+    assert not [p for p in tmp_path.iterdir() if p.suffix == ".tmp"]
+
+    restored = importlib.reload(database)
+    restored.init_db(str(tmp_path))
+    assert restored.get_dashboard_stats()["total_url_checks"] == 400
+
+
+def test_read_only_load_leaves_the_servers_files_alone(db, tmp_path):
+    db.init_db(str(tmp_path))
+    db.insert_url_check("https://a.example", "UNSAFE", None, citizen_id=2)
+    assert db.snapshot_now()
+    db.insert_url_check("https://b.example", "SAFE", None, citizen_id=2)    # journal only
+    files = sorted(p.name for p in tmp_path.iterdir())
+
+    reader = importlib.reload(database)
+    reader.load_read_only(str(tmp_path))
+    assert [r["url"] for r in reader.iter_records("url_checks")] == ["https://a.example", "https://b.example"]
+    assert not reader.snapshot_now()
+    assert sorted(p.name for p in tmp_path.iterdir()) == files
+
+
+def test_retention_spills_oldest_rows_to_the_archive(db, tmp_path):
+    db.RETENTION["url_checks"] = {"max_rows": 10}
+    db.init_db(archive_path=str(tmp_path / "archive.db"))
+    ids = [db.insert_url_check(f"https://a.example/{i}", "SAFE", None, citizen_id=1 + i % 2) for i in range(25)]
+    db.enforce_retention()      # inserts only flag the table; this runs the retention thread's pass now
+
+    assert len(db._url_checks) <= 10
+    assert db._archived["url_checks"] + len(db._url_checks) == 25
+    assert [r["id"] for r in db.get_recent_url_checks(0, 25)] == ids[::-1]
+    assert [r["id"] for r in _walk(lambda n, c: db.get_recent_url_checks(1, n, c), 4,
+                                          lambda r, n, c: db.next_cursor(r, n))] == ids[::2][::-1]
+    assert db.get_user_stats(1)["total_url_checks"] == 13
+    assert db.get_dashboard_stats()["total_url_checks"] == 25
+    feed = db.get_recent_activity("url_check", limit=25)
+    assert [a["id"] for a in feed] == [f"url_check-{i}" for i in ids[::-1]]
+
+    db.RETENTION["metadata_log"] = {"max_age_days": 1}
+    db.log_user_metadata(1, "citizen", "login")
+    db._metadata_log.rows()[0].ts -= 2 * 86_400_000_000
+    assert db.enforce_retention()["metadata_log"] == 1
+    assert [m["action"] for m in db.get_user_metadata(1)] == ["login"]
+
+
+def test_archived_rows_keep_their_ids_and_counts_across_restarts(db, tmp_path):
+    archive_path = str(tmp_path / "archive.db")
+    db.RETENTION["url_checks"] = {"max_rows": 4}
+    db.init_db(archive_path=archive_path)
+    for i in range(10):
+        db.insert_url_check(f"https://old.example/{i}", "UNSAFE", None, citizen_id=1)
+    db.enforce_retention()
+    archived = [r["url"] for r in db._archive.iter_after("url_checks")]
+
+    # Archive only: hot rows are lost on restart, archived ones must not be overwritten
+    restarted = importlib.reload(database)
+    restarted.RETENTION["url_checks"] = {"max_rows": 4}
+    restarted.init_db(archive_path=archive_path)
+    for i in range(10):
+        restarted.insert_url_check(f"https://new.example/{i}", "SAFE", None, citizen_id=1)
+    restarted.enforce_retention()
+    urls = [r["url"] for r in restarted.get_recent_url_checks(1, 50)]
+    assert urls[len(urls) - len(archived):] == archived[::-1]
+    stats = restarted.get_dashboard_stats()
+    assert stats["total_url_checks"] == len(urls) == len(archived) + 10
+    assert (stats["unsafe_urls"], stats["today_url_checks"]) == (len(archived), len(archived) + 10)
+
+
+def test_dashboard_counters_include_archived_rows_after_restore(db, tmp_path):
+    archive_path = str(tmp_path / "archive.db")
+    db.RETENTION["url_checks"] = {"max_rows": 10}
+    db.init_db(str(tmp_path / "snap"), archive_path=archive_path)
+    for i in range(25):
+        db.insert_url_check(f"https://a.example/{i}", "UNSAFE", None)
+    db.enforce_retention()
+    assert db.snapshot_now()
+    db.insert_url_check("https://b.example", "UNSAFE", None)     # replayed from the journal
+    expected = db.get_dashboard_stats()
+    assert (expected["unsafe_urls"], expected["today_url_checks"]) == (26, 26)
+
+    restored = importlib.reload(database)
+    restored.RETENTION["url_checks"] = {"max_rows": 10}
+    restored.init_db(str(tmp_path / "snap"), archive_path=archive_path)
+    assert restored.get_dashboard_stats() == expected
+    assert restored.get_daily_counts(1)[0]["url_checks"] == 26
+
+
+def test_inserts_leave_eviction_to_the_retention_thread(db, tmp_path, monkeypatch):
+    db.RETENTION["url_checks"] = {"max_rows": 10}
+    db.EVICT_BATCH = 2
+    db.init_db(archive_path=str(tmp_path / "archive.db"))
+    spilled = []
+    spill = db._archive.spill
+
+    def checked_spill(table, records, owner_of, tally=None):
+        spilled.append((len(records), db._store_lock._is_owned()))
+        return spill(table, records, owner_of, tally)
+
+    monkeypatch.setattr(db._archive, "spill", checked_spill)
+    for i in range(25):
+        db.insert_url_check(f"https://a.example/{i}", "SAFE", None)
+    db.enforce_retention()
+    assert spilled and max(n for n, _ in spilled) <= 2
+    assert not any(locked for _, locked in spilled)     # the archive write never blocks writers
+    assert len(db._url_checks) <= 10 and db._archived["url_checks"] + len(db._url_checks) == 25
+
+
+def test_concurrent_writers_get_unique_ids_and_lose_nothing(db, tmp_path):
+    db.RETENTION["url_checks"] = {"max_rows": 500}
+    db.init_db(archive_path=str(tmp_path / "archive.db"))
+    threads, per_thread = 8, 300
+    switch = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # force frequent preemption between bytecodes
+    errors = []
+
+    def writer(n):
+        for i in range(per_thread):
+            db.insert_url_check(f"https://{n}.example/{i}", "UNSAFE" if i % 3 == 0 else "SAFE", None, citizen_id=n)
+            db.insert_fraud_report("upi", f"{n}@upi", f"report {i}", citizen_id=n)
+            db.log_user_metadata(n, "citizen", "check_url")
+
+    def reader():
+        for _ in range(per_thread):
+            page = db.get_recent_url_checks(0, 50)
+            ids = [r["id"] for r in page]
+            if ids != sorted(set(ids), reverse=True):
+                errors.append(ids)
+
+    try:
+        workers = [threading.Thread(target=writer, args=(n,)) for n in range(1, threads + 1)]
+        workers += [threading.Thread(target=reader) for _ in range(2)]
+        for t in workers:
+            t.start()
+        for t in workers:
+            t.join()
+    finally:
+        sys.setswitchinterval(switch)
+
+    total = threads * per_thread
+    assert not errors
+    reports = db.get_fraud_reports(None, total + 1)
+    assert sorted(r["id"] for r in reports) == list(range(1, total + 1))
+    assert sorted(r["id"] for r in db.get_recent_url_checks(0, total + 1)) == list(range(1, total + 1))
+    assert db.get_dashboard_stats()["unsafe_urls"] == threads * len(range(0, per_thread, 3))
+    assert db.get_dashboard_stats()["pending_reports"] == total
+    for n in range(1, threads + 1):
+        assert db.get_user_stats(n)["total_url_checks"] == per_thread
+        assert len(db.get_user_metadata(n, limit=total)) == per_thread
+
+
+def test_fraud_report_search_ranks_by_relevance(db):
+    upi = db.insert_fraud_report("UPI", "refund.desk@ybl", "Caller said KYC expired and asked for UPI PIN")
+    bank = db.insert_fraud_report("Bank", "9876543210", "Fake HDFC bank officer asked for OTP", location="Raipur")
+    both = db.insert_fraud_report("UPI", "9876543210", "HDFC KYC update scam, HDFC logo on WhatsApp")
+
+    assert [r["id"] for r in db.search_fraud_reports("ybl")] == [upi]
+    assert [r["id"] for r in db.search_fraud_reports("refund.desk@ybl")] == [upi]
+    assert [r["id"] for r in db.search_fraud_reports("hdfc kyc")][0] == both
+    assert {r["id"] for r in db.search_fraud_reports("HDFC")} == {bank, both}
+    assert db.search_fraud_reports("raipur")[0]["score"] > 0
+    assert db.search_fraud_reports("the and") == []
+    assert len(db.search_fraud_reports("upi", limit=1)) == 1
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+def test_fraud_stats_roll_up_by_type_location_and_status(db, tmp_path, backend):
+    store = db
+    if backend == "sqlite":
+        store = sqlite_store
+        store.init_db(str(tmp_path / "cgpolice.db"))
+    first = store.insert_fraud_report("UPI", "a@ybl", "x", amount_lost=500, location="Raipur")
+    store.insert_fraud_report("UPI", "b@ybl", "x", amount_lost=1500, location="Durg")
+    store.insert_fraud_report("Bank", "9876543210", "x", amount_lost=0, location="Raipur")
+    store.update_fraud_report_status(first, "resolved")
+    store.update_fraud_report_status(first, "resolved")     # no-op change counts once
+
+    expected = {
+        "count": 3, "amount_lost": 2000.0,
+        "by_type": {"UPI": 2, "Bank": 1},
+        "by_location": {"Raipur": 2, "Durg": 1},
+        "by_status": {"pending": 2, "resolved": 1},
+    }
+    for period in ("hour", "day", "week"):
+        stats = store.get_fraud_stats(period, periods=3)
+        assert stats["totals"] == expected
+        assert [p["count"] for p in stats["series"]] == [0, 0, 3]
+        assert stats["series"][-1] == {"period": stats["series"][-1]["period"], **expected}
+    assert stats["series"][-1]["period"] == (date.today() - timedelta(days=date.today().weekday())).isoformat()
+    assert len(store.get_fraud_stats("week", periods=200_000)["series"]) == 520
+    assert len(store.get_fraud_stats("day", periods=10 ** 7)["series"]) == 366
+    if backend == "sqlite":
+        # Databases from before the totals table get it backfilled on open
+        store._conn().execute("DROP TABLE fraud_report_totals")
+        store.init_db()
+        assert store.get_fraud_stats()["totals"] == expected
+    with pytest.raises(ValueError):
+        store.get_fraud_stats("month")
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+def test_reported_contact_lookup_normalizes_identifiers(db, tmp_path, backend):
+    store = db
+    if backend == "sqlite":
+        store = sqlite_store
+        store.init_db(str(tmp_path / "cgpolice.db"))
+    store.insert_fraud_report("UPI", "+91 98765-43210, Refund.Desk@YBL", "x")
+    store.insert_fraud_report("Phishing", "https://www.Shop.example/pay/?ref=sms", "x")
+    store.insert_fraud_report("Bank", "09876543210", "x")
+
+    phone = store.get_contact_reports("9876543210")
+    assert (phone["kind"], phone["report_count"]) == ("phone", 2) and phone["last_reported_at"]
+    assert store.get_contact_reports("refund.desk@ybl")["report_count"] == 1
+    assert store.get_contact_reports("http://shop.example/pay")["report_count"] == 1
+    assert store.get_contact_reports("other@okaxis") == {
+        "contact": "other@okaxis", "kind": "upi", "report_count": 0, "last_reported_at": None
+    }
+    assert store.get_contact_reports("not a contact") is None
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+def test_history_lists_summaries_and_detail_returns_full_result(db, tmp_path, backend):
+    store = db
+    if backend == "sqlite":
+        store = sqlite_store
+        store.init_db(str(tmp_path / "cgpolice.db"))
+    doc = {"text": "OCR " * 1000, "related_articles": [{"title": "t"}], "analysis": {"summary": "s", "risk_level": "High"}}
+    doc_id = store.save_document_analysis("fir.png", doc, citizen_id=7)
+    news = {"articles": [{"title": "a"}, {"title": "b"}], "analysis": {"summary": "UPI scams up", "trends": []}}
+    news_id = store.save_news_intel(news, user_type="official", user_id=7)
+
+    [listed] = store.get_document_analyses(7)
+    assert listed == {"id": doc_id, "filename": "fir.png", "risk_level": "High", "created_at": listed["created_at"]}
+    assert store.get_document_analysis(doc_id, 7) == {**listed, "result": doc}
+    assert store.get_document_analysis(doc_id, 8) is None
+    [listed] = store.get_news_intel_history(7)
+    assert listed == {"id": news_id, "summary": "UPI scams up", "article_count": 2, "created_at": listed["created_at"]}
+    assert store.get_news_intel_entry(news_id, 7) == {**listed, "result": news}
+    assert store.get_news_intel_entry(news_id + 1, 7) is None
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+def test_bulk_export_round_trips_through_import(db, tmp_path, backend):
+    def open_store(name):
+        if backend == "memory":
+            return importlib.reload(database)
+        sqlite_store.init_db(str(tmp_path / name))
+        return sqlite_store
+
+    source = open_store("source.db")
+    report = source.insert_fraud_report("UPI", "scam@ybl", "asked for OTP", amount_lost=900, citizen_id=3)
+    source.update_fraud_report_status(report, "resolved")
+    source.insert_url_check("https://bad.example", "UNSAFE", [{"threatType": "MALWARE"}], citizen_id=3)
+    source.insert_deepfake_scan("clip.mp4", "FAKE", 0.97, citizen_id=3)
+    exported = {t: list(source.iter_records(t)) for t in source.BULK_TABLES}
+
+    target = open_store("target.db")
+    for table, rows in exported.items():
+        assert target.import_records(table, rows) == {"imported": 1, "errors": []}
+        # ids and import times are the importing store's own
+        assert [{k: v for k, v in r.items() if k not in ("id", "imported_at")} for r in target.iter_records(table)] == \
+               [{k: v for k, v in r.items() if k not in ("id", "imported_at")} for r in rows]
+    assert target.get_dashboard_stats()["pending_reports"] == 0
+    assert target.get_contact_reports("scam@ybl")["report_count"] == 1
+
+    bad = target.import_records("url_checks", [{"url": "https://x.example"}, {"url": "https://y.example", "status": "SAFE"}])
+    assert bad["imported"] == 1 and bad["errors"][0]["index"] == 0
+    with pytest.raises(ValueError):
+        target.import_records("officials", [])
+
+
+def test_bulk_export_includes_archived_rows(db, tmp_path):
+    db.RETENTION["url_checks"] = {"max_rows": 4}
+    db.init_db(archive_path=str(tmp_path / "archive.db"))
+    for i in range(10):
+        db.insert_url_check(f"https://{i}.example", "SAFE", None)
+    db.enforce_retention()
+    assert len(db._url_checks) < 10
+    assert [r["id"] for r in db.iter_records("url_checks")] == list(range(1, 11))
+    assert [r["id"] for r in db.iter_records("url_checks", after_id=7)] == [8, 9, 10]
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+def test_iter_records_filters_by_time_range(db, tmp_path, backend):
+    store = db
+    if backend == "sqlite":
+        store = sqlite_store
+        store.init_db(str(tmp_path / "cgpolice.db"))
+    live = [store.insert_url_check(f"https://live.example/{i}", "SAFE", None) for i in range(5)]
+    rows = [{"url": f"https://{day}.example", "status": "SAFE", "checked_at": f"2024-05-0{day}T12:00:00"}
+            for day in range(1, 8)]
+    store.import_records("url_checks", rows)    # older timestamps, newer ids
+
+    week = list(store.iter_records("url_checks", since="2024-05-03", until="2024-05-06"))
+    assert [r["checked_at"][:10] for r in week] == ["2024-05-03", "2024-05-04", "2024-05-05"]
+    since = list(store.iter_records("url_checks", since="2024-05-03"))
+    assert [r["id"] for r in since][:5] == live and len(since) == 10
+    assert [r["id"] for r in store.iter_records("url_checks", since="2024-06-01")] == live
+    assert len(list(store.iter_records("url_checks", until="2024-05-02"))) == 1
+    store.log_user_metadata(1, "citizen", "login")
+    assert [m["action"] for m in store.iter_records("metadata_log")] == ["login"]
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "arrow"])
+def test_analytics_export_writes_dictionary_encoded_columns(db, tmp_path, fmt):
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+    import analytics_export
+    for i in range(5):
+        db.insert_url_check(f"https://{i}.example", "UNSAFE" if i % 2 else "SAFE", None, citizen_id=i)
+    path = str(tmp_path / f"url_checks.{fmt}")
+    assert analytics_export.export_table("url_checks", path, db.iter_records("url_checks"), fmt, chunk_rows=2) == 5
+    table = pq.read_table(path) if fmt == "parquet" else pa.ipc.open_file(path).read_all()
+    assert table.num_rows == 5
+    assert str(table.schema.field("status").type).startswith("dictionary")
+    assert table.column("status").to_pylist() == ["SAFE", "UNSAFE", "SAFE", "UNSAFE", "SAFE"]
+
+
+def _walk(fetch, limit, next_cursor):
+    seen, cursor = [], None
+    while True:
+        rows = fetch(limit, cursor)
+        seen.extend(rows)
+        cursor = next_cursor(rows, limit, cursor)
+        if not cursor:
+            return seen
+
+
+def test_cursor_pagination_pages_through_history(db):
+    for i in range(7):
+        db.insert_fraud_report("upi", "", f"report {i}", citizen_id=1 + i % 2)
+        db.insert_url_check(f"https://{i}.example", "SAFE", None, 1)
+
+    reports = _walk(lambda n, c: db.get_fraud_reports(None, n, c), 3, lambda r, n, c: db.next_cursor(r, n))
+    assert [r["id"] for r in reports] == list(range(7, 0, -1))
+    mine = _walk(lambda n, c: db.get_fraud_reports(1, n, c), 2, lambda r, n, c: db.next_cursor(r, n))
+    assert [r["id"] for r in mine] == [7, 5, 3, 1]
+
+    feed = _walk(lambda n, c: db.get_recent_activity(limit=n, citizen_id=1, cursor=c), 3, db.next_activity_cursor)
+    assert len(feed) == 11 and len({a["id"] for a in feed}) == 11
+    assert feed == db.get_recent_activity(limit=50, citizen_id=1)
+
+    with pytest.raises(db.InvalidCursor):
+        db.get_fraud_reports(None, 5, "not-a-cursor")
+
+
+def test_sqlite_migrates_chat_sessions_stored_as_one_blob(tmp_path):
+    path = str(tmp_path / "cgpolice.db")
+    with sqlite3.connect(path) as conn:
+        conn.execute(
+            "CREATE TABLE chat_sessions (id INTEGER PRIMARY KEY, citizen_id INTEGER NOT NULL, title TEXT,"
+            " messages_json TEXT, created_at TEXT NOT NULL, updated_at TEXT NOT NULL)"
+        )
+        turns = [{"role": "user", "content": "hi"}, {"role": "assistant", "content": "hello"}]
+        conn.execute("INSERT INTO chat_sessions VALUES (1, 4, 'hi', ?, '2024-05-01', '2024-05-01')", (json.dumps(turns),))
+    conn.close()
+
+    sqlite_store.init_db(path)
+    assert sqlite_store.get_chat_session(1, 4)["messages"] == turns
+    sqlite_store.save_chat_session(4, turns + [{"role": "user", "content": "more"}], 1)
+    session = sqlite_store.get_chat_session(1, 4)
+    assert session["message_count"] == 3 and session["messages"][-1]["content"] == "more"
+
+
+def test_sqlite_history_pages_are_index_range_scans(tmp_path):
+    sqlite_store.init_db(str(tmp_path / "cgpolice.db"))
+    for table in ("url_checks", "deepfake_scans", "fraud_reports", "chat_sessions", "document_analyses"):
+        plan = " ".join(row["detail"] for row in sqlite_store._conn().execute(
+            f"EXPLAIN QUERY PLAN SELECT * FROM {table} WHERE citizen_id = ? AND id < ? ORDER BY id DESC LIMIT ?",
+            (1, 2**62, 10),
+        ))
+        assert f"idx_{table}_citizen_id" in plan and "TEMP B-TREE" not in plan, plan
+
+
+def test_sqlite_dashboard_totals_match_a_full_count(tmp_path):
+    store = sqlite_store
+    store.init_db(str(tmp_path / "cgpolice.db"))
+    citizen = store.register_citizen("9999000002", "pw")["citizen_id"]
+    store.register_citizen("9999000002", "pw")                     # rejected, must not count
+    store.insert_url_check("https://bad.example", "UNSAFE", None, citizen)
+    store.insert_url_check("https://ok.example", "SAFE", None, citizen)
+    store.insert_deepfake_scan("a.mp4", "FAKE", 0.9, citizen)
+    first = store.insert_fraud_report("upi", "", "...", citizen_id=citizen)
+    second = store.insert_fraud_report("sms", "", "...", citizen_id=citizen)
+    store.update_fraud_report_status(first, "resolved")
+    store.update_fraud_report_statuses([first, second], "resolved")
+    store.update_fraud_report_status(second, "pending")
+    store.import_records("url_checks", [{"url": "https://old.example", "status": "UNSAFE", "checked_at": "2020-01-01T00:00:00"}])
+
+    stats = store.get_dashboard_stats()
+    assert stats == {
+        "total_url_checks": 3, "total_deepfake_scans": 1, "total_fraud_reports": 2,
+        "total_citizens": 1, "total_officials": 1, "unsafe_urls": 2, "deepfakes_detected": 1,
+        "pending_reports": 1, "today_url_checks": 2, "today_deepfake_scans": 1,
+    }
+
+    # A database from before the totals tables existed is counted once on open
+    conn = store._conn()
+    conn.execute("DROP TABLE dashboard_totals")
+    conn.execute("DROP TABLE daily_counts")
+    conn.commit()
+    store.init_db()
+    assert store.get_dashboard_stats() == stats
+
+
+def test_sqlite_backend_matches_function_api(tmp_path):
+    store = sqlite_store
+    store.init_db(str(tmp_path / "cgpolice.db"))
+
+    assert store.login_official("admin", "admin123")["success"]
+    citizen = store.register_citizen("9999000001", "pw", "Alice")["citizen_id"]
+    assert not store.register_citizen("9999000001", "pw")["success"]
+
+    with store.transaction():
+        for i in range(3):
+            store.insert_url_check(f"https://x.example/{i}", "UNSAFE" if i else "SAFE", None, citizen)
+    report = store.insert_fraud_report("upi", "x@upi", "asked for OTP", citizen_id=citizen)
+    assert store.update_fraud_report_status(report, "resolved")
+    assert store.update_fraud_report_statuses([report, 999], "resolved") == [report]
+    session = store.save_chat_session(citizen, [{"role": "user", "content": "hi"}])
+    store.save_chat_session(citizen, [{"role": "user", "content": "hi"}, {"role": "assistant", "content": "hello"}], session)
+
+    assert [u["url"] for u in store.get_recent_url_checks(citizen, 2)] == ["https://x.example/2", "https://x.example/1"]
+    assert store.get_fraud_reports(citizen)[0]["status"] == "resolved"
+    assert len(store.get_chat_session(session, citizen)["messages"]) == 2
+    assert store.get_chat_session(session, citizen, start=-1)["messages"] == [{"role": "assistant", "content": "hello"}]
+    stats = store.get_dashboard_stats()
+    assert stats["unsafe_urls"] == 2 and stats["pending_reports"] == 0
+    activity = store.get_recent_activity(limit=2, citizen_id=citizen)
+    assert [a["type"] for a in activity] == ["fraud_report", "url_check"]
+    cursor = database.next_activity_cursor(activity, 2)
+    assert [a["id"] for a in store.get_recent_activity(limit=5, citizen_id=citizen, cursor=cursor)] == [
+        "url_check-2", "url_check-1"
+    ]
+    page = store.get_recent_url_checks(citizen, 2, database.next_cursor(store.get_recent_url_checks(citizen, 2), 2))
+    assert [u["id"] for u in page] == [1]
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))
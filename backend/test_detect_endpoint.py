@@ -0,0 +1,133 @@
+"""
+Tests for /detect Admission, Back-pressure and Verdict Reuse
+Drives the FastAPI app in-process with a stub predict_video, so no model
+weights or videos are needed (fastapi, httpx and the detector's imports are).
+
+Run:
+    cd backend
+    python -m pytest test_detect_endpoint.py
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+pytest.importorskip("fastapi")
+httpx = pytest.importorskip("httpx")
+server = pytest.importorskip("server")
+
+from ttl_cache import TTLCache
+
+
+class _StubDetector:
+    """predict_video blocks until `gate` is set, so tests control when scans finish."""
+
+    model_version = "stub"
+    batcher = None
+
+    def __init__(self):
+        self.gate = threading.Event()
+        self.scanned = []
+
+    def predict_video(self, file_path, num_frames=16):
+        self.scanned.append(file_path)
+        self.gate.wait(5)
+        return {"prediction": "REAL", "confidence": 0.9}
+
+
+@pytest.fixture
+def detector(monkeypatch, tmp_path):
+    stub = _StubDetector()
+    pool = ThreadPoolExecutor(max_workers=1)
+    recorded = []
+    monkeypatch.setattr(server, "detector", stub)
+    monkeypatch.setattr(server, "DETECT_WORKERS", 1)
+    monkeypatch.setattr(server, "DETECT_QUEUE_DEPTH", 1)
+    monkeypatch.setattr(server, "detect_pool", pool)
+    monkeypatch.setattr(server, "detect_state", {"admitted": 0, "rejected": 0, "avg_seconds": 3.0})
+    monkeypatch.setattr(server, "detect_inflight", {})
+    monkeypatch.setattr(server, "scan_cache", TTLCache(max_entries=16))
+    monkeypatch.setattr(server, "UPLOAD_DIR", str(tmp_path))
+    monkeypatch.setattr(server, "insert_deepfake_scan", lambda **scan: recorded.append(scan))
+    stub.recorded = recorded
+    yield stub
+    stub.gate.set()
+    pool.shutdown(wait=True)
+
+
+def _run(scenario):
+    async def main():
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            await scenario(client)
+    asyncio.run(main())
+
+def _upload(client, content):
+    return client.post("/detect", files={"file": ("clip.mp4", content, "video/mp4")}, data={"citizen_id": "7"})
+
+async def _until(condition):
+    for _ in range(500):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("condition not reached")
+
+
+def test_full_scanner_returns_503_with_retry_after_and_frees_slots(detector):
+    async def scenario(client):
+        running = asyncio.create_task(_upload(client, b"clip-a"))
+        queued = asyncio.create_task(_upload(client, b"clip-b"))
+        await _until(lambda: server.detect_state["admitted"] == 2)
+
+        rejected = await _upload(client, b"clip-c")
+        assert rejected.status_code == 503
+        assert int(rejected.headers["Retry-After"]) >= 1
+        assert server.detect_state["rejected"] == 1
+
+        detector.gate.set()
+        assert [(await task).status_code for task in (running, queued)] == [200, 200]
+        await _until(lambda: server.detect_state["admitted"] == 0)
+        assert (await _upload(client, b"clip-c")).status_code == 200
+
+    _run(scenario)
+    assert len(detector.recorded) == 3
+
+
+def test_cancelled_request_keeps_its_slot_until_the_scan_ends(detector):
+    async def scenario(client):
+        request = asyncio.create_task(_upload(client, b"clip-a"))
+        await _until(lambda: detector.scanned)
+        request.cancel()
+        await asyncio.sleep(0.05)
+        assert server.detect_state["admitted"] == 1     # the worker is still busy with it
+
+        detector.gate.set()
+        await _until(lambda: server.detect_state["admitted"] == 0)
+        assert server.detect_inflight == {}
+
+    _run(scenario)
+
+
+def test_repeat_uploads_share_the_running_scan_then_hit_the_cache(detector):
+    async def scenario(client):
+        first = asyncio.create_task(_upload(client, b"viral"))
+        await _until(lambda: detector.scanned)
+        second = asyncio.create_task(_upload(client, b"viral"))
+        await asyncio.sleep(0.05)
+        detector.gate.set()
+        bodies = [(await first).json(), (await second).json()]
+        assert [b["cached"] for b in bodies] == [False, True]
+
+        again = (await _upload(client, b"viral")).json()
+        assert again["cached"] is True and again["prediction"] == "REAL"
+
+    _run(scenario)
+    assert len(detector.scanned) == 1
+    assert len(detector.recorded) == 3      # every upload is still logged
+    assert server.scan_cache.hits == 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,79 @@
+"""
+Tests for frame_sampler.read_frames
+Drives read_frames with a stub capture, so no video files are needed (cv2 is).
+
+Run:
+    cd backend
+    python -m pytest test_frame_sampler.py
+"""
+
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+
+from frame_sampler import read_frames
+
+
+class _StubCapture:
+    """A `length`-frame stream whose `bad` frames cannot be grabbed and `blank` frames cannot be retrieved."""
+
+    def __init__(self, length, bad=(), blank=()):
+        self.length, self.bad, self.blank = length, set(bad), set(blank)
+        self.pos = 0
+        self.current = None
+        self.grabs = 0
+
+    def set(self, prop, value):
+        assert prop == cv2.CAP_PROP_POS_FRAMES
+        self.pos = int(value)
+        return True
+
+    def grab(self):
+        self.grabs += 1
+        if self.pos >= self.length or self.pos in self.bad:
+            self.current = None
+            return False
+        self.current = self.pos
+        self.pos += 1
+        return True
+
+    def retrieve(self):
+        if self.current is None or self.current in self.blank:
+            return False, None
+        return True, f"frame-{self.current}"
+
+
+def _indices(cap, indices, mode):
+    return [idx for idx, _ in read_frames(cap, indices, mode)]
+
+
+def test_seek_skips_a_frame_that_fails_mid_stream():
+    cap = _StubCapture(100, bad={40}, blank={60})
+    assert _indices(cap, [0, 20, 40, 60, 80, 99], "seek") == [0, 20, 80, 99]
+
+
+def test_seek_past_the_end_yields_nothing_more():
+    cap = _StubCapture(50, bad={10})
+    assert _indices(cap, [10, 20, 60, 70], "seek") == [20]
+
+
+def test_stream_stops_at_the_end_of_the_stream():
+    cap = _StubCapture(50, blank={20})
+    frames = list(read_frames(cap, [10, 20, 30, 60, 70], "stream"))
+    assert frames == [(10, "frame-10"), (30, "frame-30")]
+    assert cap.grabs == 51      # reads up to the end once, then gives up
+
+
+def test_auto_seeks_again_after_a_failed_seek():
+    cap = _StubCapture(2000, bad={1000})
+    # The 0→5 gap times grab(), so auto seeks the wide gaps; after the failed seek at 1000 it must seek again
+    assert _indices(cap, [0, 5, 1000, 1900], "auto") == [0, 5, 1900]
+
+
+def test_repeated_indices_reuse_the_frame():
+    cap = _StubCapture(10)
+    assert _indices(cap, [3, 3, 5], "stream") == [3, 3, 5]
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,99 @@
+"""
+Unit Tests for the Dynamic Inference Batcher
+Uses a plain-Python run_batch, so no model or torch is needed.
+
+Run:
+    cd backend
+    python -m pytest test_inference_batcher.py
+"""
+
+import threading
+
+import pytest
+
+from inference_batcher import InferenceBatcher
+
+
+def _submit_concurrently(batcher, items):
+    results = [None] * len(items)
+    start = threading.Barrier(len(items))
+
+    def call(i):
+        start.wait()
+        results[i] = batcher.submit(items[i], timeout=5)
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(len(items))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+def test_concurrent_requests_share_batches_and_get_their_own_results():
+    sizes = []
+
+    def run_batch(items):
+        sizes.append(len(items))
+        return [x * 10 for x in items]
+
+    batcher = InferenceBatcher(run_batch, max_batch_size=4, max_wait_ms=200)
+    try:
+        assert _submit_concurrently(batcher, list(range(8))) == [x * 10 for x in range(8)]
+        assert sum(sizes) == 8 and max(sizes) <= 4 and len(sizes) < 8
+
+        metrics = batcher.metrics()
+        assert metrics["requests"] == 8 and metrics["batches"] == len(sizes)
+        assert metrics["throughput_per_s"] > 0
+        assert metrics["queue_delay_ms"]["max"] >= metrics["queue_delay_ms"]["p50"] >= 0
+    finally:
+        batcher.close()
+
+
+def test_inputs_with_different_keys_are_never_stacked_together():
+    batches = []
+
+    def run_batch(items):
+        batches.append(items)
+        return [len(x) for x in items]
+
+    batcher = InferenceBatcher(run_batch, max_batch_size=8, max_wait_ms=100, key=len)
+    try:
+        items = ["aa", "bbb", "cc", "ddd", "ee"]
+        assert _submit_concurrently(batcher, items) == [2, 3, 2, 3, 2]
+        assert all(len({len(x) for x in batch}) == 1 for batch in batches)
+    finally:
+        batcher.close()
+
+
+def test_run_batch_errors_reach_every_caller_in_the_batch():
+    def run_batch(items):
+        raise RuntimeError("model failed")
+
+    batcher = InferenceBatcher(run_batch, max_batch_size=2, max_wait_ms=0)
+    try:
+        with pytest.raises(RuntimeError, match="model failed"):
+            batcher.submit(1, timeout=5)
+        assert batcher.metrics()["requests"] == 1
+    finally:
+        batcher.close()
+
+
+def test_close_while_a_batch_is_collecting_still_returns():
+    batcher = InferenceBatcher(lambda items: items, max_batch_size=4, max_wait_ms=60_000)
+    result = []
+    caller = threading.Thread(target=lambda: result.append(batcher.submit("clip", timeout=5)), daemon=True)
+    caller.start()
+    while not batcher._queue.empty():   # the worker is now waiting for more inputs
+        pass
+
+    closer = threading.Thread(target=batcher.close, daemon=True)
+    closer.start()
+    closer.join(5)
+    caller.join(5)
+    assert not closer.is_alive()
+    assert result == ["clip"]
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))
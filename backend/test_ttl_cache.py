@@ -0,0 +1,51 @@
+"""
+Unit Tests for the LRU + TTL Cache
+Run:
+    cd backend
+    python -m pytest test_ttl_cache.py
+"""
+
+import pytest
+
+from ttl_cache import TTLCache
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_entries_expire_after_ttl():
+    clock = _Clock()
+    cache = TTLCache(max_entries=4, ttl_seconds=10, clock=clock)
+    cache.put("clip", {"prediction": "FAKE"})
+    clock.now = 9.9
+    assert cache.get("clip") == {"prediction": "FAKE"}
+    clock.now = 10.0
+    assert cache.get("clip") is None
+    assert len(cache) == 0
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_least_recently_used_entry_is_evicted_first():
+    cache = TTLCache(max_entries=2, ttl_seconds=60)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1      # "b" is now the least recently used
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.stats()["entries"] == 2
+
+
+def test_zero_size_cache_stores_nothing():
+    cache = TTLCache(max_entries=0)
+    cache.put("a", 1)
+    assert cache.get("a") is None
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))